@@ -0,0 +1,36 @@
+-- Catalog versions
+-- The category (distinct property_highlights.icon) and amenity catalogs are
+-- served from memory; API processes poll this table and reload a catalog only
+-- when its version moved. Statement-level triggers bump the version on every
+-- write to the source table.
+
+CREATE TABLE IF NOT EXISTS catalog_versions (
+	name varchar(50) PRIMARY KEY,
+	version bigint NOT NULL DEFAULT 1,
+	updated_at timestamp NOT NULL DEFAULT now()
+);
+
+INSERT INTO catalog_versions (name) VALUES ('categories'), ('amenities')
+ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_catalog_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+	UPDATE catalog_versions
+	SET version = version + 1, updated_at = now()
+	WHERE name = TG_ARGV[0];
+	RETURN NULL;
+END;
+$$;
+
+-- Categories only depend on the icon column
+DROP TRIGGER IF EXISTS trg_property_highlights_catalog_version ON property_highlights;
+CREATE TRIGGER trg_property_highlights_catalog_version
+	AFTER INSERT OR DELETE OR UPDATE OF icon OR TRUNCATE ON property_highlights
+	FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version('categories');
+
+DROP TRIGGER IF EXISTS trg_amenities_catalog_version ON amenities;
+CREATE TRIGGER trg_amenities_catalog_version
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON amenities
+	FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version('amenities');
@@ -0,0 +1,13 @@
+-- Category index version
+-- The in-memory category filter index (icon -> property ids) is rebuilt when
+-- the 'categories' catalog version moves, so moving a highlight to another
+-- property must bump it too, not only icon changes (V.0_0_10).
+
+DROP TRIGGER IF EXISTS trg_property_highlights_catalog_version ON property_highlights;
+CREATE TRIGGER trg_property_highlights_catalog_version
+	AFTER INSERT OR DELETE OR UPDATE OF icon, property_id OR TRUNCATE ON property_highlights
+	FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version('categories');
+
+-- Ordered scan that builds the index
+CREATE INDEX IF NOT EXISTS idx_property_highlights_icon_property
+	ON property_highlights (icon, property_id);
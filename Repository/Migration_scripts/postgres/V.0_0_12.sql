@@ -0,0 +1,10 @@
+-- Message history index
+-- Conversation history is paged by keyset on (sent_at, id) newest first
+-- (MessageRepository.get_message_page); this index serves the filter, the
+-- ORDER BY sent_at DESC, id DESC and the cursor predicate in one range scan.
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_message_conversation_sent_at
+	ON message (conversation_id, sent_at DESC, id DESC);
+
+ANALYZE message;
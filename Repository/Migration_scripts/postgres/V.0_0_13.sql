@@ -0,0 +1,20 @@
+-- Conversation read watermarks
+-- "Mark all read" used to load and flip every unread message. Each
+-- conversation now records its newest message id (set by the send statement)
+-- and, per participant, the id up to which they have read, so marking a
+-- conversation read is a single-row UPDATE. A message counts as read when its
+-- is_read flag is set or its id is at or below the recipient's watermark.
+
+ALTER TABLE conversation ADD COLUMN IF NOT EXISTS last_message_id bigint;
+ALTER TABLE conversation ADD COLUMN IF NOT EXISTS guest_last_read_message_id bigint NOT NULL DEFAULT 0;
+ALTER TABLE conversation ADD COLUMN IF NOT EXISTS host_last_read_message_id bigint NOT NULL DEFAULT 0;
+
+-- Backfill
+UPDATE conversation c
+SET last_message_id = m.max_id
+FROM (
+	SELECT conversation_id, max(id) AS max_id
+	FROM message
+	GROUP BY conversation_id
+) m
+WHERE m.conversation_id = c.id;
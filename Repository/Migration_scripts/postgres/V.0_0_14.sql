@@ -0,0 +1,53 @@
+-- Conversation inbox
+-- The inbox endpoint joined conversation, properties and users with an OR
+-- condition and CASE expressions on every open, and had no unread counts. Each
+-- participant now has one conversation_inbox row per conversation carrying the
+-- last message preview, last_message_at and their unread count. The send
+-- statement upserts both rows, marking read zeroes the reader's count, so the
+-- inbox is a range scan on (user_id, last_message_at).
+
+CREATE TABLE IF NOT EXISTS conversation_inbox (
+	user_id bigint NOT NULL REFERENCES users(id),
+	conversation_id bigint NOT NULL REFERENCES conversation(id) ON DELETE CASCADE,
+	role varchar(10) NOT NULL,
+	other_user_id bigint NOT NULL REFERENCES users(id),
+	property_id bigint,
+	is_archived boolean NOT NULL DEFAULT false,
+	conversation_created_at timestamp,
+	last_message_id bigint,
+	last_message_preview varchar(140),
+	last_message_sender_id bigint,
+	last_message_at timestamp,
+	unread_count integer NOT NULL DEFAULT 0,
+	PRIMARY KEY (user_id, conversation_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_inbox_user_last_message
+	ON conversation_inbox (user_id, last_message_at DESC NULLS LAST);
+
+-- Backfill: unread = messages from the other participant that are neither
+-- flagged read nor covered by this user's watermark (V.0_0_13)
+INSERT INTO conversation_inbox (
+	user_id, conversation_id, role, other_user_id, property_id, is_archived,
+	conversation_created_at, last_message_id, last_message_preview,
+	last_message_sender_id, last_message_at, unread_count
+)
+SELECT p.user_id, c.id, p.role, p.other_user_id, c.property_id, coalesce(c.is_archived, false),
+	c.created_at, lm.id, left(lm.message_text, 140),
+	lm.sender_id, c.last_message_at,
+	(
+		SELECT count(*)
+		FROM message m
+		WHERE m.conversation_id = c.id
+		  AND m.sender_id <> p.user_id
+		  AND m.is_read IS NOT TRUE
+		  AND m.id > p.watermark
+	)
+FROM conversation c
+CROSS JOIN LATERAL (VALUES
+	(c.guest_id, 'GUEST', c.host_id, c.guest_last_read_message_id),
+	(c.host_id, 'HOST', c.guest_id, c.host_last_read_message_id)
+) AS p(user_id, role, other_user_id, watermark)
+LEFT JOIN message lm ON lm.id = c.last_message_id
+WHERE NOT (p.role = 'HOST' AND c.guest_id = c.host_id)
+ON CONFLICT (user_id, conversation_id) DO NOTHING;
@@ -0,0 +1,56 @@
+-- Availability bitmap side table
+-- refresh_property_availability (V.0_0_8) updated properties, which fires
+-- trg_props_upd: every calendar write and the daily rollover bumped
+-- properties.updated_at and rewrote whole listing rows. The bitmap now lives
+-- in property_availability, and a row is only written when its epoch or bits
+-- actually change.
+
+CREATE TABLE IF NOT EXISTS property_availability (
+	property_id bigint PRIMARY KEY REFERENCES properties(id) ON DELETE CASCADE,
+	epoch date NOT NULL,
+	bits bit varying(365) NOT NULL
+);
+
+-- Same contract as V.0_0_8: recompute the bitmap of the given properties (all
+-- when NULL); with p_stale_only only windows not starting today are rebuilt.
+-- Returns the number of rows written.
+CREATE OR REPLACE FUNCTION refresh_property_availability(
+	p_property_ids bigint[] DEFAULT NULL,
+	p_stale_only boolean DEFAULT false
+) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+	v_updated integer;
+BEGIN
+	INSERT INTO property_availability AS pa (property_id, epoch, bits)
+	SELECT p.id, CURRENT_DATE, (
+		SELECT string_agg(CASE WHEN a.night IS NULL THEN '0' ELSE '1' END, '' ORDER BY g.i)::varbit
+		FROM generate_series(0, 364) AS g(i)
+		LEFT JOIN (
+			SELECT DISTINCT ca.date - CURRENT_DATE AS night
+			FROM calendar_availability ca
+			WHERE ca.property_id = p.id
+			  AND ca.is_available IS TRUE
+			  AND ca.date >= CURRENT_DATE
+			  AND ca.date < CURRENT_DATE + 365
+		) a ON a.night = g.i
+	)
+	FROM properties p
+	LEFT JOIN property_availability cur ON cur.property_id = p.id
+	WHERE (p_property_ids IS NULL OR p.id = ANY(p_property_ids))
+	  AND (NOT p_stale_only OR cur.epoch IS DISTINCT FROM CURRENT_DATE)
+	ON CONFLICT (property_id) DO UPDATE
+	SET epoch = EXCLUDED.epoch,
+		bits = EXCLUDED.bits
+	WHERE pa.epoch IS DISTINCT FROM EXCLUDED.epoch
+	   OR pa.bits IS DISTINCT FROM EXCLUDED.bits;
+	GET DIAGNOSTICS v_updated = ROW_COUNT;
+	RETURN v_updated;
+END;
+$$;
+
+-- Backfill, then drop the columns V.0_0_8 added to properties
+SELECT refresh_property_availability();
+
+ALTER TABLE properties DROP COLUMN IF EXISTS availability_bits;
+ALTER TABLE properties DROP COLUMN IF EXISTS availability_epoch;
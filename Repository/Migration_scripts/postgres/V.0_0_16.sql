@@ -0,0 +1,8 @@
+-- Calendar write sequence
+-- The bid book writer sets the winning price and bid of each auction night with
+-- a plain UPDATE, so a delayed or retried batch could overwrite a newer winner.
+-- Every calendar row written by the bid book now carries a monotonic sequence;
+-- the UPDATE only applies when its sequence is newer than the stored one.
+
+ALTER TABLE calendar_availability
+	ADD COLUMN IF NOT EXISTS bid_seq bigint NOT NULL DEFAULT 0;
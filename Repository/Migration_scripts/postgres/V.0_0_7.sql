@@ -0,0 +1,34 @@
+-- Location search index (trigram)
+-- _apply_location_filter / get_location_suggestions used '%tok%' ILIKE on
+-- city/state/country/address_line1, which idx_properties_location (btree) cannot
+-- serve. Each property now carries two lower-cased generated search documents
+-- with pg_trgm GIN indexes; LIKE '%tok%' and word_similarity() ranking use them.
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- city, state, country, address: matched by the search/filter location token
+ALTER TABLE properties
+ADD COLUMN IF NOT EXISTS location_search text GENERATED ALWAYS AS (
+	lower(
+		coalesce(city, '') || ' ' || coalesce(state, '') || ' ' ||
+		coalesce(country, '') || ' ' || coalesce(address_line1, '')
+	)
+) STORED;
+
+-- city, state, country: matched by location autocomplete
+ALTER TABLE properties
+ADD COLUMN IF NOT EXISTS place_search text GENERATED ALWAYS AS (
+	lower(coalesce(city, '') || ' ' || coalesce(state, '') || ' ' || coalesce(country, ''))
+) STORED;
+
+-- Every location query is restricted to ACTIVE listings
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_properties_location_search_trgm
+	ON properties USING gin (location_search gin_trgm_ops)
+	WHERE status = 'ACTIVE';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_properties_place_search_trgm
+	ON properties USING gin (place_search gin_trgm_ops)
+	WHERE status = 'ACTIVE';
+
+ANALYZE properties;
@@ -0,0 +1,90 @@
+-- Per-property availability bitmap
+-- _apply_availability_filter grouped calendar_availability per property for
+-- every dated search. Each property now carries the next 365 nights as a bit
+-- string (bit i = night availability_epoch + i has an available calendar row),
+-- maintained by statement-level triggers on calendar_availability, so a date
+-- range check is a substring + bit_count on the properties row.
+-- bit_count(bit) needs PostgreSQL 14+.
+
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS availability_epoch date;
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS availability_bits bit varying(365);
+
+-- Recompute the bitmap of the given properties (all when NULL). With
+-- p_stale_only only rows whose epoch is not today are rebuilt (daily rollover).
+CREATE OR REPLACE FUNCTION refresh_property_availability(
+	p_property_ids bigint[] DEFAULT NULL,
+	p_stale_only boolean DEFAULT false
+) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+	v_updated integer;
+BEGIN
+	UPDATE properties p
+	SET availability_epoch = CURRENT_DATE,
+		availability_bits = (
+			SELECT string_agg(CASE WHEN a.night IS NULL THEN '0' ELSE '1' END, '' ORDER BY g.i)::varbit
+			FROM generate_series(0, 364) AS g(i)
+			LEFT JOIN (
+				SELECT DISTINCT ca.date - CURRENT_DATE AS night
+				FROM calendar_availability ca
+				WHERE ca.property_id = p.id
+				  AND ca.is_available IS TRUE
+				  AND ca.date >= CURRENT_DATE
+				  AND ca.date < CURRENT_DATE + 365
+			) a ON a.night = g.i
+		)
+	WHERE (p_property_ids IS NULL OR p.id = ANY(p_property_ids))
+	  AND (NOT p_stale_only OR p.availability_epoch IS DISTINCT FROM CURRENT_DATE);
+	GET DIAGNOSTICS v_updated = ROW_COUNT;
+	RETURN v_updated;
+END;
+$$;
+
+-- Transition tables cannot be combined with several events or column lists,
+-- so one function serves three statement-level triggers.
+CREATE OR REPLACE FUNCTION calendar_availability_refresh_bits()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+	IF TG_OP = 'INSERT' THEN
+		PERFORM refresh_property_availability(ARRAY(SELECT DISTINCT property_id::bigint FROM new_rows));
+	ELSIF TG_OP = 'DELETE' THEN
+		PERFORM refresh_property_availability(ARRAY(SELECT DISTINCT property_id::bigint FROM old_rows));
+	ELSE
+		-- Bid writes only touch price_amount/bid_id: skip them
+		PERFORM refresh_property_availability(ARRAY(
+			SELECT n.property_id::bigint
+			FROM new_rows n JOIN old_rows o ON o.id = n.id
+			WHERE n.is_available IS DISTINCT FROM o.is_available
+			   OR n.date IS DISTINCT FROM o.date
+			   OR n.property_id IS DISTINCT FROM o.property_id
+			UNION
+			SELECT o.property_id::bigint
+			FROM new_rows n JOIN old_rows o ON o.id = n.id
+			WHERE n.property_id IS DISTINCT FROM o.property_id
+		));
+	END IF;
+	RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_calendar_availability_bits_insert ON calendar_availability;
+CREATE TRIGGER trg_calendar_availability_bits_insert
+	AFTER INSERT ON calendar_availability
+	REFERENCING NEW TABLE AS new_rows
+	FOR EACH STATEMENT EXECUTE FUNCTION calendar_availability_refresh_bits();
+
+DROP TRIGGER IF EXISTS trg_calendar_availability_bits_update ON calendar_availability;
+CREATE TRIGGER trg_calendar_availability_bits_update
+	AFTER UPDATE ON calendar_availability
+	REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+	FOR EACH STATEMENT EXECUTE FUNCTION calendar_availability_refresh_bits();
+
+DROP TRIGGER IF EXISTS trg_calendar_availability_bits_delete ON calendar_availability;
+CREATE TRIGGER trg_calendar_availability_bits_delete
+	AFTER DELETE ON calendar_availability
+	REFERENCING OLD TABLE AS old_rows
+	FOR EACH STATEMENT EXECUTE FUNCTION calendar_availability_refresh_bits();
+
+-- Backfill
+SELECT refresh_property_availability();
@@ -0,0 +1,85 @@
+-- Materialized rating summaries
+-- Search cards and property details aggregated AVG/COUNT over reviews per
+-- request. These tables keep running totals (sum, count, 1-5 histogram) of
+-- visible reviews per property and per host; ReviewRepository.create_review
+-- updates them in the same transaction as the review insert.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS property_rating_summary (
+	property_id bigint PRIMARY KEY REFERENCES properties(id) ON DELETE CASCADE,
+	rating_sum numeric(12,2) NOT NULL DEFAULT 0,
+	rating_count integer NOT NULL DEFAULT 0,
+	rating_1_count integer NOT NULL DEFAULT 0,
+	rating_2_count integer NOT NULL DEFAULT 0,
+	rating_3_count integer NOT NULL DEFAULT 0,
+	rating_4_count integer NOT NULL DEFAULT 0,
+	rating_5_count integer NOT NULL DEFAULT 0,
+	updated_at timestamptz DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS host_rating_summary (
+	host_id bigint PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+	rating_sum numeric(12,2) NOT NULL DEFAULT 0,
+	rating_count integer NOT NULL DEFAULT 0,
+	rating_1_count integer NOT NULL DEFAULT 0,
+	rating_2_count integer NOT NULL DEFAULT 0,
+	rating_3_count integer NOT NULL DEFAULT 0,
+	rating_4_count integer NOT NULL DEFAULT 0,
+	rating_5_count integer NOT NULL DEFAULT 0,
+	updated_at timestamptz DEFAULT now()
+);
+
+-- Backfill (idempotent: totals are recomputed from reviews)
+INSERT INTO property_rating_summary AS s (
+	property_id, rating_sum, rating_count,
+	rating_1_count, rating_2_count, rating_3_count, rating_4_count, rating_5_count
+)
+SELECT r.property_id,
+	   coalesce(sum(r.rating), 0),
+	   count(*),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 1),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 2),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 3),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 4),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 5)
+FROM reviews r
+WHERE r.is_visible IS TRUE AND r.property_id IS NOT NULL
+GROUP BY r.property_id
+ON CONFLICT (property_id) DO UPDATE SET
+	rating_sum = EXCLUDED.rating_sum,
+	rating_count = EXCLUDED.rating_count,
+	rating_1_count = EXCLUDED.rating_1_count,
+	rating_2_count = EXCLUDED.rating_2_count,
+	rating_3_count = EXCLUDED.rating_3_count,
+	rating_4_count = EXCLUDED.rating_4_count,
+	rating_5_count = EXCLUDED.rating_5_count,
+	updated_at = now();
+
+INSERT INTO host_rating_summary AS s (
+	host_id, rating_sum, rating_count,
+	rating_1_count, rating_2_count, rating_3_count, rating_4_count, rating_5_count
+)
+SELECT p.host_id,
+	   coalesce(sum(r.rating), 0),
+	   count(*),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 1),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 2),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 3),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 4),
+	   count(*) FILTER (WHERE least(5, greatest(1, round(r.rating))) = 5)
+FROM reviews r
+JOIN properties p ON p.id = r.property_id
+WHERE r.is_visible IS TRUE
+GROUP BY p.host_id
+ON CONFLICT (host_id) DO UPDATE SET
+	rating_sum = EXCLUDED.rating_sum,
+	rating_count = EXCLUDED.rating_count,
+	rating_1_count = EXCLUDED.rating_1_count,
+	rating_2_count = EXCLUDED.rating_2_count,
+	rating_3_count = EXCLUDED.rating_3_count,
+	rating_4_count = EXCLUDED.rating_4_count,
+	rating_5_count = EXCLUDED.rating_5_count,
+	updated_at = now();
+
+COMMIT;
@@ -143,6 +143,42 @@ async def get_user_bid_summary(
         }
 
 
+@router.get("/auction/{auction_id}/status", operation_id="getAuctionWinLoseStatuses")
+@inject
+async def get_auction_win_lose_statuses(
+        auction_id: str,
+        winlose_service: WinLoseService = Depends(Provide[Container.winlose_service])
+) -> Dict:
+    """
+    Lấy win-lose status của tất cả bidder trong auction bằng một lần gọi
+
+    Args:
+        auction_id: ID của auction
+
+    Returns:
+        Dict chứa danh sách win-lose analysis theo từng user
+    """
+    try:
+        result = winlose_service.get_auction_win_lose_statuses(auction_id)
+
+        if not result.get("success"):
+            raise HTTPException(
+                status_code=500,
+                detail=result.get("message", "Internal server error")
+            )
+
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"API Error getting auction win-lose statuses: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
 @router.get("/health", operation_id="winLoseHealthCheck")
 async def health_check() -> Dict:
     """
@@ -14,6 +14,7 @@ class RedisConfig(BaseModel):
 	db: int = Field(default=0)
 	retry_count: int = Field(default=3)
 	lock_expire: int = Field(default=5)
+	max_connections: int = Field(default=50)
 
 class RabbitMQConfig(BaseModel):
 	host: str = Field(default="localhost")
@@ -22,6 +23,28 @@ class RabbitMQConfig(BaseModel):
 	password: str = Field(default="guest")
 	stream_name: str = Field(default="bidding_stream")
 	stream_retention: int = Field(default=1000000)  # Retention in bytes
+	consumer_name: str = Field(default="bid-consumer")  # Name the consumer stores its offset under
+	consumer_batch_size: int = Field(default=200, ge=1)  # Max bids per consumer micro-batch
+	consumer_batch_interval_ms: int = Field(default=100, ge=1)  # Max delay before a partial micro-batch is processed
+	consumer_report_interval: int = Field(default=10, ge=1)  # Seconds between lag reports
+	producer_batch_size: int = Field(default=100, ge=1)  # Max bids per send_batch frame
+	producer_batch_interval_ms: int = Field(default=5, ge=1)  # Max delay before a partial batch is sent
+	publish_confirm_timeout: float = Field(default=5.0, gt=0)  # Seconds a caller waits for a publish confirm
+
+class BidBookConfig(BaseModel):
+	batch_size: int = Field(default=200, ge=1)  # Max bids per persistence transaction
+	flush_interval_ms: int = Field(default=50, ge=1)  # Max delay before a partial batch is flushed
+	max_retries: int = Field(default=3, ge=1)  # Attempts per batch before it is written row by row
+	refresh_seconds: float = Field(default=5.0, gt=0)  # Max age of a book's auction status/dates before they are re-read
+
+class SearchConfig(BaseModel):
+	location_index_refresh_seconds: int = Field(default=300, ge=1)  # Full reload of the in-memory autocomplete index
+	count_cache_seconds: int = Field(default=60, ge=0)  # Reuse of exact listing totals per filter signature
+	availability_refresh_seconds: int = Field(default=3600, ge=60)  # Check for availability bitmaps to roll to today
+	details_cache_entries: int = Field(default=1000, ge=1)  # Property detail responses kept in process (LRU)
+	details_cache_local_seconds: int = Field(default=30, ge=1)  # TTL of the in-process copy
+	details_cache_redis_seconds: int = Field(default=600, ge=1)  # TTL of the shared Redis copy
+	catalog_refresh_seconds: int = Field(default=30, ge=1)  # Poll of catalog_versions for category/amenity changes
 
 class Auth0Config(BaseModel):
 	domain: str = Field(default="")
@@ -54,6 +77,8 @@ class Settings(BaseModel):
 	postgres_db: PostgresConfig = PostgresConfig()
 	redis_db: RedisConfig = RedisConfig()
 	rabbit_mq: RabbitMQConfig = RabbitMQConfig()
+	bid_book: BidBookConfig = BidBookConfig()
+	search: SearchConfig = SearchConfig()
 	auth0: Auth0Config = Auth0Config()
 	zalopay: ZaloPayConfig = ZaloPayConfig()
 	app: AppConfig = AppConfig()
@@ -82,7 +107,8 @@ def get_settings() -> Settings:
 			port=int(os.getenv("REDIS__PORT", 6379)),
 			db=int(os.getenv("REDIS__DB", 0)),
 			retry_count=int(os.getenv("REDIS__RETRY", 3)),
-			lock_expire=int(os.getenv("REDIS__LOCK_EXPIRE", 5))  # Lock expire in seconds
+			lock_expire=int(os.getenv("REDIS__LOCK_EXPIRE", 5)),  # Lock expire in seconds
+			max_connections=int(os.getenv("REDIS__MAX_CONNECTIONS", 50))
 		),
 		rabbit_mq=RabbitMQConfig(
 			host=os.getenv("RABBITMQ__HOST", "localhost"),
@@ -90,7 +116,29 @@ def get_settings() -> Settings:
 			username=os.getenv("RABBITMQ__USERNAME", "admin"),
 			password=os.getenv("RABBITMQ__PASSWORD", "admin"),
 			stream_name=os.getenv("RABBITMQ__STREAM_NAME", "bidding_stream"),
-			stream_retention=int(os.getenv("RABBITMQ__STREAM_RETENTION", 5000000)) # Retention in bytes
+			stream_retention=int(os.getenv("RABBITMQ__STREAM_RETENTION", 5000000)), # Retention in bytes
+			consumer_name=os.getenv("RABBITMQ__CONSUMER_NAME", "bid-consumer"),
+			consumer_batch_size=int(os.getenv("RABBITMQ__CONSUMER_BATCH_SIZE", 200)),
+			consumer_batch_interval_ms=int(os.getenv("RABBITMQ__CONSUMER_BATCH_INTERVAL_MS", 100)),
+			consumer_report_interval=int(os.getenv("RABBITMQ__CONSUMER_REPORT_INTERVAL", 10)),
+			producer_batch_size=int(os.getenv("RABBITMQ__PRODUCER_BATCH_SIZE", 100)),
+			producer_batch_interval_ms=int(os.getenv("RABBITMQ__PRODUCER_BATCH_INTERVAL_MS", 5)),
+			publish_confirm_timeout=float(os.getenv("RABBITMQ__PUBLISH_CONFIRM_TIMEOUT", 5.0))
+		),
+		bid_book=BidBookConfig(
+			batch_size=int(os.getenv("BID_BOOK__BATCH_SIZE", 200)),
+			flush_interval_ms=int(os.getenv("BID_BOOK__FLUSH_INTERVAL_MS", 50)),
+			max_retries=int(os.getenv("BID_BOOK__MAX_RETRIES", 3)),
+			refresh_seconds=float(os.getenv("BID_BOOK__REFRESH_SECONDS", 5.0))
+		),
+		search=SearchConfig(
+			location_index_refresh_seconds=int(os.getenv("SEARCH__LOCATION_INDEX_REFRESH_SECONDS", 300)),
+			count_cache_seconds=int(os.getenv("SEARCH__COUNT_CACHE_SECONDS", 60)),
+			availability_refresh_seconds=int(os.getenv("SEARCH__AVAILABILITY_REFRESH_SECONDS", 3600)),
+			details_cache_entries=int(os.getenv("SEARCH__DETAILS_CACHE_ENTRIES", 1000)),
+			details_cache_local_seconds=int(os.getenv("SEARCH__DETAILS_CACHE_LOCAL_SECONDS", 30)),
+			details_cache_redis_seconds=int(os.getenv("SEARCH__DETAILS_CACHE_REDIS_SECONDS", 600)),
+			catalog_refresh_seconds=int(os.getenv("SEARCH__CATALOG_REFRESH_SECONDS", 30))
 		),
 		auth0=Auth0Config(
 			domain=os.getenv("AUTH0_DOMAIN", ""),
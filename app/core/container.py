@@ -3,7 +3,8 @@
 from dependency_injector import containers, providers
 from pusher import Pusher
 from app.features.messages.core.settings import get_settings
-from app.db.sessions.session import get_db_session, get_redis, get_rabbitmq_stream, get_async_db_session
+from app.db.sessions.session import get_db_session, get_redis, get_async_redis, get_rabbitmq_stream, get_async_db_session, SessionLocal
+from app.core.config import settings
 from app.db.repositories.bid_repository import BidRepository
 from app.db.repositories.auction_repository import AuctionRepository
 from app.features.messages.repositories.message_repository import MessageRepository
@@ -15,10 +16,11 @@ from app.features.property.repositories.property_repository import PropertyRepos
 from app.features.wishlist.repositories.wishlist_repository import WishlistRepository
 from app.features.notification.repositories.notification_repository import NotificationRepository
 from app.db.repositories.booking_repository import BookingRepository
-from app.db.repositories.redis_repository import RedisRepository
+from app.db.repositories.redis_repository import RedisRepository, AsyncRedisRepository
 from app.services.auction_service import AuctionService
 from app.services.booking_service import BookingService
 from app.services.bid_service import BidService
+from app.services.bid_book import BidBookService, BidBookWriter
 from app.features.messages.services.message_service import MessageService
 from app.features.messages.services.pusher_service import PusherService
 from app.features.property.services.property_service import PropertyService
@@ -63,6 +65,8 @@ class Container(containers.DeclarativeContainer):
     # Database
     db_session = providers.Resource(get_db_session)
     db_redis = providers.Resource(get_redis)
+    # One redis.asyncio pool per process, closed in the app lifespan
+    async_redis = providers.Singleton(get_async_redis)
     db_async_session = providers.Resource(get_async_db_session)
 
     # RabbitMQ
@@ -119,6 +123,11 @@ class Container(containers.DeclarativeContainer):
         redis_client=db_redis
     )
 
+    async_redis_repository = providers.Singleton(
+        AsyncRedisRepository,
+        redis_client=async_redis
+    )
+
     property_repository = providers.Factory(
         PropertyRepository,
         db=db_session,
@@ -144,10 +153,27 @@ class Container(containers.DeclarativeContainer):
         db=db_async_session
     )
 
+    # In-memory bid book, shared by every bid placed in this process
+    bid_book_writer = providers.Singleton(
+        BidBookWriter,
+        session_factory=providers.Object(SessionLocal),
+        batch_size=settings.bid_book.batch_size,
+        flush_interval_ms=settings.bid_book.flush_interval_ms,
+        max_retries=settings.bid_book.max_retries
+    )
+
+    bid_book = providers.Singleton(
+        BidBookService,
+        session_factory=providers.Object(SessionLocal),
+        writer=bid_book_writer,
+        refresh_seconds=settings.bid_book.refresh_seconds
+    )
+
     # Services
     bid_service = providers.Factory(
         BidService,
-        bid_repository=bid_repository
+        bid_repository=bid_repository,
+        bid_book=bid_book
     )
     
     auction_service = providers.Factory(
@@ -163,14 +189,15 @@ class Container(containers.DeclarativeContainer):
         pusher_service=pusher_service
     )
     
-    rabbitMQStream_service = providers.Factory(
+    # Singleton: holds the persistent stream producer opened in the app lifespan
+    rabbitMQStream_service = providers.Singleton(
         RabbitMQService,
         stream_property=rabbitmq_stream
     )
 
     redis_service = providers.Factory(
         RedisService,
-        redis_repository=redis_repository
+        redis_repository=async_redis_repository
     )
 
     property_service = providers.Factory(
@@ -229,6 +256,7 @@ class Container(containers.DeclarativeContainer):
         WinLoseService,
         auction_repository=auction_repository,
         bid_repository=bid_repository,
+        calendar_repository=calendar_repository
     )
     winner_service = providers.Factory(
         WinnerService,
@@ -5,9 +5,11 @@ from .property_type import PropertyType
 from .property_category import PropertyCategory
 from .property_image import PropertyImage
 from .property_amenity import PropertyAmenity
+from .property_availability import PropertyAvailability
 from .amenity import Amenity
 from .conversation import Conversation
 from .message import Message
+from .conversation_inbox import ConversationInbox
 from .wishlist import Wishlist
 from .wishlist_property import WishlistProperty
 from .auction import Auction
@@ -18,6 +20,7 @@ from .calendar_availability import CalendarAvailability
 from .second_chance_offer import SecondChanceOffer
 from .bid_event import BidEvent
 from .payment import PaymentSession, PaymentTransaction
+from .rating_summary import PropertyRatingSummary, HostRatingSummary
 
 __all__ = [
 	"User",
@@ -26,9 +29,11 @@ __all__ = [
 	"PropertyCategory",
 	"PropertyImage",
 	"PropertyAmenity",
+	"PropertyAvailability",
 	"Amenity",
 	"Conversation",
 	"Message",
+	"ConversationInbox",
 	"Wishlist",
 	"WishlistProperty",
 	"Auction",
@@ -42,4 +47,6 @@ __all__ = [
 	"BidEvent",
 	"PaymentSession",
 	"PaymentTransaction",
+	"PropertyRatingSummary",
+	"HostRatingSummary",
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, Date, String, UUID, func
+from sqlalchemy import Column, BigInteger, Integer, ForeignKey, Boolean, DateTime, Date, String, UUID, func
 from app.db.sessions.session import Base
 
 class CalendarAvailability(Base):
@@ -11,5 +11,7 @@ class CalendarAvailability(Base):
     is_available = Column(Boolean)
     bid_id = Column(String, ForeignKey("bids.id"), nullable=True)
     price_amount = Column(Integer, nullable=True)
+    # Sequence of the last bid book write, see V.0_0_16.sql
+    bid_seq = Column(BigInteger, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now())
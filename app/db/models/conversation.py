@@ -11,6 +11,10 @@ class Conversation(Base):
     guest_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     host_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     last_message_at = Column(DateTime)
+    # Newest message and per-participant read watermarks (V.0_0_13)
+    last_message_id = Column(BigInteger)
+    guest_last_read_message_id = Column(BigInteger, nullable=False, default=0)
+    host_last_read_message_id = Column(BigInteger, nullable=False, default=0)
     is_archived = Column(Boolean, default=False)
     created_at = Column(DateTime, default=lambda: datetime.now())
 
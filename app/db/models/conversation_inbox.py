@@ -0,0 +1,25 @@
+from sqlalchemy import Column, BigInteger, Boolean, DateTime, ForeignKey, Integer, String
+from app.db.sessions.session import Base
+
+# Length of last_message_preview
+PREVIEW_LENGTH = 140
+
+
+class ConversationInbox(Base):
+    """One participant's view of a conversation, maintained by the send and
+    mark-read statements of MessageRepository (V.0_0_14.sql)."""
+
+    __tablename__ = "conversation_inbox"
+
+    user_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    conversation_id = Column(BigInteger, ForeignKey("conversation.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(String(10), nullable=False)  # GUEST | HOST
+    other_user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+    property_id = Column(BigInteger)
+    is_archived = Column(Boolean, nullable=False, default=False)
+    conversation_created_at = Column(DateTime)
+    last_message_id = Column(BigInteger)
+    last_message_preview = Column(String(PREVIEW_LENGTH))
+    last_message_sender_id = Column(BigInteger)
+    last_message_at = Column(DateTime)
+    unread_count = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, BigInteger
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, BigInteger, Text, Computed
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.db.sessions.session import Base
 
@@ -36,6 +36,18 @@ class Property(Base):
     created_at = Column(DateTime, default=lambda: datetime.now())
     updated_at = Column(DateTime, default=lambda: datetime.now(), onupdate=lambda: datetime.now())
 
+    # Generated, trigram-indexed search documents (V.0_0_7.sql); deferred so they
+    # are only used in location predicates, never loaded with the row
+    location_search = deferred(Column(Text, Computed(
+        "lower(coalesce(city, '') || ' ' || coalesce(state, '') || ' ' || "
+        "coalesce(country, '') || ' ' || coalesce(address_line1, ''))",
+        persisted=True
+    )))
+    place_search = deferred(Column(Text, Computed(
+        "lower(coalesce(city, '') || ' ' || coalesce(state, '') || ' ' || coalesce(country, ''))",
+        persisted=True
+    )))
+
     # Relationships - using string references to avoid circular imports
     host = relationship("User", back_populates="properties")
     images = relationship("PropertyImage", back_populates="property")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import BIT
+from app.db.sessions.session import Base
+
+
+class PropertyAvailability(Base):
+    """Next 365 nights of a property from ``epoch``, bit set when the night is
+    available; maintained by calendar_availability triggers (V.0_0_8.sql,
+    moved off properties in V.0_0_15.sql)."""
+
+    __tablename__ = "property_availability"
+
+    property_id = Column(BigInteger, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    epoch = Column(Date, nullable=False)
+    bits = Column(BIT(365, varying=True), nullable=False)
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, BigInteger, Integer, Numeric, DateTime, ForeignKey, func
+from app.db.sessions.session import Base
+
+# Histogram buckets: reviews whose rating rounds to 1..5
+RATING_BUCKETS = (1, 2, 3, 4, 5)
+
+
+def rating_bucket(rating) -> int:
+    """Histogram bucket (1-5) a rating is counted in."""
+    return min(5, max(1, int(round(float(rating)))))
+
+
+class _RatingSummaryColumns:
+    """Running totals of visible reviews, maintained on review writes (V.0_0_9.sql)."""
+
+    rating_sum = Column(Numeric(12, 2), nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_1_count = Column(Integer, nullable=False, default=0)
+    rating_2_count = Column(Integer, nullable=False, default=0)
+    rating_3_count = Column(Integer, nullable=False, default=0)
+    rating_4_count = Column(Integer, nullable=False, default=0)
+    rating_5_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def average(self) -> float:
+        return float(self.rating_sum) / self.rating_count if self.rating_count else 0.0
+
+    @property
+    def histogram(self) -> dict:
+        return {bucket: getattr(self, f"rating_{bucket}_count") for bucket in RATING_BUCKETS}
+
+
+class PropertyRatingSummary(_RatingSummaryColumns, Base):
+    __tablename__ = "property_rating_summary"
+
+    property_id = Column(BigInteger, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+
+
+class HostRatingSummary(_RatingSummaryColumns, Base):
+    __tablename__ = "host_rating_summary"
+
+    host_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
@@ -5,6 +5,7 @@ from app.db.models.auction import Auction
 from app.schemas.AuctionDTO import AuctionCreateDTO
 import logging
 from app.db.models.auction import Auction
+from app.services.details_cache import details_cache
 logger = logging.getLogger(__name__)
 
 class AuctionRepository:
@@ -40,6 +41,7 @@ class AuctionRepository:
             self.db.add(new_auction)
             self.db.commit()
             self.db.refresh(new_auction)
+            details_cache.invalidate(new_auction.property_id)
             return new_auction
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -57,6 +59,10 @@ class AuctionRepository:
         """Get all auctions."""
         return self.db.query(Auction).all()
 
+    def get_auctions_by_status(self, statuses: List[str]) -> List[Auction]:
+        """Get all auctions whose status is one of the given values."""
+        return self.db.query(Auction).filter(Auction.status.in_(statuses)).all()
+
     def get_auctions_by_property(self, property_id: int) -> List[Auction]:
         """Get all auctions for a specific property."""
         return self.db.query(Auction).filter(Auction.property_id == property_id).all()
@@ -70,6 +76,7 @@ class AuctionRepository:
                     setattr(auction, key, value)
                 self.db.commit()
                 self.db.refresh(auction)
+                details_cache.invalidate(auction.property_id)
                 return auction
             return None
         except SQLAlchemyError as e:
@@ -85,6 +92,7 @@ class AuctionRepository:
                 auction.status = status
                 self.db.commit()
                 self.db.refresh(auction)
+                details_cache.invalidate(auction.property_id)
                 return auction
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -98,8 +106,10 @@ class AuctionRepository:
         try:
             auction = self.get_auction_by_id(auction_id)
             if auction:
+                property_id = auction.property_id
                 self.db.delete(auction)
                 self.db.commit()
+                details_cache.invalidate(property_id)
                 return True
             return False
         except SQLAlchemyError as e:
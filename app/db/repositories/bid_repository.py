@@ -2,8 +2,9 @@ from app.db.models.Bid import Bids
 from app.schemas.BidDTO import BidsDTO
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, List, Dict
 
 
 class BidRepository:
@@ -81,4 +82,36 @@ class BidRepository:
                 Bids.auction_id == auction_id,
                 Bids.status == 'ACTIVE'
             )
-        ).all()
\ No newline at end of file
+        ).all()
+
+    def get_active_bid_by_id(self, bid_id) -> Optional[Bids]:
+        """Get an ACTIVE bid by id"""
+        return self.db.query(Bids).filter(
+            and_(
+                Bids.id == bid_id,
+                Bids.status == 'ACTIVE'
+            )
+        ).first()
+
+    def bulk_upsert_bids(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert or update a batch of bids keyed by bid id in one statement.
+        Does not commit: the caller owns the transaction.
+        """
+        if not rows:
+            return
+        stmt = insert(Bids).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Bids.id],
+            set_={
+                "check_in": stmt.excluded.check_in,
+                "check_out": stmt.excluded.check_out,
+                "total_amount": stmt.excluded.total_amount,
+                "allow_partial": stmt.excluded.allow_partial,
+                "partial_awarded": stmt.excluded.partial_awarded,
+                "bid_time": stmt.excluded.bid_time,
+                "status": stmt.excluded.status,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        self.db.execute(stmt)
@@ -187,3 +187,35 @@ class CalendarRepository:
             print(f"Error updating calendar availability: {e}")
             self.db.rollback()
             return []
+
+    def get_calendar_by_auction(self, property_id: int, auction_id: str) -> list[type[CalendarAvailability]]:
+        """Get every calendar availability entry generated for an auction"""
+        return self.db.query(CalendarAvailability).filter(
+            and_(
+                CalendarAvailability.property_id == property_id,
+                CalendarAvailability.auction_id == uuid.UUID(auction_id)
+            )
+        ).all()
+
+    def bulk_update_nightly_prices(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Write the winning price and bid of many auction nights at once.
+        Each row needs property_id, auction_id, date, price_amount, bid_id and
+        bid_seq. A row only applies when its bid_seq is newer than the stored
+        one, so a delayed or retried write never overwrites a later winner.
+        Does not commit: the caller owns the transaction.
+        """
+        if not rows:
+            return
+        query = text("""
+            UPDATE calendar_availability
+            SET price_amount = :price_amount,
+                bid_id = :bid_id,
+                bid_seq = :bid_seq,
+                updated_at = now()
+            WHERE property_id = :property_id
+              AND auction_id = :auction_id
+              AND date = :date
+              AND bid_seq < :bid_seq
+        """)
+        self.db.execute(query, rows)
@@ -0,0 +1,55 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models.rating_summary import (
+    HostRatingSummary,
+    PropertyRatingSummary,
+    rating_bucket
+)
+
+
+class RatingSummaryRepository:
+    """Running rating totals per property and per host (one indexed row each)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_review(self, property_id: int, host_id: int, rating) -> None:
+        """Add one visible review to both summaries. Does not commit: the caller
+        commits it with the review so the totals never drift."""
+        bucket_column = f"rating_{rating_bucket(rating)}_count"
+        for model, key, key_value in (
+            (PropertyRatingSummary, "property_id", property_id),
+            (HostRatingSummary, "host_id", host_id),
+        ):
+            table = model.__table__
+            stmt = pg_insert(table).values(**{
+                key: key_value,
+                "rating_sum": rating,
+                "rating_count": 1,
+                bucket_column: 1,
+            })
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c[key]],
+                set_={
+                    "rating_sum": table.c.rating_sum + stmt.excluded.rating_sum,
+                    "rating_count": table.c.rating_count + 1,
+                    bucket_column: table.c[bucket_column] + 1,
+                    "updated_at": func.now(),
+                }
+            )
+            self.db.execute(stmt)
+
+    def get_property_summaries(self, property_ids: List[int]) -> Dict[int, PropertyRatingSummary]:
+        if not property_ids:
+            return {}
+        rows = self.db.query(PropertyRatingSummary).filter(
+            PropertyRatingSummary.property_id.in_(property_ids)
+        ).all()
+        return {int(row.property_id): row for row in rows}
+
+    def get_host_summary(self, host_id: int) -> Optional[HostRatingSummary]:
+        return self.db.get(HostRatingSummary, host_id)
@@ -27,3 +27,44 @@ class RedisRepository:
         """Publish a message to a Redis channel."""
         self.redis.publish(channel, message)
 
+
+
+class AsyncRedisRepository:
+    """redis.asyncio counterpart of RedisRepository, sharing one connection pool"""
+
+    def __init__(self, redis_client):
+        (self.redis,
+         self.max_retry,
+         self.expire) = redis_client
+
+    async def set(self, key, value, ex=None, nx=True):
+        """Set a value in Redis with an optional expiration time."""
+        return await self.redis.set(key, value, ex=ex, nx=nx)
+
+    async def get(self, key):
+        """Get a value from Redis."""
+        return await self.redis.get(key)
+
+    async def delete(self, key):
+        """Delete a key from Redis."""
+        await self.redis.delete(key)
+
+    async def exists(self, key):
+        """Check if a key exists in Redis."""
+        return await self.redis.exists(key)
+
+    async def publish(self, channel, message):
+        """Publish a message to a Redis channel."""
+        await self.redis.publish(channel, message)
+
+    def pubsub(self):
+        """A PubSub object on the shared pool (subscribe/listen/aclose)."""
+        return self.redis.pubsub()
+
+    def register_script(self, script: str):
+        """Register a Lua script; the returned callable runs it via EVALSHA."""
+        return self.redis.register_script(script)
+
+    async def close(self):
+        """Close the client and disconnect its connection pool."""
+        await self.redis.aclose()
@@ -8,6 +8,8 @@ from app.db.models.review import Review
 from app.schemas.ReviewDTO import ReviewResponseDTO, ReviewRequestDTO, CompleteReviewResponseDTO
 from fastapi import HTTPException
 from app.db.models.user import User
+from app.db.repositories.rating_summary_repository import RatingSummaryRepository
+from app.services.details_cache import details_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -133,8 +135,15 @@ class ReviewRepository:
             )
 
             self.db.add(new_review)
+            # Keep the property/host rating summaries in the same transaction
+            RatingSummaryRepository(self.db).record_review(
+                property_obj.id, property_obj.host_id, review_data.rating
+            )
             self.db.commit()
             self.db.refresh(new_review)
+            # Rating and host review count appear on every detail page of the host
+            host_property_ids = self.db.query(Property.id).filter(Property.host_id == property_obj.host_id).all()
+            details_cache.invalidate(*(row.id for row in host_property_ids))
 
             # Convert to CompleteReviewResponseDTO
             review_dto = CompleteReviewResponseDTO(
@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.core.config import get_settings
 import redis
+import redis.asyncio as aioredis
 from contextlib import asynccontextmanager
 
 # Define Base before importing models
@@ -62,6 +63,15 @@ def get_redis():
         yield r,max_try, lock_expire
     finally:
         r.close()
+def get_async_redis():
+    """Async Redis client on one shared connection pool (built once, see Container.async_redis)"""
+    pool = aioredis.ConnectionPool(
+        host=settings.redis_db.host,
+        port=settings.redis_db.port,
+        db=settings.redis_db.db,
+        max_connections=settings.redis_db.max_connections
+    )
+    return aioredis.Redis(connection_pool=pool), settings.redis_db.retry_count, settings.redis_db.lock_expire
 # RABBITMQ
 def get_rabbitmq_stream():
     """Get RabbitMQ stream configuration"""
@@ -71,5 +81,8 @@ def get_rabbitmq_stream():
         "username": settings.rabbit_mq.username,
         "password": settings.rabbit_mq.password,
         "stream_name": settings.rabbit_mq.stream_name,
-        "stream_retention": settings.rabbit_mq.stream_retention
+        "stream_retention": settings.rabbit_mq.stream_retention,
+        "producer_batch_size": settings.rabbit_mq.producer_batch_size,
+        "producer_batch_interval_ms": settings.rabbit_mq.producer_batch_interval_ms,
+        "publish_confirm_timeout": settings.rabbit_mq.publish_confirm_timeout
         }
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from app.features.messages.schemas.MessageDTO import MessageCreateDTO, MessageResponseDTO, MessageUpdateDTO
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from datetime import datetime
+from app.features.messages.schemas.MessageDTO import MessageCreateDTO, MessageResponseDTO, MessageUpdateDTO, MessagePageDTO
 from app.core.container import Container
 from dependency_injector.wiring import inject, Provide
 from app.features.messages.services.message_service import MessageService
@@ -52,6 +53,23 @@ async def get_messages(
     except Exception as e:
         raise HTTPException(status_code=500, detail={"detail": f"Internal server error: {str(e)}"})
 
+@router.get("/history/{conversation_id}", response_model=MessagePageDTO, operation_id="listMessageHistory")
+@inject
+async def get_message_history(
+    conversation_id: int,
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    before_id: Optional[int] = Query(None, description="next_before_id of the previous page"),
+    before_sent_at: Optional[datetime] = Query(None, description="next_before_sent_at of the previous page"),
+    message_service: MessageService = Depends(Provide[Container.message_service])
+):
+    try:
+        return message_service.get_message_history(conversation_id, user_id, limit, before_id, before_sent_at)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail={"detail": f"Internal server error: {str(e)}"})
+
 @router.put("/update/{message_id}", response_model=MessageResponseDTO, operation_id="updateMessageReadStatus")
 @inject
 async def update_message(
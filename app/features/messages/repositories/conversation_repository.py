@@ -4,6 +4,7 @@ from sqlalchemy import select, case, or_, func
 from sqlalchemy.orm import joinedload
 from app.features.messages.schemas.ConversationDTO import ConversationCreateDTO, ConversationResponseDTO
 from app.db.models.conversation import Conversation
+from app.db.models.conversation_inbox import ConversationInbox
 from app.db.models.user import User
 from app.db.models.property import Property
 from fastapi import HTTPException
@@ -21,6 +22,22 @@ class ConversationRepository:
             conversation = Conversation(**data.model_dump())
             conversation.is_archived = False
             self.db.add(conversation)
+            self.db.flush()
+            # Inbox rows of both participants, so the conversation is listed before its first message
+            participants = [(conversation.guest_id, "GUEST", conversation.host_id)]
+            if conversation.host_id != conversation.guest_id:
+                participants.append((conversation.host_id, "HOST", conversation.guest_id))
+            for user_id, role, other_user_id in participants:
+                self.db.add(ConversationInbox(
+                    user_id=user_id,
+                    conversation_id=conversation.id,
+                    role=role,
+                    other_user_id=other_user_id,
+                    property_id=conversation.property_id,
+                    is_archived=False,
+                    conversation_created_at=conversation.created_at,
+                    unread_count=0
+                ))
             self.db.commit()
             self.db.refresh(conversation)
             return ConversationResponseDTO.model_validate(conversation)
@@ -30,63 +47,54 @@ class ConversationRepository:
             raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
 
     def get_conversations_by_user(self, user_id: int) -> List[ConversationResponseDTO]:
-        """Get all conversations by user ID with property title and other user info."""
+        """Get a user's inbox: one conversation_inbox range scan, newest first, with
+        the other participant and the property title joined by primary key."""
         try:
             query = (
                 select(
-                    Conversation,
+                    ConversationInbox,
                     Property.title.label("property_title"),
-                    case(
-                        (Conversation.guest_id == user_id, User.full_name),
-                        else_=User.full_name
-                    ).label("other_user_full_name"),
-                    case(
-                        (Conversation.guest_id == user_id, User.id),
-                        else_=User.id
-                    ).label("other_user_id"),
-                    case(
-                        (Conversation.guest_id == user_id, User.username),
-                        else_=User.username
-                    ).label("other_user_username"),
-                    case(
-                        (Conversation.guest_id == user_id, User.email),
-                        else_=User.email
-                    ).label("other_user_email")
+                    User.username.label("other_user_username"),
+                    User.full_name.label("other_user_full_name"),
+                    User.email.label("other_user_email")
                 )
-                .outerjoin(Property, Conversation.property_id == Property.id)
-                .join(User, or_(Conversation.guest_id == User.id, Conversation.host_id == User.id))
-                .where(or_(Conversation.guest_id == user_id, Conversation.host_id == user_id))
-                .where(User.id != user_id)
-                .order_by(Conversation.last_message_at.desc().nulls_last())
-                .options(joinedload(Conversation.property))
+                .join(User, User.id == ConversationInbox.other_user_id)
+                .outerjoin(Property, Property.id == ConversationInbox.property_id)
+                .where(ConversationInbox.user_id == user_id)
+                .order_by(ConversationInbox.last_message_at.desc().nulls_last())
             )
             logger.debug(f"Thực thi truy vấn: {str(query)}")
-            result = self.db.execute(query).unique()
-            conversations = result.all()
+            conversations = self.db.execute(query).all()
 
             if not conversations:
                 logger.info(f"Không tìm thấy cuộc trò chuyện cho user_id {user_id}")
                 return []
 
-            return [
-                ConversationResponseDTO(
-                    id=conv.Conversation.id,
-                    property_id=conv.Conversation.property_id,
-                    guest_id=conv.Conversation.guest_id,
-                    host_id=conv.Conversation.host_id,
-                    last_message_at=conv.Conversation.last_message_at,
-                    is_archived=conv.Conversation.is_archived,
-                    created_at=conv.Conversation.created_at,
+            results = []
+            for conv in conversations:
+                inbox = conv.ConversationInbox
+                is_guest = inbox.role == "GUEST"
+                results.append(ConversationResponseDTO(
+                    id=inbox.conversation_id,
+                    property_id=inbox.property_id,
+                    guest_id=inbox.user_id if is_guest else inbox.other_user_id,
+                    host_id=inbox.other_user_id if is_guest else inbox.user_id,
+                    last_message_at=inbox.last_message_at,
+                    is_archived=inbox.is_archived,
+                    created_at=inbox.conversation_created_at,
                     name=conv.other_user_full_name,
                     property_title=conv.property_title,
                     other_user={
-                        "id": conv.other_user_id,
+                        "id": inbox.other_user_id,
                         "username": conv.other_user_username or "",
                         "full_name": conv.other_user_full_name or "",
                         "email": conv.other_user_email
-                    }
-                ) for conv in conversations
-            ]
+                    },
+                    unread_count=inbox.unread_count,
+                    last_message_preview=inbox.last_message_preview,
+                    last_message_sender_id=inbox.last_message_sender_id
+                ))
+            return results
         except Exception as e:
             logger.error(f"Lỗi khi lấy danh sách cuộc trò chuyện: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
@@ -1,56 +1,176 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_, update
-from app.features.messages.schemas.MessageDTO import MessageCreateDTO, MessageResponseDTO, MessageUpdateDTO
+from sqlalchemy import select, and_, or_, update, text, tuple_
+from app.features.messages.schemas.MessageDTO import MessageCreateDTO, MessageResponseDTO, MessageUpdateDTO, ReadReceiptDTO
 from app.db.models.message import Message
+from app.db.models.conversation import Conversation
 from app.db.models.user import User
 from fastapi import HTTPException
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Membership check, last_message_at/last_message_id bump, inbox upsert and
+# insert in one statement (data-modifying CTEs must sit at the top level, hence
+# plain SQL). The message id is drawn first so the conversation and inbox rows
+# can record it. Ids are drawn before the conversation row is locked, so two
+# concurrent sends may commit out of id order: GREATEST keeps the newest.
+# sent_at and last_message_at both come from the database clock (one value per
+# transaction), so message order and inbox order agree.
+# Both participants' inbox rows get the preview unless they already show a
+# newer message; the recipient's unread_count always goes up by one.
+SEND_MESSAGE_SQL = text("""
+    WITH new_message AS (
+        SELECT nextval(pg_get_serial_sequence('message', 'id')) AS id
+    ),
+    conversation_bump AS (
+        UPDATE conversation
+        SET last_message_at = GREATEST(last_message_at, LOCALTIMESTAMP),
+            last_message_id = GREATEST(coalesce(last_message_id, 0), (SELECT id FROM new_message))
+        WHERE id = :conversation_id
+          AND (guest_id = :sender_id OR host_id = :sender_id)
+        RETURNING id, guest_id, host_id, property_id, is_archived, created_at, last_message_at
+    ),
+    inbox_bump AS (
+        INSERT INTO conversation_inbox AS i (
+            user_id, conversation_id, role, other_user_id, property_id, is_archived,
+            conversation_created_at, last_message_id, last_message_preview,
+            last_message_sender_id, last_message_at, unread_count
+        )
+        SELECT p.user_id, c.id, p.role, p.other_user_id, c.property_id, coalesce(c.is_archived, false),
+               c.created_at, (SELECT id FROM new_message), left(:message_text, 140),
+               :sender_id, c.last_message_at, CASE WHEN p.user_id = :sender_id THEN 0 ELSE 1 END
+        FROM conversation_bump c
+        CROSS JOIN LATERAL (VALUES
+            (c.guest_id, 'GUEST', c.host_id),
+            (c.host_id, 'HOST', c.guest_id)
+        ) AS p(user_id, role, other_user_id)
+        WHERE NOT (p.role = 'HOST' AND c.guest_id = c.host_id)
+        ON CONFLICT (user_id, conversation_id) DO UPDATE
+        SET last_message_id = CASE WHEN EXCLUDED.last_message_id > coalesce(i.last_message_id, 0)
+                THEN EXCLUDED.last_message_id ELSE i.last_message_id END,
+            last_message_preview = CASE WHEN EXCLUDED.last_message_id > coalesce(i.last_message_id, 0)
+                THEN EXCLUDED.last_message_preview ELSE i.last_message_preview END,
+            last_message_sender_id = CASE WHEN EXCLUDED.last_message_id > coalesce(i.last_message_id, 0)
+                THEN EXCLUDED.last_message_sender_id ELSE i.last_message_sender_id END,
+            last_message_at = CASE WHEN EXCLUDED.last_message_id > coalesce(i.last_message_id, 0)
+                THEN EXCLUDED.last_message_at ELSE i.last_message_at END,
+            unread_count = i.unread_count + EXCLUDED.unread_count
+    )
+    INSERT INTO message (id, conversation_id, sender_id, message_text, sent_at, is_read)
+    SELECT (SELECT id FROM new_message), id, :sender_id, :message_text, LOCALTIMESTAMP, false
+    FROM conversation_bump
+    RETURNING id, conversation_id, sender_id, message_text, is_read, sent_at
+""")
+
+# Move the reader's watermark to the conversation's newest message and zero
+# their inbox unread_count: one conversation row and one inbox row, whatever
+# the number of unread messages. No row when nothing new was unread.
+MARK_READ_SQL = text("""
+    WITH marked AS (
+        UPDATE conversation
+        SET guest_last_read_message_id = CASE WHEN guest_id = :user_id
+                THEN last_message_id ELSE guest_last_read_message_id END,
+            host_last_read_message_id = CASE WHEN host_id = :user_id
+                THEN last_message_id ELSE host_last_read_message_id END
+        WHERE id = :conversation_id
+          AND last_message_id IS NOT NULL
+          AND ((guest_id = :user_id AND guest_last_read_message_id < last_message_id)
+            OR (host_id = :user_id AND host_last_read_message_id < last_message_id))
+        RETURNING id, last_message_id
+    ),
+    inbox_read AS (
+        UPDATE conversation_inbox i
+        SET unread_count = 0
+        FROM marked
+        WHERE i.user_id = :user_id
+          AND i.conversation_id = marked.id
+    )
+    SELECT last_message_id FROM marked
+""")
+
+# Single-message read flag flips move the recipient's unread_count by one
+ADJUST_UNREAD_SQL = text("""
+    UPDATE conversation_inbox
+    SET unread_count = GREATEST(unread_count + :delta, 0)
+    WHERE conversation_id = :conversation_id
+      AND user_id <> :sender_id
+""")
+
 class MessageRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_message(self, data: MessageCreateDTO) -> MessageResponseDTO:
-        """Create a new message."""
+    def send_message(self, data: MessageCreateDTO, sender: Dict) -> Optional[MessageResponseDTO]:
+        """Insert a message in one statement: the CTE bumps last_message_at only if
+        the sender belongs to the conversation, and the INSERT ... RETURNING reads
+        from it, so a non-member inserts nothing. Returns None in that case."""
         try:
-            # Exclude mark_as_read from the data passed to the Message model
-            message_data = data.model_dump(exclude={'mark_as_read'})
-            message = Message(**message_data)
-            self.db.add(message)
+            row = self.db.execute(SEND_MESSAGE_SQL, {
+                "conversation_id": data.conversation_id,
+                "sender_id": data.sender_id,
+                "message_text": data.message_text
+            }).one_or_none()
             self.db.commit()
-            self.db.refresh(message)
-            
-            # Fetch sender details
-            sender = self.db.execute(select(User).where(User.id == message.sender_id)).scalar_one_or_none()
-            if not sender:
-                logger.error(f"Không tìm thấy người gửi với ID {message.sender_id}")
-                raise HTTPException(status_code=404, detail="Không tìm thấy người gửi")
-            
+            if row is None:
+                return None
             return MessageResponseDTO(
-                id=message.id,
-                conversation_id=message.conversation_id,
-                sender_id=message.sender_id,
-                message_text=message.message_text,
-                is_read=message.is_read,
-                sent_at=message.sent_at,
-                sender={
-                    "id": sender.id,
-                    "username": sender.username or "",
-                    "full_name": sender.full_name or "",
-                    "email": sender.email
-                }
+                id=row.id,
+                conversation_id=row.conversation_id,
+                sender_id=row.sender_id,
+                message_text=row.message_text,
+                is_read=row.is_read,
+                sent_at=row.sent_at,
+                sender=sender
             )
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Lỗi khi tạo tin nhắn: {str(e)}")
+            logger.error(f"Lỗi khi gửi tin nhắn: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
 
+    def get_sender_profile(self, user_id: int) -> Optional[Dict]:
+        """Sender block embedded in MessageResponseDTO, or None if the user does not exist."""
+        user = self.db.execute(
+            select(User.id, User.username, User.full_name, User.email).where(User.id == user_id)
+        ).one_or_none()
+        if user is None:
+            return None
+        return {
+            "id": user.id,
+            "username": user.username or "",
+            "full_name": user.full_name or "",
+            "email": user.email
+        }
+
+    def get_read_state(self, conversation_id: int):
+        """Participants and read watermarks of a conversation (one primary-key row)."""
+        return self.db.execute(
+            select(
+                Conversation.guest_id,
+                Conversation.host_id,
+                Conversation.guest_last_read_message_id,
+                Conversation.host_last_read_message_id
+            ).where(Conversation.id == conversation_id)
+        ).one_or_none()
+
+    @staticmethod
+    def is_read_by_recipient(message_id: int, sender_id: int, is_read: Optional[bool], read_state) -> bool:
+        """Read flag of a message, or covered by the other participant's watermark."""
+        if is_read:
+            return True
+        if read_state is None:
+            return False
+        if sender_id == read_state.guest_id:
+            watermark = read_state.host_last_read_message_id
+        else:
+            watermark = read_state.guest_last_read_message_id
+        return message_id <= (watermark or 0)
+
     def get_messages(self, conversation_id: int, limit: int, offset: int) -> List[MessageResponseDTO]:
         """Get messages by conversation ID."""
         try:
+            read_state = self.get_read_state(conversation_id)
             query = (
                 select(Message, User)
                 .join(User, Message.sender_id == User.id)
@@ -67,7 +187,9 @@ class MessageRepository:
                     conversation_id=msg.Message.conversation_id,
                     sender_id=msg.Message.sender_id,
                     message_text=msg.Message.message_text,
-                    is_read=msg.Message.is_read,
+                    is_read=self.is_read_by_recipient(
+                        msg.Message.id, msg.Message.sender_id, msg.Message.is_read, read_state
+                    ),
                     sent_at=msg.Message.sent_at,
                     sender={
                         "id": msg.User.id,
@@ -81,6 +203,37 @@ class MessageRepository:
             logger.error(f"Lỗi khi lấy tin nhắn: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
 
+    def get_message_page(
+        self,
+        conversation_id: int,
+        limit: int,
+        before_sent_at: Optional[datetime] = None,
+        before_id: Optional[int] = None
+    ) -> Tuple[List[Message], bool]:
+        """Newest messages older than the (before_sent_at, before_id) cursor, newest first.
+
+        Keyset on idx_message_conversation_sent_at: the cost does not grow with
+        how far back the page is. With only before_id, its sent_at is looked up.
+        Returns the page and whether older messages exist.
+        """
+        try:
+            query = select(Message).where(Message.conversation_id == conversation_id)
+            if before_id is not None:
+                if before_sent_at is None:
+                    before_sent_at = (
+                        select(Message.sent_at).where(Message.id == before_id).scalar_subquery()
+                    )
+                query = query.where(tuple_(Message.sent_at, Message.id) < tuple_(before_sent_at, before_id))
+            elif before_sent_at is not None:
+                query = query.where(Message.sent_at < before_sent_at)
+            messages = self.db.execute(
+                query.order_by(Message.sent_at.desc(), Message.id.desc()).limit(limit + 1)
+            ).scalars().all()
+            return messages[:limit], len(messages) > limit
+        except Exception as e:
+            logger.error(f"Lỗi khi lấy tin nhắn: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
+
     def update_message(self, message_id: int, data: MessageUpdateDTO) -> Optional[MessageResponseDTO]:
         """Update a message's read status."""
         try:
@@ -90,7 +243,15 @@ class MessageRepository:
             if not message:
                 return None
             
-            if data.is_read is not None:
+            if data.is_read is not None and bool(data.is_read) != bool(message.is_read):
+                read_state = self.get_read_state(message.conversation_id)
+                # Messages under the recipient's watermark are not in their unread count
+                if not self.is_read_by_recipient(message.id, message.sender_id, False, read_state):
+                    self.db.execute(ADJUST_UNREAD_SQL, {
+                        "conversation_id": message.conversation_id,
+                        "sender_id": message.sender_id,
+                        "delta": -1 if data.is_read else 1
+                    })
                 message.is_read = data.is_read
             
             self.db.commit()
@@ -130,48 +291,25 @@ class MessageRepository:
         ).scalar_one_or_none()
         return bool(conversation)
 
-    def mark_messages_as_read(self, conversation_id: int, user_id: int) -> List[MessageResponseDTO]:
-        """Mark all unread messages in a conversation as read for a user."""
-        try:
-            messages = self.db.execute(
-                select(Message)
-                .where(Message.conversation_id == conversation_id)
-                .where(Message.sender_id != user_id)
-                .where(Message.is_read == False)
-            ).scalars().all()
-
-            if not messages:
-                return []
-
-            for message in messages:
-                message.is_read = True
+    def mark_messages_as_read(self, conversation_id: int, user_id: int) -> Optional[ReadReceiptDTO]:
+        """Mark everything in a conversation read for a user by moving their watermark.
 
+        Returns the receipt to broadcast, or None if nothing new was unread.
+        """
+        try:
+            last_read_message_id = self.db.execute(MARK_READ_SQL, {
+                "conversation_id": conversation_id,
+                "user_id": user_id
+            }).scalar_one_or_none()
             self.db.commit()
-
-            updated_messages = []
-            for message in messages:
-                sender = self.db.execute(select(User).where(User.id == message.sender_id)).scalar_one_or_none()
-                if not sender:
-                    logger.error(f"Không tìm thấy người gửi với ID {message.sender_id}")
-                    continue
-                updated_messages.append(
-                    MessageResponseDTO(
-                        id=message.id,
-                        conversation_id=message.conversation_id,
-                        sender_id=message.sender_id,
-                        message_text=message.message_text,
-                        is_read=message.is_read,
-                        sent_at=message.sent_at,
-                        sender={
-                            "id": sender.id,
-                            "username": sender.username or "",
-                            "full_name": sender.full_name or "",
-                            "email": sender.email
-                        }
-                    )
-                )
-            return updated_messages
+            if last_read_message_id is None:
+                return None
+            return ReadReceiptDTO(
+                conversation_id=conversation_id,
+                reader_id=user_id,
+                last_read_message_id=last_read_message_id
+            )
         except Exception as e:
             self.db.rollback()
             logger.error(f"Lỗi khi đánh dấu tin nhắn đã đọc: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
@@ -18,6 +18,10 @@ class ConversationResponseDTO(BaseModel):
     created_at: datetime
     property_title: Optional[str] = None
     other_user: Optional[Dict] = None
+    # Per-user inbox fields (conversation_inbox), filled by get_conversations_by_user
+    unread_count: int = 0
+    last_message_preview: Optional[str] = None
+    last_message_sender_id: Optional[int] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 class MessageCreateDTO(BaseModel):
     conversation_id: int
@@ -21,4 +21,33 @@ class MessageResponseDTO(BaseModel):
     sender: Dict
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ReadReceiptDTO(BaseModel):
+    """Compact messages-read event: every message of the conversation not sent by
+    reader_id with id <= last_read_message_id is read, plus any message_ids."""
+    conversation_id: int
+    reader_id: Optional[int] = None
+    last_read_message_id: Optional[int] = None
+    message_ids: List[int] = []
+
+class MessageItemDTO(BaseModel):
+    """A message of a history page; its sender is in MessagePageDTO.participants."""
+    id: int
+    conversation_id: int
+    sender_id: int
+    message_text: str
+    is_read: bool
+    sent_at: datetime
+
+class MessagePageDTO(BaseModel):
+    """One page of conversation history, oldest first.
+
+    Pass next_before_id / next_before_sent_at back as before_id / before_sent_at
+    to load the older page.
+    """
+    messages: List[MessageItemDTO]
+    participants: Dict[int, Dict]
+    has_more: bool
+    next_before_id: Optional[int] = None
+    next_before_sent_at: Optional[datetime] = None
\ No newline at end of file
@@ -1,11 +1,13 @@
 from typing import Optional, List
+from datetime import datetime
 from fastapi import HTTPException
 import logging
-from app.features.messages.schemas.MessageDTO import MessageCreateDTO, MessageResponseDTO, MessageUpdateDTO
+from app.features.messages.schemas.MessageDTO import MessageCreateDTO, MessageResponseDTO, MessageUpdateDTO, MessageItemDTO, MessagePageDTO, ReadReceiptDTO
 from app.features.messages.schemas.ConversationDTO import ConversationCreateDTO, ConversationResponseDTO
 from app.features.messages.repositories.message_repository import MessageRepository
 from app.features.messages.repositories.conversation_repository import ConversationRepository
 from app.features.messages.services.pusher_service import PusherService
+from app.features.messages.services.sender_profile_cache import sender_profiles
 
 logger = logging.getLogger(__name__)
 
@@ -22,23 +24,20 @@ class MessageService:
                 logger.warning("Yêu cầu message_text để gửi tin nhắn")
                 raise HTTPException(status_code=400, detail="Yêu cầu message_text để gửi tin nhắn")
 
-            # Kiểm tra user_id và conversation_id
-            if not self.message_repository.validate_sender_and_conversation(data.sender_id, data.conversation_id):
+            # Hồ sơ người gửi từ cache (chỉ truy vấn khi chưa có)
+            sender = sender_profiles.get(data.sender_id, self.message_repository.get_sender_profile)
+            if sender is None:
+                logger.error(f"Không tìm thấy người gửi với ID {data.sender_id}")
+                raise HTTPException(status_code=404, detail="Không tìm thấy người gửi")
+
+            # Kiểm tra thành viên, cập nhật last_message_at và tạo tin nhắn trong một câu lệnh
+            message = self.message_repository.send_message(data, sender)
+            if message is None:
                 logger.warning(f"sender_id {data.sender_id} không thuộc conversation_id {data.conversation_id}")
                 raise HTTPException(status_code=403, detail="Người dùng không thuộc cuộc trò chuyện")
 
-            # Tạo tin nhắn
-            message = self.message_repository.create_message(data)
-
-            # Cập nhật last_message_at
-            self.conversation_repository.update_last_message_at(data.conversation_id)
-
-            # Gửi sự kiện new-message qua Pusher
-            try:
-                logger.info(f"Gửi sự kiện new-message cho conversation-{data.conversation_id}")
-                self.pusher_service.trigger_new_message(data.conversation_id, message)
-            except Exception as e:
-                logger.error(f"Lỗi gửi sự kiện Pusher: {str(e)}")
+            # Gửi sự kiện new-message qua Pusher sau khi commit, không chờ
+            self.pusher_service.trigger_new_message_async(data.conversation_id, message)
 
             return message
         except HTTPException as e:
@@ -54,14 +53,14 @@ class MessageService:
                 if not self.conversation_repository.validate_user_in_conversation(data.sender_id, data.conversation_id):
                     logger.warning(f"sender_id {data.sender_id} không thuộc conversation_id {data.conversation_id}")
                     raise HTTPException(status_code=403, detail="Người dùng không thuộc cuộc trò chuyện")
-                updated_messages = self.message_repository.mark_messages_as_read(data.conversation_id, data.sender_id)
-                if updated_messages:
+                receipt = self.message_repository.mark_messages_as_read(data.conversation_id, data.sender_id)
+                if receipt:
                     try:
                         logger.info(f"Gửi sự kiện messages-read cho conversation-{data.conversation_id}")
-                        self.pusher_service.trigger_messages_read(data.conversation_id, updated_messages)
+                        self.pusher_service.trigger_messages_read(data.conversation_id, receipt)
                     except Exception as e:
                         logger.error(f"Lỗi gửi sự kiện Pusher: {str(e)}")
-                return {"success": True, "updatedMessages": updated_messages}
+                return {"success": True, "readReceipt": receipt.model_dump(mode="json") if receipt else None}
             return self.create_message(data)
         except HTTPException as e:
             raise e
@@ -81,11 +80,11 @@ class MessageService:
             messages = self.message_repository.get_messages(conversation_id, limit, offset)
 
             # Cập nhật trạng thái đọc và gửi sự kiện Pusher
-            updated_messages = self.message_repository.mark_messages_as_read(conversation_id, user_id)
-            if updated_messages:
+            receipt = self.message_repository.mark_messages_as_read(conversation_id, user_id)
+            if receipt:
                 try:
                     logger.info(f"Gửi sự kiện messages-read qua Pusher cho conversation-{conversation_id}")
-                    self.pusher_service.trigger_messages_read(conversation_id, updated_messages)
+                    self.pusher_service.trigger_messages_read(conversation_id, receipt)
                 except Exception as e:
                     logger.error(f"Lỗi gửi sự kiện Pusher: {str(e)}")
 
@@ -95,6 +94,73 @@ class MessageService:
             logger.error(f"Lỗi không mong muốn: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
 
+    def get_message_history(
+        self,
+        conversation_id: int,
+        user_id: int,
+        limit: int,
+        before_id: Optional[int] = None,
+        before_sent_at: Optional[datetime] = None
+    ) -> MessagePageDTO:
+        logger.info(f"Nhận yêu cầu lấy lịch sử tin nhắn: conversation_id={conversation_id}, user_id={user_id}, limit={limit}, before_id={before_id}")
+        try:
+            if not self.conversation_repository.validate_user_in_conversation(user_id, conversation_id):
+                logger.info(f"Không tìm thấy user_id {user_id} trong conversation_id {conversation_id}")
+                return MessagePageDTO(messages=[], participants={}, has_more=False)
+
+            messages, has_more = self.message_repository.get_message_page(
+                conversation_id, limit, before_sent_at, before_id
+            )
+            read_state = self.message_repository.get_read_state(conversation_id)
+
+            # Đảo ngược để trả về theo thứ tự thời gian
+            items = [
+                MessageItemDTO(
+                    id=message.id,
+                    conversation_id=message.conversation_id,
+                    sender_id=message.sender_id,
+                    message_text=message.message_text or "",
+                    is_read=self.message_repository.is_read_by_recipient(
+                        message.id, message.sender_id, message.is_read, read_state
+                    ),
+                    sent_at=message.sent_at
+                ) for message in reversed(messages)
+            ]
+
+            # Mỗi người gửi chỉ xuất hiện một lần trong trang
+            participants = {}
+            for sender_id in {item.sender_id for item in items}:
+                profile = sender_profiles.get(sender_id, self.message_repository.get_sender_profile)
+                if profile is not None:
+                    participants[sender_id] = profile
+
+            # Chỉ trang mới nhất mới đánh dấu đã đọc
+            if before_id is None and before_sent_at is None:
+                receipt = self.message_repository.mark_messages_as_read(conversation_id, user_id)
+                if receipt:
+                    try:
+                        logger.info(f"Gửi sự kiện messages-read qua Pusher cho conversation-{conversation_id}")
+                        self.pusher_service.trigger_messages_read(conversation_id, receipt)
+                    except Exception as e:
+                        logger.error(f"Lỗi gửi sự kiện Pusher: {str(e)}")
+                    for item in items:
+                        if item.sender_id != user_id and item.id <= receipt.last_read_message_id:
+                            item.is_read = True
+
+            oldest = items[0] if items else None
+            return MessagePageDTO(
+                messages=items,
+                participants=participants,
+                has_more=has_more,
+                next_before_id=oldest.id if has_more else None,
+                next_before_sent_at=oldest.sent_at if has_more else None
+            )
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            logger.error(f"Lỗi không mong muốn: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Lỗi máy chủ nội bộ: {str(e)}")
+
     def create_conversation(self, data: ConversationCreateDTO) -> ConversationResponseDTO:
         logger.info(f"Tạo cuộc trò chuyện: host_id={data.host_id}, guest_id={data.guest_id}, property_id={data.property_id}")
         try:
@@ -151,11 +217,14 @@ class MessageService:
         logger.info(f"Nhận yêu cầu cập nhật tin nhắn: message_id={message_id}, data={data.model_dump()}")
         try:
             message = self.message_repository.update_message(message_id, data)
-            if message:
+            if message and message.is_read:
                 # Gửi sự kiện messages-read qua Pusher
                 try:
                     logger.info(f"Gửi sự kiện messages-read qua Pusher cho conversation-{message.conversation_id}")
-                    self.pusher_service.trigger_messages_read(message.conversation_id, [message])
+                    self.pusher_service.trigger_messages_read(
+                        message.conversation_id,
+                        ReadReceiptDTO(conversation_id=message.conversation_id, message_ids=[message.id])
+                    )
                 except Exception as e:
                     logger.error(f"Lỗi gửi sự kiện Pusher: {str(e)}")
             return message
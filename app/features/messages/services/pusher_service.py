@@ -1,13 +1,28 @@
 from pusher import Pusher
 from app.features.messages.schemas.PusherDTO import PusherConfigResponse
-from app.features.messages.schemas.MessageDTO import MessageResponseDTO
+from app.features.messages.schemas.MessageDTO import MessageResponseDTO, ReadReceiptDTO
 from app.features.messages.core.settings import get_settings
 from fastapi import HTTPException
 import logging
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Events are sent after commit off the request path. Each conversation always
+# maps to the same single-thread executor, so its events keep their order.
+_DISPATCH_LANES = 4
+_dispatchers = [
+    ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"pusher-{lane}")
+    for lane in range(_DISPATCH_LANES)
+]
+
+
+def shutdown_dispatchers() -> None:
+    """Send the queued events and stop the dispatch threads."""
+    for dispatcher in _dispatchers:
+        dispatcher.shutdown(wait=True)
+
 class PusherService:
     def __init__(self, pusher: Pusher):
         self.pusher = pusher
@@ -34,12 +49,24 @@ class PusherService:
             logger.error(f"Lỗi gửi sự kiện new-message: {str(e)}")
             raise e
 
-    def trigger_messages_read(self, conversation_id: int, messages: List[MessageResponseDTO]) -> None:
+    def trigger_new_message_async(self, conversation_id: int, message: MessageResponseDTO) -> None:
+        """Queue the new-message event; errors are logged, never raised to the sender."""
+        payload = message.model_dump(mode='json')
+        _dispatchers[conversation_id % _DISPATCH_LANES].submit(
+            self._trigger_logged, f"conversation-{conversation_id}", "new-message", payload
+        )
+
+    def _trigger_logged(self, channel: str, event: str, payload) -> None:
+        try:
+            self.pusher.trigger(channel, event, payload)
+        except Exception as e:
+            logger.error(f"Lỗi gửi sự kiện {event} cho {channel}: {str(e)}")
+
+    def trigger_messages_read(self, conversation_id: int, receipt: ReadReceiptDTO) -> None:
         try:
             logger.info(f"Gửi sự kiện messages-read cho conversation-{conversation_id}")
-            # Serialize each message with mode='json' to handle datetime fields
-            message_list = [msg.model_dump(mode='json') for msg in messages]
-            self.pusher.trigger(f"conversation-{conversation_id}", "messages-read", message_list)
+            # Watermark/ids only: the client already has the message bodies
+            self.pusher.trigger(f"conversation-{conversation_id}", "messages-read", receipt.model_dump(mode='json'))
         except Exception as e:
             logger.error(f"Lỗi gửi sự kiện messages-read: {str(e)}")
             raise e
\ No newline at end of file
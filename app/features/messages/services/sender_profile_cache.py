@@ -0,0 +1,43 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+class SenderProfileCache:
+    """Sender block of MessageResponseDTO (id, username, full_name, email) per user.
+
+    Every sent message embeds its sender's profile; profiles change rarely, so
+    they are kept in a small in-process LRU with a TTL instead of selecting the
+    User row on every send. Profile writes call ``invalidate``.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, loader: Callable[[int], Optional[Dict]]) -> Optional[Dict]:
+        """Cached profile of ``user_id``; ``loader`` reads it on a miss (None if no such user)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+        profile = loader(user_id)
+        if profile is not None:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, profile)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return profile
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+sender_profiles = SenderProfileCache()
@@ -1,2 +1,15 @@
 VAPID_PUBLIC_KEY = "BBnYzZ-ESqQepGBq7gOaoNteF2V3PBtAUIvS5IjIR9YpEuLfitdJh1Qz52djvRqAXoHdOWZd36ZZRNs2sxRrarI"
-VAPID_PRIVATE_KEY = "yTdUoQwVvhxMwBUdHaZnHINisvttMAzHImmV7cuy31U"
\ No newline at end of file
+VAPID_PRIVATE_KEY = "yTdUoQwVvhxMwBUdHaZnHINisvttMAzHImmV7cuy31U"
+VAPID_SUBJECT = "mailto:support@example.com"
+
+# Web push delivery (services/push_dispatcher.py)
+PUSH_WORKERS = 4
+PUSH_QUEUE_SIZE = 10000
+PUSH_TIMEOUT_SECONDS = 10
+PUSH_TTL_SECONDS = 0
+PUSH_MAX_ATTEMPTS = 4
+PUSH_BACKOFF_SECONDS = 2
+PUSH_BACKOFF_MAX_SECONDS = 60
+# Dead (404/410) subscriptions are deleted in one statement per batch
+PUSH_DEAD_BATCH_SIZE = 100
+PUSH_DEAD_FLUSH_SECONDS = 5
@@ -1,12 +1,11 @@
 from fastapi import HTTPException
-from sqlalchemy import select, delete
+from sqlalchemy import select
 from app.features.notification.repositories.notification_repository import NotificationRepository
 from app.features.notification.schemas.NotificationDTO import NotificationDTO, NotificationResponse
 from app.features.notification.schemas.SubscriptionDTO import SubscriptionDTO
 from app.db.models.subscription import Subscription
 from typing import List, Tuple
-from pywebpush import webpush, WebPushException
-from app.features.notification.core.config import VAPID_PRIVATE_KEY
+from app.features.notification.services.push_dispatcher import PushJob, push_dispatcher
 import json
 import logging
 
@@ -26,54 +25,34 @@ class NotificationService:
             logger.error(f"Failed to save notification: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to save notification: {str(e)}")
 
-    async def send_push_notification(self, notification: NotificationResponse):
+    async def send_push_notification(self, notification: NotificationResponse) -> int:
+        """Queue the push for every subscription of the user and return at once;
+        delivery, retries and dead-subscription cleanup run on push_dispatcher."""
         try:
             # Retrieve all subscriptions for the user
             subscriptions = self.repo.db.execute(
-                select(Subscription).where(Subscription.user_id == notification.user_id)
-            ).scalars().all()
+                select(Subscription.id, Subscription.endpoint, Subscription.p256dh, Subscription.auth)
+                .where(Subscription.user_id == notification.user_id)
+            ).all()
 
             if not subscriptions:
                 logger.warning(f"No subscriptions found for user_id: {notification.user_id}")
-                return
+                return 0
 
-            # Prepare the push notification payload
-            payload = {
+            # Prepare the push notification payload (encoded once for all endpoints)
+            payload = json.dumps({
                 "title": notification.title,
                 "body": notification.message,
                 "icon": "/images/logo.png",
                 "url": notification.link or "/dashboard/notifications"
-            }
-
-            # Send push notification to each subscription
-            for subscription in subscriptions:
-                subscription_info = {
-                    "endpoint": subscription.endpoint,
-                    "keys": {
-                        "p256dh": subscription.p256dh,
-                        "auth": subscription.auth
-                    }
-                }
-                try:
-                    webpush(
-                        subscription_info=subscription_info,
-                        data=json.dumps(payload),
-                        vapid_private_key=VAPID_PRIVATE_KEY,
-                        vapid_claims={"sub": "mailto:support@example.com"}
-                    )
-                    logger.info(f"Push notification sent to endpoint: {subscription.endpoint}")
-                except WebPushException as e:
-                    logger.error(f"Failed to send push notification to {subscription.endpoint}: {str(e)}")
-                    if e.response and e.response.status_code in [404, 410]:
-                        # Subscription is no longer valid, delete it
-                        await self.repo.db.execute(
-                            delete(Subscription).where(Subscription.id == subscription.id)
-                        )
-                        self.repo.db.commit()
-                        logger.info(f"Deleted invalid subscription: {subscription.id}")
+            })
 
+            return push_dispatcher.submit(
+                PushJob(subscription.id, subscription.endpoint, subscription.p256dh, subscription.auth, payload)
+                for subscription in subscriptions
+            )
         except Exception as e:
-            logger.error(f"Error sending push notification: {str(e)}")
+            logger.error(f"Error queueing push notification: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to send push notification: {str(e)}")
 
     async def get_notifications(self, user_id: int, page: int, limit: int) -> Tuple[List[NotificationResponse], dict]:
@@ -0,0 +1,293 @@
+"""Background web push delivery: queue, worker threads, retries and dead-subscription cleanup."""
+
+import heapq
+import itertools
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from py_vapid import Vapid
+from pywebpush import WebPusher
+from sqlalchemy import delete
+
+from app.db.models.subscription import Subscription
+from app.db.sessions.session import SessionLocal
+from app.features.notification.core.config import (
+    VAPID_PRIVATE_KEY,
+    VAPID_SUBJECT,
+    PUSH_WORKERS,
+    PUSH_QUEUE_SIZE,
+    PUSH_TIMEOUT_SECONDS,
+    PUSH_TTL_SECONDS,
+    PUSH_MAX_ATTEMPTS,
+    PUSH_BACKOFF_SECONDS,
+    PUSH_BACKOFF_MAX_SECONDS,
+    PUSH_DEAD_BATCH_SIZE,
+    PUSH_DEAD_FLUSH_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Push services answer these for subscriptions that will never work again
+DEAD_STATUSES = (404, 410)
+
+
+class PushJob(NamedTuple):
+    """One payload for one subscription endpoint."""
+    subscription_id: int
+    endpoint: str
+    p256dh: str
+    auth: str
+    payload: str
+    attempt: int = 1
+
+    @property
+    def subscription_info(self) -> dict:
+        return {"endpoint": self.endpoint, "keys": {"p256dh": self.p256dh, "auth": self.auth}}
+
+
+def audience(endpoint: str) -> str:
+    """VAPID ``aud`` claim of an endpoint: the push service origin"""
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+class VapidHeaderCache:
+    """Signed VAPID Authorization headers per push service origin.
+
+    ``webpush()`` parsed the private key and signed a fresh JWT for every
+    send; a JWT is valid for any endpoint of its audience until ``exp``, so
+    one is signed per origin and reused until ``refresh_margin`` before it
+    expires.
+    """
+
+    def __init__(self, private_key: str, subject: str, lifetime: int = 12 * 3600, refresh_margin: int = 3600):
+        self.private_key = private_key
+        self.subject = subject
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self._vapid: Optional[Vapid] = None
+        self._headers: Dict[str, Tuple[int, dict]] = {}
+        self._lock = threading.Lock()
+
+    def headers(self, endpoint: str) -> dict:
+        aud = audience(endpoint)
+        now = time.time()
+        with self._lock:
+            entry = self._headers.get(aud)
+            if entry is not None and entry[0] - self.refresh_margin > now:
+                return dict(entry[1])
+            if self._vapid is None:
+                self._vapid = Vapid.from_string(private_key=self.private_key)
+            expires_at = int(now) + self.lifetime
+            headers = self._vapid.sign({"sub": self.subject, "aud": aud, "exp": expires_at})
+            self._headers[aud] = (expires_at, headers)
+            return dict(headers)
+
+
+def _retry_after(response) -> Optional[float]:
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class PushDispatcher:
+    """Delivers queued push jobs on a pool of worker threads.
+
+    ``submit`` only enqueues, so notification creation never waits on a push
+    service. Each worker keeps its own HTTP session (connection reuse per push
+    service). Timeouts, 429 and 5xx answers are retried with exponential
+    backoff (or the service's Retry-After) up to ``max_attempts``; 404/410
+    subscriptions are collected and deleted in batches by the housekeeping
+    thread, which also releases retries when they are due.
+    """
+
+    def __init__(
+        self,
+        workers: int = PUSH_WORKERS,
+        queue_size: int = PUSH_QUEUE_SIZE,
+        max_attempts: int = PUSH_MAX_ATTEMPTS,
+        backoff: float = PUSH_BACKOFF_SECONDS,
+        backoff_max: float = PUSH_BACKOFF_MAX_SECONDS,
+        dead_batch_size: int = PUSH_DEAD_BATCH_SIZE,
+        dead_flush_seconds: float = PUSH_DEAD_FLUSH_SECONDS,
+        vapid: Optional[VapidHeaderCache] = None,
+        session_factory: Callable = SessionLocal
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.dead_batch_size = dead_batch_size
+        self.dead_flush_seconds = dead_flush_seconds
+        self.vapid = vapid or VapidHeaderCache(VAPID_PRIVATE_KEY, VAPID_SUBJECT)
+        self.session_factory = session_factory
+        self._queue: "queue.Queue[Optional[PushJob]]" = queue.Queue(maxsize=queue_size)
+        self._retries: List[Tuple[float, int, PushJob]] = []
+        self._retry_order = itertools.count()
+        self._dead: List[int] = []
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._housekeeper: Optional[threading.Thread] = None
+        self._started = False
+        self._stopping = False
+        self._closed = False
+
+    def _ensure_started(self) -> None:
+        with self._cond:
+            if self._started or self._stopping:
+                return
+            self._started = True
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"webpush-{index}", daemon=True)
+                thread.start()
+                self._workers.append(thread)
+            self._housekeeper = threading.Thread(target=self._housekeep, name="webpush-housekeeping", daemon=True)
+            self._housekeeper.start()
+
+    def submit(self, jobs: Iterable[PushJob]) -> int:
+        """Queue jobs without blocking; returns how many were accepted"""
+        self._ensure_started()
+        accepted = 0
+        for job in jobs:
+            if self._stopping:
+                break
+            try:
+                self._queue.put_nowait(job)
+                accepted += 1
+            except queue.Full:
+                logger.warning(f"Push queue full, dropping push to {job.endpoint}")
+        return accepted
+
+    def _work(self) -> None:
+        session = requests.Session()
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                try:
+                    self._deliver(job, session)
+                except Exception as e:
+                    logger.error(f"Unexpected error delivering push to {job.endpoint}: {str(e)}")
+        finally:
+            session.close()
+
+    def _deliver(self, job: PushJob, session: requests.Session) -> None:
+        try:
+            response = WebPusher(job.subscription_info, requests_session=session).send(
+                data=job.payload,
+                headers=self.vapid.headers(job.endpoint),
+                ttl=PUSH_TTL_SECONDS,
+                timeout=PUSH_TIMEOUT_SECONDS
+            )
+        except requests.RequestException as e:
+            self._retry(job, f"{type(e).__name__}: {str(e)}")
+            return
+        status = response.status_code
+        if status <= 202:
+            logger.info(f"Push notification sent to endpoint: {job.endpoint}")
+        elif status in DEAD_STATUSES:
+            logger.info(f"Subscription {job.subscription_id} is gone ({status}), scheduling removal")
+            with self._cond:
+                self._dead.append(job.subscription_id)
+                if len(self._dead) >= self.dead_batch_size:
+                    self._cond.notify_all()
+        elif status == 429 or status >= 500:
+            self._retry(job, f"HTTP {status}", _retry_after(response))
+        else:
+            logger.error(f"Push to {job.endpoint} rejected ({status}): {response.text[:200]}")
+
+    def _retry(self, job: PushJob, reason: str, delay: Optional[float] = None) -> None:
+        if job.attempt >= self.max_attempts or self._stopping:
+            logger.error(f"Giving up push to {job.endpoint} after {job.attempt} attempts: {reason}")
+            return
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff * 2 ** (job.attempt - 1))
+            delay *= random.uniform(0.5, 1.0)
+        logger.warning(f"Push to {job.endpoint} failed ({reason}), retrying in {delay:.1f}s")
+        with self._cond:
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._retry_order), job._replace(attempt=job.attempt + 1)))
+            self._cond.notify_all()
+
+    def _housekeep(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            due: List[PushJob] = []
+            dead: List[int] = []
+            with self._cond:
+                now = time.monotonic()
+                wait = last_flush + self.dead_flush_seconds - now
+                if self._retries:
+                    wait = min(wait, self._retries[0][0] - now)
+                if wait > 0 and not self._closed and len(self._dead) < self.dead_batch_size:
+                    self._cond.wait(wait)
+                    now = time.monotonic()
+                while self._retries and self._retries[0][0] <= now:
+                    due.append(heapq.heappop(self._retries)[2])
+                if self._dead and (
+                    self._closed
+                    or len(self._dead) >= self.dead_batch_size
+                    or now - last_flush >= self.dead_flush_seconds
+                ):
+                    dead, self._dead = self._dead, []
+                if now - last_flush >= self.dead_flush_seconds:
+                    last_flush = now
+                closed = self._closed
+            for job in due:
+                try:
+                    self._queue.put_nowait(job)
+                except queue.Full:
+                    logger.warning(f"Push queue full, dropping retry to {job.endpoint}")
+            if dead:
+                self._delete_subscriptions(dead)
+            if closed:
+                return
+
+    def _delete_subscriptions(self, subscription_ids: List[int]) -> None:
+        db = self.session_factory()
+        try:
+            result = db.execute(delete(Subscription).where(Subscription.id.in_(set(subscription_ids))))
+            db.commit()
+            logger.info(f"Deleted {result.rowcount} invalid subscriptions")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to delete invalid subscriptions: {str(e)}")
+        finally:
+            db.close()
+
+    def shutdown(self, timeout: float = 10) -> None:
+        """Deliver what is queued (pending retries are dropped), flush dead
+        subscriptions and stop the threads."""
+        with self._cond:
+            already_stopping = self._stopping
+            self._stopping = True
+            if not self._started or already_stopping:
+                return
+            if self._retries:
+                logger.warning(f"Dropping {len(self._retries)} pending push retries on shutdown")
+                self._retries.clear()
+        deadline = time.monotonic() + timeout
+        for _ in self._workers:
+            try:
+                self._queue.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for thread in self._workers:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        # Workers are done: the housekeeper flushes the last dead subscriptions and exits
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._housekeeper.join(max(1.0, deadline - time.monotonic()))
+
+
+# Shared by every NotificationService of this process
+push_dispatcher = PushDispatcher()
@@ -1,14 +1,15 @@
 """Property API endpoints."""
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, Path, HTTPException
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query, Path, HTTPException, Request, Response
 from sqlmodel import Session
 
 from ....shared.dependencies import get_db_session, get_pagination_params
 from ....shared.schemas.pagination import PaginationParams
 from ....shared.exceptions import NotFoundError
 from ..repository import PropertyRepository
-from ..services import PropertyService
+from ..services import PropertyService, details_cache
+from ..services.catalogs import Catalog, etag_matches
 from ..schemas.search import PropertySearchParams, PropertyFilterParams
 from ..schemas.response import PropertySearchResponse, PropertyDetailsResponse
 
@@ -20,14 +21,23 @@ def get_property_service(db: Session = Depends(get_db_session)) -> PropertyServi
     repository = PropertyRepository(db)
     return PropertyService(repository)
 
+
+def catalog_response(request: Request, catalog: Catalog) -> Response:
+    """Serve a pre-serialized catalog, or 304 when the client's copy is current."""
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
+
+
 @router.get("/categories", response_model=dict)
 async def get_categories(
+    request: Request,
     service: PropertyService = Depends(get_property_service)
 ):
     """Get list of available property categories."""
     
-    categories = await service.get_categories()
-    return {"categories": categories}
+    return catalog_response(request, await service.get_category_catalog())
 
 
 @router.get("/search", response_model=PropertySearchResponse)
@@ -36,6 +46,8 @@ async def search_properties(
     check_in: Optional[str] = Query(None, description="Check-in date (YYYY-MM-DD)"),
     check_out: Optional[str] = Query(None, description="Check-out date (YYYY-MM-DD)"),
     guests: Optional[int] = Query(None, ge=1, description="Number of guests"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: Literal["exact", "cached", "estimate"] = Query("cached", description="Total: exact, cached or estimate"),
     pagination: PaginationParams = Depends(get_pagination_params),
     service: PropertyService = Depends(get_property_service)
 ):
@@ -47,7 +59,9 @@ async def search_properties(
         check_out=check_out,
         guests=guests,
         page=pagination.page,
-        limit=pagination.limit
+        limit=pagination.limit,
+        cursor=cursor,
+        count_mode=count
     )
     
     properties = await service.search_properties(params)
@@ -63,6 +77,8 @@ async def filter_properties(
     guests: Optional[int] = Query(None, ge=1, description="Number of guests"),
     categories: Optional[List[str]] = Query(None, description="Property categories"),
     
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: Literal["exact", "cached", "estimate"] = Query("cached", description="Total: exact, cached or estimate"),
     pagination: PaginationParams = Depends(get_pagination_params),
     service: PropertyService = Depends(get_property_service)
 ):
@@ -75,7 +91,9 @@ async def filter_properties(
         guests=guests,
         categories=categories,
         page=pagination.page,
-        limit=pagination.limit
+        limit=pagination.limit,
+        cursor=cursor,
+        count_mode=count
     )
     
     return await service.filter_properties(params)
@@ -88,6 +106,8 @@ async def get_properties_by_category(
     check_in: Optional[str] = Query(None, description="Check-in date (YYYY-MM-DD)"),
     check_out: Optional[str] = Query(None, description="Check-out date (YYYY-MM-DD)"),
     guests: Optional[int] = Query(None, ge=1, description="Number of guests"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: Literal["exact", "cached", "estimate"] = Query("cached", description="Total: exact, cached or estimate"),
     pagination: PaginationParams = Depends(get_pagination_params),
     service: PropertyService = Depends(get_property_service)
 ):
@@ -99,7 +119,9 @@ async def get_properties_by_category(
         check_out=check_out,
         guests=guests,
         page=pagination.page,
-        limit=pagination.limit
+        limit=pagination.limit,
+        cursor=cursor,
+        count_mode=count
     )
     
     return await service.get_properties_by_category(category_name, params)
@@ -113,21 +135,30 @@ async def get_property_details(
     """Get detailed property information."""
     
     try:
-        return await service.get_property_details(property_id)
+        # Cached JSON is already a serialized PropertyDetailsResponse
+        payload = await service.get_property_details_json(property_id)
     except NotFoundError as e:
         raise HTTPException(status_code=404, detail=e.message)
+    return Response(content=payload, media_type="application/json")
 
 
 # Supporting endpoints
 
+@router.get("/details-cache/stats", response_model=dict)
+async def get_details_cache_stats():
+    """Hit/miss counters of the property details cache in this process."""
+    
+    return details_cache.stats()
+
+
 @router.get("/amenities/", response_model=dict)
 async def get_amenities(
+    request: Request,
     service: PropertyService = Depends(get_property_service)
 ):
     """Get list of available amenities for filtering."""
     
-    amenities = await service.get_amenities()
-    return {"amenities": amenities}
+    return catalog_response(request, await service.get_amenity_catalog())
 
 
 @router.get("/locations/suggestions", response_model=dict)
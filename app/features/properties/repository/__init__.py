@@ -1,5 +1,5 @@
 """Property repository module."""
 
-from .property_repository import PropertyRepository
+from .property_repository import PropertyRepository, PropertyPage
 
-__all__ = ["PropertyRepository"]
\ No newline at end of file
+__all__ = ["PropertyRepository", "PropertyPage"]
\ No newline at end of file
@@ -1,50 +1,124 @@
 """Property repository implementation using SQLAlchemy."""
 
+import base64
+import binascii
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
 from datetime import date
-from typing import List, Optional, Tuple, Dict
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, select, Table, MetaData
+from typing import List, NamedTuple, Optional, Tuple, Dict
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_, func, text, false, any_, bindparam, BigInteger
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from app.db.models.property import Property
+from app.db.models.property_availability import PropertyAvailability
 from app.db.models.property_image import PropertyImage
 from app.db.models.property_amenity import PropertyAmenity
 from app.db.models.amenity import Amenity
 from app.db.models.property_extras import PropertyHighlight
-from app.db.models.calendar_availability import CalendarAvailability
-from ....shared.exceptions import NotFoundError
+from app.core.config import settings
+from app.db.repositories.rating_summary_repository import RatingSummaryRepository
+from ....shared.exceptions import NotFoundError, ValidationError
 from ..schemas.search import PropertySearchParams, PropertyFilterParams
 
 
+class PropertyPage(NamedTuple):
+	"""One page of a property listing and its pagination metadata."""
+	
+	properties: List[Property]
+	total: int
+	has_more: bool
+	next_cursor: Optional[str] = None
+	total_is_estimate: bool = False
+	# property id -> images shown on its card (the primary image); None when not loaded
+	images: Optional[Dict[int, List[PropertyImage]]] = None
+
+
+def encode_cursor(score: Optional[float], property_id: int) -> str:
+	"""Opaque keyset cursor: the last row's sort key (similarity score, id)."""
+	raw = json.dumps({"s": score, "id": int(property_id)}, separators=(",", ":"))
+	return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[float], int]:
+	try:
+		raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+		data = json.loads(raw)
+		score = data.get("s")
+		return (float(score) if score is not None else None), int(data["id"])
+	except (binascii.Error, ValueError, KeyError, TypeError, AttributeError):
+		raise ValidationError("Invalid pagination cursor", {"cursor": cursor})
+
+
+class _CountCache:
+	"""Exact listing totals per filter signature, reused for a few seconds."""
+	
+	def __init__(self, max_entries: int = 1024):
+		self.max_entries = max_entries
+		self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+		self._lock = threading.Lock()
+	
+	def get(self, key: str, ttl: float) -> Optional[int]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None or time.monotonic() - entry[0] > ttl:
+				return None
+			return entry[1]
+	
+	def put(self, key: str, total: int) -> None:
+		with self._lock:
+			self._entries[key] = (time.monotonic(), total)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+
+_count_cache = _CountCache()
+
+
 class PropertyRepository:
 	"""Repository for property data access."""
 	
 	def __init__(self, db: Session):
 		self.db = db
 	
-	def _apply_location_filter(self, query, location: Optional[str]):
+	@staticmethod
+	def _location_tokens(location: Optional[str]) -> List[str]:
 		if not location:
-			return query
-		# Tokenize by comma and whitespace, apply ILIKE per token across fields
-		tokens = [tok.strip() for tok in location.split(",") if tok.strip()]
+			return []
+		return [tok.strip().lower() for tok in location.split(",") if tok.strip()]
+
+	def _apply_location_filter(self, query, location: Optional[str]):
+		# Tokenize by comma; each token is a substring match on the trigram-indexed
+		# location_search document (city, state, country, address)
+		tokens = self._location_tokens(location)
 		if not tokens:
 			return query
-		per_token_ors = []
-		for tok in tokens:
-			pattern = f"%{tok}%"
-			per_token_ors.append(
-				or_(
-					Property.city.ilike(pattern),
-					Property.state.ilike(pattern),
-					Property.country.ilike(pattern),
-					Property.address_line1.ilike(pattern)
-				)
-			)
-		# At least one token matches any field
+		per_token_ors = [Property.location_search.contains(tok, autoescape=True) for tok in tokens]
+		# At least one token matches
 		return query.filter(or_(*per_token_ors))
 	
-	def _apply_categories_filter(self, query, categories: Optional[List[str]]):
+	def _location_score(self, location: Optional[str]):
+		"""Similarity of the location text to each property; ranks location searches."""
+		tokens = self._location_tokens(location)
+		if not tokens:
+			return None
+		return func.word_similarity(" ".join(tokens), Property.location_search)
+	
+	def _apply_categories_filter(self, query, categories: Optional[List[str]], category_ids: Optional[List[int]] = None):
 		if not categories:
 			return query
+		if category_ids is not None:
+			# Intersection already computed from the in-memory category index
+			if not category_ids:
+				return query.filter(false())
+			# One array parameter (= ANY) instead of one bind parameter per id
+			return query.filter(Property.id == any_(
+				bindparam("category_ids", list(category_ids), type_=ARRAY(BigInteger))
+			))
 		icons = [f"SYSTEM_{c}" for c in categories]
 		ph = PropertyHighlight
 		sub = (
@@ -58,25 +132,31 @@ class PropertyRepository:
 	def _apply_availability_filter(self, query, check_in: Optional[date], check_out: Optional[date]):
 		if not check_in or not check_out:
 			return query
-		ca = CalendarAvailability
-		sub = (
-			self.db.query(ca.property_id)
-			.filter(
-				and_(
-					ca.date >= check_in,
-					ca.date < check_out,
-					ca.is_available.is_(True)
-				)
-			)
-			.group_by(ca.property_id)
-			.having(func.count() >= 2)
-		).subquery()
-		return query.join(sub, sub.c.property_id == Property.id)
+		# Nights [check_in, check_out) cut out of the per-property bitmap
+		# (bit 1 = epoch); same ">= 2 available nights" test as the calendar
+		# GROUP BY it replaces
+		nights = max((check_out - check_in).days, 0)
+		window = func.substring(
+			PropertyAvailability.bits,
+			(check_in - PropertyAvailability.epoch) + 1,
+			nights
+		)
+		return query.join(
+			PropertyAvailability, PropertyAvailability.property_id == Property.id
+		).filter(func.bit_count(window) >= 2)
+	
+	def refresh_stale_availability(self) -> int:
+		"""Roll availability bitmaps whose epoch is not today forward; returns rows rebuilt."""
+		updated = self.db.execute(
+			text("SELECT refresh_property_availability(NULL, true)")
+		).scalar()
+		self.db.commit()
+		return int(updated or 0)
 	
 	async def search_properties(
 		self, 
 		params: PropertySearchParams
-	) -> Tuple[List[Property], int]:
+	) -> PropertyPage:
 		"""Search properties with basic filters."""
 		
 		query = self.db.query(Property).filter(Property.status == "ACTIVE")
@@ -87,27 +167,18 @@ class PropertyRepository:
 			query = query.filter(Property.max_guests >= params.guests)
 		query = self._apply_availability_filter(query, params.check_in, params.check_out)
 		
-		# Get total count
-		total = query.count()
-		
-		# Apply pagination
-		offset = (params.page - 1) * params.limit
-		query = query.offset(offset).limit(params.limit)
-		
-		# Execute query with eager loading
-		query = query.options(
-			joinedload(Property.images),
-			joinedload(Property.host)
-		)
-		
-		properties = query.all()
-		return properties, total
+		return self._paginate(query, params, "search")
 	
 	async def filter_properties(
 		self, 
-		params: PropertyFilterParams
-	) -> Tuple[List[Property], int]:
-		"""Filter properties with advanced criteria."""
+		params: PropertyFilterParams,
+		category_ids: Optional[List[int]] = None
+	) -> PropertyPage:
+		"""Filter properties with advanced criteria.
+		
+		``category_ids`` are the properties having every category, when the caller
+		resolved them from the category index; otherwise they are grouped here.
+		"""
 		
 		query = self.db.query(Property).filter(Property.status == "ACTIVE")
 		
@@ -117,32 +188,18 @@ class PropertyRepository:
 			query = query.filter(Property.max_guests >= params.guests)
 		
 		# Categories via PropertyHighlight icons (AND semantics)
-		query = self._apply_categories_filter(query, params.categories)
+		query = self._apply_categories_filter(query, params.categories, category_ids)
 		
 		# Availability window (>= 2 days available)
 		query = self._apply_availability_filter(query, params.check_in, params.check_out)
 		
-		# Get total count
-		total = query.count()
-		
-		# Apply pagination
-		offset = (params.page - 1) * params.limit
-		query = query.offset(offset).limit(params.limit)
-		
-		# Execute query with eager loading
-		query = query.options(
-			joinedload(Property.images),
-			joinedload(Property.host)
-		)
-		
-		properties = query.all()
-		return properties, total
+		return self._paginate(query, params, "filter")
 	
 	async def get_properties_by_category(
 		self, 
 		category: str,
 		params: PropertySearchParams
-	) -> Tuple[List[Property], int]:
+	) -> PropertyPage:
 		"""Get properties by category."""
 		
 		query = self.db.query(Property).filter(
@@ -158,95 +215,206 @@ class PropertyRepository:
 			query = query.filter(Property.max_guests >= params.guests)
 		query = self._apply_availability_filter(query, params.check_in, params.check_out)
 		
-		# Get total count
-		total = query.count()
+		return self._paginate(query, params, f"category:{category}")
+	
+	def _paginate(self, query, params: PropertySearchParams, scope: str) -> PropertyPage:
+		"""Order by (location similarity desc, id) and cut one page in two phases.
+		
+		Phase 1 selects only the page of ids with the filters; phase 2 hydrates
+		those ids (host via selectinload, primary images via ``_get_card_images``),
+		so neither the page nor its cost depends on how many images a listing has.
+		With ``params.cursor`` the page starts right after the cursor's sort key
+		(keyset, no OFFSET); otherwise ``page`` is used. One extra row is read to
+		know whether more follow, so ``has_more`` never depends on the total.
+		"""
+		total, total_is_estimate = self._count(query, params, scope)
+		
+		# Phase 1: ids (and sort key) of the page
+		score = self._location_score(params.location)
+		id_query = query.with_entities(Property.id)
+		if score is not None:
+			id_query = id_query.add_columns(score.label("sort_score"))
+		
+		if params.cursor:
+			last_score, last_id = decode_cursor(params.cursor)
+			if score is not None and last_score is not None:
+				id_query = id_query.filter(or_(
+					score < last_score,
+					and_(score == last_score, Property.id > last_id)
+				))
+			else:
+				id_query = id_query.filter(Property.id > last_id)
+		else:
+			id_query = id_query.offset((params.page - 1) * params.limit)
 		
-		# Apply pagination
-		offset = (params.page - 1) * params.limit
-		query = query.offset(offset).limit(params.limit)
+		ordering = [score.desc(), Property.id] if score is not None else [Property.id]
+		rows = id_query.order_by(*ordering).limit(params.limit + 1).all()
+		has_more = len(rows) > params.limit
+		rows = rows[:params.limit]
+		ids = [int(row[0]) for row in rows]
 		
-		# Execute query with eager loading
-		query = query.options(
-			joinedload(Property.images),
-			joinedload(Property.host)
+		# Phase 2: hydrate the page in id order
+		properties = []
+		if ids:
+			by_id = {
+				int(prop.id): prop
+				for prop in self.db.query(Property)
+				.filter(Property.id.in_(ids))
+				.options(selectinload(Property.host))
+				.all()
+			}
+			properties = [by_id[pid] for pid in ids if pid in by_id]
+		
+		next_cursor = None
+		if has_more and rows:
+			last_score = rows[-1][1] if score is not None else None
+			next_cursor = encode_cursor(last_score, ids[-1])
+		return PropertyPage(
+			properties, total, has_more, next_cursor, total_is_estimate,
+			self._get_card_images(ids)
 		)
+	
+	def _get_card_images(self, property_ids: List[int]) -> Dict[int, List[PropertyImage]]:
+		"""Image shown on each property card, batched for a page of ids.
+		
+		The primary image comes from the partial index idx_property_images_primary;
+		only listings without a primary image fall back to their first image.
+		"""
+		if not property_ids:
+			return {}
+		images: Dict[int, List[PropertyImage]] = {}
+		primaries = self.db.query(PropertyImage).filter(
+			and_(
+				PropertyImage.property_id.in_(property_ids),
+				PropertyImage.is_primary.is_(True)
+			)
+		).all()
+		for image in primaries:
+			images.setdefault(int(image.property_id), [image])
 		
-		properties = query.all()
+		missing = [pid for pid in property_ids if pid not in images]
+		if missing:
+			firsts = self.db.query(PropertyImage).filter(
+				PropertyImage.property_id.in_(missing)
+			).distinct(PropertyImage.property_id).order_by(
+				PropertyImage.property_id,
+				PropertyImage.display_order,
+				PropertyImage.created_at
+			).all()
+			for image in firsts:
+				images[int(image.property_id)] = [image]
+		return images
+	
+	def _count(self, query, params: PropertySearchParams, scope: str) -> Tuple[int, bool]:
+		"""Listing total per ``params.count_mode``: returns (total, is_estimate).
 		
-		return properties, total
+		exact    - COUNT(*) of the filtered query on every request
+		cached   - the exact count, reused per filter signature for
+		           ``settings.search.count_cache_seconds``
+		estimate - the planner's row estimate (no COUNT); cached count if unavailable
+		"""
+		if params.count_mode == "estimate":
+			estimate = self._estimate_count(query)
+			if estimate is not None:
+				return estimate, True
+		
+		filters = params.model_dump(mode="json", exclude={"page", "limit", "cursor", "count_mode"})
+		key = hashlib.sha1(
+			json.dumps([scope, filters], sort_keys=True, default=str).encode()
+		).hexdigest()
+		if params.count_mode != "exact":
+			cached = _count_cache.get(key, settings.search.count_cache_seconds)
+			if cached is not None:
+				return cached, False
+		
+		total = query.count()
+		_count_cache.put(key, total)
+		return total, False
+	
+	def _estimate_count(self, query) -> Optional[int]:
+		"""Rows the planner expects the filtered query to return."""
+		try:
+			compiled = query.statement.compile(
+				dialect=self.db.bind.dialect,
+				compile_kwargs={"literal_binds": True}
+			)
+			# In a SAVEPOINT so a failing EXPLAIN leaves the caller's transaction intact
+			with self.db.begin_nested():
+				plan = self.db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+			if isinstance(plan, str):
+				plan = json.loads(plan)
+			return int(plan[0]["Plan"]["Plan Rows"])
+		except Exception:
+			# e.g. a bind that cannot be rendered literally
+			return None
 	
 	async def get_available_categories(self) -> List[str]:
 		"""Get list of available property categories with counts."""
 		
-		query = self.db.query(PropertyHighlight.icon).distinct()
-		icons = query.all()
-		return [icon.icon.replace("SYSTEM_", "") for icon in icons]
+		return self.list_categories()
 	
 	async def get_available_amenities(self) -> List[Amenity]:
 		"""Get list of available amenities."""
 		
-		return self.db.query(Amenity).order_by(Amenity.category, Amenity.name).all()
+		return self.list_amenities()
 	
-	async def get_location_suggestions(self, query_text: str, limit: int = 10) -> List[dict]:
-		"""Get location suggestions for autocomplete."""
+	def list_categories(self) -> List[str]:
+		"""Distinct highlight icons, without the SYSTEM_ prefix, in a stable order."""
 		
-		# Search in cities, states, and countries
-		results = self.db.query(
-			Property.city,
-			Property.state, 
-			Property.country,
-			func.count(Property.id).label("property_count")
-		).filter(
-			and_(
-				Property.status == "ACTIVE",
-				or_(
-					Property.city.ilike(f"%{query_text}%"),
-					Property.state.ilike(f"%{query_text}%"),
-					Property.country.ilike(f"%{query_text}%")
-				)
-			)
-		).group_by(
-			Property.city, Property.state, Property.country
-		).limit(limit).all()
+		query = self.db.query(PropertyHighlight.icon).filter(
+			PropertyHighlight.icon.isnot(None)
+		).distinct().order_by(PropertyHighlight.icon)
+		return [icon.icon.replace("SYSTEM_", "") for icon in query.all()]
+	
+	def list_amenities(self) -> List[Amenity]:
+		"""All amenities ordered by category and name."""
 		
-		suggestions = []
-		for city, state, country, count in results:
-			display_name = f"{city}, {state}, {country}"
-			suggestions.append({
-				"display_name": display_name,
-				"city": city,
-				"state": state,
-				"country": country,
-				"property_count": count
-			})
+		return self.db.query(Amenity).order_by(Amenity.category, Amenity.name, Amenity.id).all()
+	
+	def get_category_memberships(self) -> List[Tuple[str, int]]:
+		"""Distinct (icon, property_id) of all highlights, ordered for the category index."""
 		
-		return suggestions
+		return self.db.query(
+			PropertyHighlight.icon,
+			PropertyHighlight.property_id
+		).filter(
+			PropertyHighlight.icon.isnot(None)
+		).distinct().order_by(
+			PropertyHighlight.icon,
+			PropertyHighlight.property_id
+		).all()
 	
-	async def get_available_amenities(self) -> List[Amenity]:
-		"""Get list of available amenities."""
+	def get_catalog_versions(self) -> Dict[str, int]:
+		"""Version of each in-memory catalog, bumped by triggers on its source table."""
 		
-		return self.db.query(Amenity).order_by(Amenity.category, Amenity.name).all()
+		rows = self.db.execute(text("SELECT name, version FROM catalog_versions")).all()
+		return {name: int(version) for name, version in rows}
 	
 	async def get_location_suggestions(self, query_text: str, limit: int = 10) -> List[dict]:
 		"""Get location suggestions for autocomplete."""
 		
-		# Search in cities, states, and countries
+		text_query = (query_text or "").strip().lower()
+		if not text_query:
+			return []
+		
+		# Substring match on the trigram-indexed place_search (city, state, country),
+		# ranked by how closely a word of the place matches the typed text
+		property_count = func.count(Property.id).label("property_count")
 		results = self.db.query(
 			Property.city,
 			Property.state, 
 			Property.country,
-			func.count(Property.id).label("property_count")
+			property_count
 		).filter(
 			and_(
 				Property.status == "ACTIVE",
-				or_(
-					Property.city.ilike(f"%{query_text}%"),
-					Property.state.ilike(f"%{query_text}%"),
-					Property.country.ilike(f"%{query_text}%")
-				)
+				Property.place_search.contains(text_query, autoescape=True)
 			)
 		).group_by(
 			Property.city, Property.state, Property.country
+		).order_by(
+			func.max(func.word_similarity(text_query, Property.place_search)).desc(),
+			property_count.desc()
 		).limit(limit).all()
 		
 		suggestions = []
@@ -262,28 +430,34 @@ class PropertyRepository:
 		
 		return suggestions
 
+	def get_location_counts(self) -> List[Tuple[Optional[str], Optional[str], Optional[str], int]]:
+		"""(city, state, country, property_count) of every ACTIVE location, for the autocomplete index."""
+		
+		return self.db.query(
+			Property.city,
+			Property.state,
+			Property.country,
+			func.count(Property.id)
+		).filter(
+			Property.status == "ACTIVE"
+		).group_by(
+			Property.city, Property.state, Property.country
+		).all()
+
 	async def get_property_ratings(self, property_ids: List[int]) -> Dict[int, Dict[str, float]]:
-		"""Aggregate reviews to compute average rating and count per property.
+		"""Average rating and count per property from the maintained rating summary.
 		Returns mapping: property_id -> {"average": float, "count": int}
 		"""
-		if not property_ids:
-			return {}
-		md = MetaData()
-		reviews = Table("reviews", md, autoload_with=self.db.bind)
-		stmt = (
-			select(
-				reviews.c.property_id,
-				func.count().label("count"),
-				func.avg(reviews.c.rating).label("average")
-			)
-			.where(and_(reviews.c.property_id.in_(property_ids), reviews.c.is_visible == True))
-			.group_by(reviews.c.property_id)
-		)
-		rows = self.db.execute(stmt).all()
-		result: Dict[int, Dict[str, float]] = {}
-		for pid, count, avg in rows:
-			result[int(pid)] = {"average": float(avg) if avg is not None else 0.0, "count": int(count)}
-		return result
+		summaries = RatingSummaryRepository(self.db).get_property_summaries(property_ids)
+		return {
+			pid: {"average": summary.average, "count": int(summary.rating_count)}
+			for pid, summary in summaries.items()
+		}
+	
+	async def get_host_review_count(self, host_id: int) -> int:
+		"""Visible reviews across all of a host's properties."""
+		summary = RatingSummaryRepository(self.db).get_host_summary(host_id)
+		return int(summary.rating_count) if summary else 0
 	
 	async def get_property_by_id(self, property_id: int) -> Property:
 		"""Get property by ID."""
@@ -1,7 +1,7 @@
 """Property search schemas."""
 
 from datetime import date
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 from ....shared.schemas.pagination import PaginationParams
@@ -14,6 +14,10 @@ class PropertySearchParams(PaginationParams):
     check_in: Optional[date] = Field(None, description="Check-in date")
     check_out: Optional[date] = Field(None, description="Check-out date")
     guests: Optional[int] = Field(None, ge=1, description="Number of guests")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page (replaces page)")
+    count_mode: Literal["exact", "cached", "estimate"] = Field(
+        "cached", description="How the total is computed: exact COUNT, cached COUNT or planner estimate"
+    )
 
 
 class PropertyFilterParams(PropertySearchParams):
@@ -1,5 +1,19 @@
 """Property services module."""
 
 from .property_service import PropertyService
+from .location_index import LocationIndex, location_index
+from app.services.details_cache import PropertyDetailsCache, details_cache
+from .catalogs import CatalogStore, catalogs
+from .category_index import CategoryIndex, category_index
 
-__all__ = ["PropertyService"]
\ No newline at end of file
+__all__ = [
+    "PropertyService",
+    "LocationIndex",
+    "location_index",
+    "PropertyDetailsCache",
+    "details_cache",
+    "CatalogStore",
+    "catalogs",
+    "CategoryIndex",
+    "category_index",
+]
\ No newline at end of file
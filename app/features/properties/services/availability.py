@@ -0,0 +1,31 @@
+"""Rollover of the per-property availability bitmaps."""
+
+import asyncio
+import logging
+
+from app.db.sessions.session import SessionLocal
+from ..repository import PropertyRepository
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_stale_availability(session_factory=SessionLocal) -> int:
+    """Rebuild the bitmaps whose 365-night window does not start today"""
+    db = session_factory()
+    try:
+        return PropertyRepository(db).refresh_stale_availability()
+    finally:
+        db.close()
+
+
+async def keep_availability_fresh(interval: float) -> None:
+    """Calendar writes keep bitmaps current; this only moves their epoch to
+    today (runs until cancelled, every ``interval`` seconds)"""
+    while True:
+        try:
+            rebuilt = await asyncio.to_thread(refresh_stale_availability)
+            if rebuilt:
+                logger.info(f"Rolled {rebuilt} availability bitmaps forward")
+        except Exception as e:
+            logger.warning(f"Availability bitmap refresh failed: {e}")
+        await asyncio.sleep(interval)
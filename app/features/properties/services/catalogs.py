@@ -0,0 +1,125 @@
+"""In-memory category and amenity catalogs with strong ETags."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from app.db.sessions.session import SessionLocal
+from ..repository import PropertyRepository
+from ..schemas.response import AmenityResponse
+from .category_index import category_index
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = "categories"
+AMENITIES = "amenities"
+
+
+class Catalog(NamedTuple):
+    """A serialized catalog response and its validator."""
+    version: Optional[int]
+    body: bytes
+    etag: str
+
+
+def make_catalog(version: Optional[int], payload: dict) -> Catalog:
+    """Serialize ``payload`` once; the ETag is a digest of the exact bytes served"""
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return Catalog(version, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names ``etag`` (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def category_payload(repository: PropertyRepository) -> dict:
+    return {"categories": repository.list_categories()}
+
+
+def amenity_payload(repository: PropertyRepository) -> dict:
+    return {
+        "amenities": [
+            AmenityResponse.model_validate(amenity).model_dump(mode="json")
+            for amenity in repository.list_amenities()
+        ]
+    }
+
+
+_LOADERS: Dict[str, Callable[[PropertyRepository], dict]] = {
+    CATEGORIES: category_payload,
+    AMENITIES: amenity_payload,
+}
+
+
+class CatalogStore:
+    """Serialized catalogs keyed by name, each tagged with the
+    ``catalog_versions`` version it was built from."""
+
+    def __init__(self):
+        self._catalogs: Dict[str, Catalog] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[Catalog]:
+        with self._lock:
+            return self._catalogs.get(name)
+
+    def put(self, name: str, version: Optional[int], payload: dict) -> Catalog:
+        catalog = make_catalog(version, payload)
+        with self._lock:
+            self._catalogs[name] = catalog
+        return catalog
+
+
+# Shared by every request of this process
+catalogs = CatalogStore()
+
+
+def refresh_catalogs(session_factory=SessionLocal) -> List[str]:
+    """Reload the catalogs whose version changed; returns the reloaded names"""
+    db = session_factory()
+    try:
+        repository = PropertyRepository(db)
+        versions = repository.get_catalog_versions()
+        reloaded = []
+        for name, loader in _LOADERS.items():
+            version = versions.get(name)
+            current = catalogs.get(name)
+            if current is not None and version is not None and current.version == version:
+                continue
+            catalogs.put(name, version, loader(repository))
+            reloaded.append(name)
+        # The category filter index follows the same highlight version
+        categories_version = versions.get(CATEGORIES)
+        if not category_index.loaded or categories_version is None or category_index.version != categories_version:
+            category_index.load(repository.get_category_memberships(), categories_version)
+            reloaded.append("category index")
+        return reloaded
+    finally:
+        db.close()
+
+
+async def keep_catalogs_fresh(interval: float) -> None:
+    """Load the catalogs now and poll their versions every ``interval`` seconds
+    (runs until cancelled)"""
+    while True:
+        try:
+            reloaded = await asyncio.to_thread(refresh_catalogs)
+            if reloaded:
+                logger.info(f"Reloaded catalogs: {', '.join(reloaded)}")
+        except Exception as e:
+            logger.warning(f"Catalog refresh failed: {e}")
+        await asyncio.sleep(interval)
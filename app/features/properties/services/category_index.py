@@ -0,0 +1,74 @@
+"""In-memory inverted index from category icon to property ids."""
+
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _intersect(smaller: array, larger: array) -> array:
+    """Intersection of two sorted id arrays, bisecting the larger one"""
+    out = array("q")
+    position = 0
+    for property_id in smaller:
+        position = bisect_left(larger, property_id, position)
+        if position == len(larger):
+            break
+        if larger[position] == property_id:
+            out.append(property_id)
+            position += 1
+    return out
+
+
+class CategoryIndex:
+    """Sorted property-id array per ``property_highlights.icon``.
+
+    Replaces the per-request GROUP BY/HAVING over property_highlights: a
+    multi-category (AND) filter intersects the arrays smallest first and the
+    search query consumes the result as an id list. The index is rebuilt from
+    one ordered scan whenever the ``categories`` catalog version moves (the
+    V.0_0_10/V.0_0_11 triggers bump it on every highlight write), see
+    ``catalogs.refresh_catalogs``.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self.loaded = False
+
+    def load(self, rows: Iterable[Tuple[str, int]], version: Optional[int] = None) -> None:
+        """Replace the index with ``(icon, property_id)`` rows ordered by icon, property id"""
+        postings: Dict[str, array] = {}
+        for icon, property_id in rows:
+            ids = postings.get(icon)
+            if ids is None:
+                ids = postings[icon] = array("q")
+            if not ids or ids[-1] != property_id:
+                ids.append(int(property_id))
+        with self._lock:
+            self._postings = postings
+            self.version = version
+            self.loaded = True
+        logger.info(f"Category index loaded: {len(postings)} icons, {sum(len(ids) for ids in postings.values())} postings")
+
+    def property_ids(self, icons: List[str]) -> List[int]:
+        """Sorted ids of the properties that have every one of ``icons``"""
+        with self._lock:
+            postings = [self._postings.get(icon) for icon in set(icons)]
+        if not postings or any(ids is None for ids in postings):
+            return []
+        postings.sort(key=len)
+        result = postings[0]
+        for ids in postings[1:]:
+            if not result:
+                break
+            result = _intersect(result, ids)
+        return result.tolist()
+
+
+# Shared by every filter request of this process
+category_index = CategoryIndex()
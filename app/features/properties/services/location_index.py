@@ -0,0 +1,150 @@
+"""In-memory location autocomplete index."""
+
+import asyncio
+import logging
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.db.sessions.session import SessionLocal
+from ..repository import PropertyRepository
+
+logger = logging.getLogger(__name__)
+
+# (city, state, country) of ACTIVE properties
+LocationKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+_WORD_SPLIT = re.compile(r"[\s,]+")
+
+
+def _words(text: Optional[str]) -> List[str]:
+    return [word for word in _WORD_SPLIT.split((text or "").lower()) if word]
+
+
+class LocationIndex:
+    """Prefix index over the distinct (city, state, country) of ACTIVE properties.
+
+    Every word of every place name, and each full name, is kept in one sorted
+    list of ``(term, location id)``; a lookup bisects to the first term with the typed
+    prefix and scans forward. Counts are maintained incrementally from property
+    writes and the whole index is periodically reloaded from one aggregate
+    query (``PropertyRepository.get_location_counts``) so other processes'
+    writes are picked up.
+    """
+
+    def __init__(self):
+        self._counts: Dict[LocationKey, int] = {}
+        # Locations get a stable integer id so terms sort without comparing None parts
+        self._ids: Dict[LocationKey, int] = {}
+        self._keys: List[LocationKey] = []
+        self._terms: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    @staticmethod
+    def _terms_of(key: LocationKey, key_id: int) -> List[Tuple[str, int]]:
+        terms = set()
+        for part in key:
+            name = (part or "").strip().lower()
+            if not name:
+                continue
+            terms.add(name)
+            terms.update(_words(name))
+        return [(term, key_id) for term in terms]
+
+    def load(self, rows: Iterable[Tuple[Optional[str], Optional[str], Optional[str], int]]) -> None:
+        """Replace the index with ``(city, state, country, property_count)`` rows"""
+        counts: Dict[LocationKey, int] = {}
+        for city, state, country, count in rows:
+            if count:
+                counts[(city, state, country)] = int(count)
+        keys = list(counts)
+        ids = {key: key_id for key_id, key in enumerate(keys)}
+        terms = sorted(term for key, key_id in ids.items() for term in self._terms_of(key, key_id))
+        with self._lock:
+            self._counts, self._ids, self._keys, self._terms = counts, ids, keys, terms
+            self.loaded = True
+        logger.info(f"Location index loaded: {len(counts)} locations, {len(terms)} terms")
+
+    def add(self, key: LocationKey, delta: int = 1) -> None:
+        """Adjust the ACTIVE property count of one location"""
+        with self._lock:
+            count = self._counts.get(key, 0) + delta
+            if count > 0:
+                if key not in self._ids:
+                    self._ids[key] = len(self._keys)
+                    self._keys.append(key)
+                    for term in self._terms_of(key, self._ids[key]):
+                        insort(self._terms, term)
+                self._counts[key] = count
+            elif key in self._counts:
+                # Terms of emptied locations are dropped at the next reload
+                del self._counts[key]
+
+    def property_changed(self,
+                         before: Optional[Tuple[LocationKey, Optional[str]]],
+                         after: Optional[Tuple[LocationKey, Optional[str]]]) -> None:
+        """Apply a property write given its ``(location, status)`` before and after"""
+        if before is not None and before[1] == "ACTIVE":
+            self.add(before[0], -1)
+        if after is not None and after[1] == "ACTIVE":
+            self.add(after[0], 1)
+
+    def suggest(self, query_text: str, limit: int = 10) -> List[dict]:
+        """Locations where every typed word prefixes a word of the place, busiest first"""
+        tokens = _words(query_text)
+        if not tokens:
+            return []
+        # Scan on the longest token (fewest matches); the rest filter
+        probe = max(tokens, key=len)
+        with self._lock:
+            start = bisect_left(self._terms, (probe,))
+            matches = set()
+            for term, key_id in self._terms[start:]:
+                if not term.startswith(probe):
+                    break
+                if self._keys[key_id] in self._counts:
+                    matches.add(self._keys[key_id])
+            ranked = []
+            for key in matches:
+                words = [word for part in key for word in _words(part)]
+                if all(any(word.startswith(tok) for word in words) for tok in tokens):
+                    # City matches rank above state/country matches
+                    city_match = any(word.startswith(probe) for word in _words(key[0]))
+                    ranked.append((not city_match, -self._counts[key], key))
+        ranked.sort(key=lambda item: (item[0], item[1], [part or "" for part in item[2]]))
+
+        suggestions = []
+        for _, negative_count, (city, state, country) in ranked[:limit]:
+            suggestions.append({
+                "display_name": f"{city}, {state}, {country}",
+                "city": city,
+                "state": state,
+                "country": country,
+                "property_count": -negative_count
+            })
+        return suggestions
+
+
+# Shared by the read (properties) and write (property) features of this process
+location_index = LocationIndex()
+
+
+def refresh_location_index(session_factory=SessionLocal) -> None:
+    """Reload the shared index from one aggregate query"""
+    db = session_factory()
+    try:
+        location_index.load(PropertyRepository(db).get_location_counts())
+    finally:
+        db.close()
+
+
+async def keep_location_index_fresh(interval: float) -> None:
+    """Load the index now and reload it every ``interval`` seconds (runs until cancelled)"""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_location_index)
+        except Exception as e:
+            logger.warning(f"Location index refresh failed: {e}")
+        await asyncio.sleep(interval)
@@ -8,9 +8,12 @@ from typing import List, Optional
 
 from ....shared.models import Property, Amenity
 from ....shared.schemas.pagination import PaginationInfo
-from sqlalchemy import select, func, and_, Table, MetaData
 from ....shared.exceptions import NotFoundError
-from ..repository import PropertyRepository
+from ..repository import PropertyRepository, PropertyPage
+from .location_index import location_index
+from app.services.details_cache import details_cache
+from .category_index import category_index
+from .catalogs import Catalog, catalogs, make_catalog, category_payload, amenity_payload, CATEGORIES, AMENITIES
 from ..schemas.search import PropertySearchParams, PropertyFilterParams
 from ..schemas.response import (
     PropertySearchResponse, 
@@ -29,104 +32,17 @@ class PropertyService:
     async def search_properties(self, params: PropertySearchParams) -> PropertySearchResponse:
         """Search properties with basic filters."""
         
-        properties, total = await self.repository.search_properties(params)
-        
-        # Preload ratings in bulk
-        prop_ids = [int(p.id) for p in properties]
-        ratings_map = await self.repository.get_property_ratings(prop_ids)
-        
-        # Convert to property cards
-        property_cards = []
-        for property in properties:
-            rating_data = ratings_map.get(int(property.id), {"average": 0.0, "count": 0})
-            # Calculate rating from reviews
-            rating = {
-                "average": rating_data["average"],
-                "count": rating_data["count"]
-            }
-            # Format property card
-            property_card = {
-                "id": str(property.id),
-                "title": property.title,
-                "images": [self._format_image(img) for img in property.images],
-                "base_price": property.base_price,
-                "location": {
-                    "city": property.city,
-                    "state": property.state,
-                    "country": property.country
-                },
-                "rating": rating,
-                "property_type": property.property_type,
-                "max_guests": property.max_guests,
-                "is_guest_favorite": property.is_guest_favorite,
-                "host": self._format_host(property.host),
-                "cleaning_fee": property.cleaning_fee,
-                "service_fee": self._calculate_service_fee(property.base_price)
-            }
-            property_cards.append(property_card)
-        
-        # Create pagination info
-        pagination = PaginationInfo(
-            page=params.page,
-            limit=params.limit,
-            total=total,
-            has_more=(params.page * params.limit) < total
-        )
-        
-        return PropertySearchResponse(
-            properties=property_cards,
-            pagination=pagination
-        )
+        page = await self.repository.search_properties(params)
+        return await self._build_search_response(page, params)
     
     async def filter_properties(self, params: PropertyFilterParams) -> PropertySearchResponse:
         """Filter properties with advanced criteria."""
         
-        properties, total = await self.repository.filter_properties(params)
-        
-        # Preload ratings in bulk
-        prop_ids = [int(p.id) for p in properties]
-        ratings_map = await self.repository.get_property_ratings(prop_ids)
-        
-        # Convert to property cards (same logic as search)
-        property_cards = []
-        for property in properties:
-            rating_data = ratings_map.get(int(property.id), {"average": 0.0, "count": 0})
-            rating = {
-                "average": rating_data["average"],
-                "count": rating_data["count"]
-            }
-            
-            property_card = {
-                "id": str(property.id),
-                "title": property.title,
-                "images": [self._format_image(img) for img in property.images],
-                "base_price": property.base_price,
-                "location": {
-                    "city": property.city,
-                    "state": property.state,
-                    "country": property.country
-                },
-                "rating": rating,
-                "property_type": property.property_type,
-                "max_guests": property.max_guests,
-                "is_guest_favorite": property.is_guest_favorite,
-                "host": self._format_host(property.host),
-                "cleaning_fee": property.cleaning_fee,
-                "service_fee": self._calculate_service_fee(property.base_price)
-            }
-            property_cards.append(property_card)
-        
-        pagination = PaginationInfo(
-            page=params.page,
-            limit=params.limit,
-            total=total,
-            has_more=(params.page * params.limit) < total
-        )
-        
-        return PropertySearchResponse(
-            properties=property_cards,
-            pagination=pagination
-        )
+        category_ids = None
+        if params.categories and category_index.loaded:
+            category_ids = category_index.property_ids([f"SYSTEM_{c}" for c in params.categories])
+        page = await self.repository.filter_properties(params, category_ids)
+        return await self._build_search_response(page, params)
     
     async def get_properties_by_category(
         self, 
@@ -135,25 +51,29 @@ class PropertyService:
     ) -> PropertySearchResponse:
         """Get properties by category."""
         
-        properties, total = await self.repository.get_properties_by_category(category, params)
+        page = await self.repository.get_properties_by_category(category, params)
+        return await self._build_search_response(page, params)
+    
+    async def _build_search_response(self, page: PropertyPage, params: PropertySearchParams) -> PropertySearchResponse:
+        """Turn a hydrated page (properties, card images) into property cards."""
         
         # Preload ratings in bulk
-        prop_ids = [int(p.id) for p in properties]
+        prop_ids = [int(p.id) for p in page.properties]
         ratings_map = await self.repository.get_property_ratings(prop_ids)
         
-        # Convert to property cards (same logic as search)
+        # Convert to property cards
         property_cards = []
-        for property in properties:
+        for property in page.properties:
             rating_data = ratings_map.get(int(property.id), {"average": 0.0, "count": 0})
             rating = {
                 "average": rating_data["average"],
                 "count": rating_data["count"]
             }
-            
+            # Format property card
             property_card = {
                 "id": str(property.id),
                 "title": property.title,
-                "images": [self._format_image(img) for img in property.images],
+                "images": [self._format_image(img) for img in (page.images or {}).get(int(property.id), [])],
                 "base_price": property.base_price,
                 "location": {
                     "city": property.city,
@@ -170,11 +90,14 @@ class PropertyService:
             }
             property_cards.append(property_card)
         
+        # Create pagination info
         pagination = PaginationInfo(
             page=params.page,
             limit=params.limit,
-            total=total,
-            has_more=(params.page * params.limit) < total
+            total=page.total,
+            has_more=page.has_more,
+            next_cursor=page.next_cursor,
+            total_is_estimate=page.total_is_estimate
         )
         
         return PropertySearchResponse(
@@ -185,7 +108,27 @@ class PropertyService:
     async def get_property_details(self, property_id: int) -> PropertyDetailsResponse:
         """Get detailed property information."""
         
+        payload = await self.get_property_details_json(property_id)
+        return PropertyDetailsResponse.model_validate_json(payload)
+    
+    async def get_property_details_json(self, property_id: int) -> str:
+        """Serialized PropertyDetailsResponse, served from details_cache when warm."""
+        
+        cached = await details_cache.get(property_id)
+        if cached is not None:
+            return cached
+        generation = details_cache.generation(property_id)
+        details = await self._load_property_details(property_id)
+        payload = details.model_dump_json()
+        await details_cache.set(property_id, payload, generation)
+        return payload
+    
+    async def _load_property_details(self, property_id: int) -> PropertyDetailsResponse:
+        """Build the detail response from the database."""
+        
         property = await self.repository.get_property_by_id(property_id)
+        if property is None:
+            raise NotFoundError("Property", str(property_id))
         rating_data = await self.repository.get_property_ratings([property_id])
         rating = rating_data.get(property_id, {"average": 0.0, "count": 0})
         host_review_count = await self._count_host_reviews(property.host_id)
@@ -250,8 +193,19 @@ class PropertyService:
         """Get list of available amenities."""
         return await self.repository.get_available_amenities()
     
+    async def get_category_catalog(self) -> Catalog:
+        """Serialized categories response, from memory once the catalogs are loaded."""
+        return catalogs.get(CATEGORIES) or make_catalog(None, category_payload(self.repository))
+    
+    async def get_amenity_catalog(self) -> Catalog:
+        """Serialized amenities response, from memory once the catalogs are loaded."""
+        return catalogs.get(AMENITIES) or make_catalog(None, amenity_payload(self.repository))
+    
     async def get_location_suggestions(self, query: str, limit: int = 10) -> List[dict]:
         """Get location suggestions for autocomplete."""
+        if location_index.loaded:
+            return location_index.suggest(query, limit)
+        # Index not loaded yet (startup or failed refresh): trigram query
         return await self.repository.get_location_suggestions(query, limit)
     
     # Helper methods
@@ -389,13 +343,4 @@ class PropertyService:
         )
     
     async def _count_host_reviews(self, host_id: int) -> int:
-        md = MetaData()
-        props = Table("properties", md, autoload_with=self.repository.db.bind)
-        reviews = Table("reviews", md, autoload_with=self.repository.db.bind)
-
-        stmt = (
-            select(func.count())
-            .select_from(reviews.join(props, reviews.c.property_id == props.c.id))
-            .where(and_(props.c.host_id == host_id, reviews.c.is_visible.is_(True)))
-        )
-        return int(self.repository.db.execute(stmt).scalar() or 0)
+        return await self.repository.get_host_review_count(host_id)
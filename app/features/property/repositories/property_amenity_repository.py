@@ -1,9 +1,10 @@
-from typing import List
+from typing import Dict, List
 from sqlalchemy.orm import Session
 from app.db.models.property_amenity import PropertyAmenity
 from app.db.models.amenity import Amenity
 from app.features.property.schemas.AmenityDTO import AmenityDTO
 from uuid import UUID as UUIDType
+from app.services.details_cache import details_cache
 
 class PropertyAmenityRepository:
     def __init__(self, db: Session):
@@ -14,6 +15,7 @@ class PropertyAmenityRepository:
         property_amenity = PropertyAmenity(property_id=property_id, amenity_id=amenity_id)
         self.db.add(property_amenity)
         self.db.commit()
+        details_cache.invalidate(property_id)
 
     def get_by_property_id(self, property_id: int) -> List[AmenityDTO]:
         """Get all amenities for a property."""
@@ -25,7 +27,23 @@ class PropertyAmenityRepository:
         )
         return [AmenityDTO.model_validate(amenity) for amenity in amenities]
 
+    def get_by_property_ids(self, property_ids: List[int]) -> Dict[int, List[AmenityDTO]]:
+        """Get the amenities of several properties in one query, keyed by property ID."""
+        amenities_by_property: Dict[int, List[AmenityDTO]] = {property_id: [] for property_id in property_ids}
+        if not property_ids:
+            return amenities_by_property
+        rows = (
+            self.db.query(PropertyAmenity.property_id, Amenity)
+            .join(Amenity, PropertyAmenity.amenity_id == Amenity.id)
+            .filter(PropertyAmenity.property_id.in_(property_ids))
+            .all()
+        )
+        for property_id, amenity in rows:
+            amenities_by_property.setdefault(property_id, []).append(AmenityDTO.model_validate(amenity))
+        return amenities_by_property
+
     def delete_by_property_id(self, property_id: int) -> None:
         """Delete all property-amenity relationships for a property."""
         self.db.query(PropertyAmenity).filter(PropertyAmenity.property_id == property_id).delete()
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+        details_cache.invalidate(property_id)
\ No newline at end of file
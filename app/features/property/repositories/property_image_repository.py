@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from app.db.models.property_image import PropertyImage
 from app.features.property.schemas.PropertyImageDTO import PropertyImageDTO
 from uuid import UUID as UUIDType
+from app.services.details_cache import details_cache
 
 class PropertyImageRepository:
     def __init__(self, db: Session):
@@ -24,6 +25,7 @@ class PropertyImageRepository:
             self.db.commit()
             self.db.refresh(property_image)
             created_images.append(PropertyImageDTO.model_validate(property_image))
+        details_cache.invalidate(property_id)
         return created_images
     
     def get_by_id(self, image_id: UUIDType) -> Optional[PropertyImageDTO]:
@@ -36,10 +38,26 @@ class PropertyImageRepository:
         images = self.db.query(PropertyImage).filter(PropertyImage.property_id == property_id).order_by(PropertyImage.display_order).all()
         return [PropertyImageDTO.model_validate(image) for image in images]
 
+    def get_by_property_ids(self, property_ids: List[int]) -> Dict[int, List[PropertyImageDTO]]:
+        """Lấy ảnh của nhiều bất động sản trong một truy vấn, theo property_id."""
+        images_by_property: Dict[int, List[PropertyImageDTO]] = {property_id: [] for property_id in property_ids}
+        if not property_ids:
+            return images_by_property
+        images = (
+            self.db.query(PropertyImage)
+            .filter(PropertyImage.property_id.in_(property_ids))
+            .order_by(PropertyImage.property_id, PropertyImage.display_order)
+            .all()
+        )
+        for image in images:
+            images_by_property.setdefault(image.property_id, []).append(PropertyImageDTO.model_validate(image))
+        return images_by_property
+
     def delete_by_property_id(self, property_id: int) -> None:
         """Xóa tất cả ảnh của một bất động sản."""
         self.db.query(PropertyImage).filter(PropertyImage.property_id == property_id).delete()
         self.db.commit()
+        details_cache.invalidate(property_id)
 
     def delete_by_id(self, image_id: UUIDType) -> bool:
         """Xóa một ảnh cụ thể theo ID."""
@@ -47,6 +65,7 @@ class PropertyImageRepository:
         if image:
             self.db.delete(image)
             self.db.commit()
+            details_cache.invalidate(image.property_id)
             return True
         return False
 
@@ -66,5 +85,6 @@ class PropertyImageRepository:
                 image.is_primary = image_data.is_primary
             self.db.commit()
             self.db.refresh(image)
+            details_cache.invalidate(image.property_id)
             return PropertyImageDTO.model_validate(image)
         return None
\ No newline at end of file
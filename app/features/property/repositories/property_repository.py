@@ -1,11 +1,14 @@
 from typing import List, Optional, Dict
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.features.property.schemas.PropertyDTO import PropertyCreateDTO, PropertyResponseDTO, HostDTO
+from app.features.property.schemas.AmenityDTO import AmenityDTO
+from app.features.property.schemas.PropertyImageDTO import PropertyImageDTO
 from app.db.models.property import Property
 from app.db.models.property_type import PropertyType
 from app.db.models.property_category import PropertyCategory
 from app.features.property.repositories.property_amenity_repository import PropertyAmenityRepository
 from app.features.property.repositories.property_image_repository import PropertyImageRepository
+from app.services.details_cache import details_cache
 
 class PropertyRepository:
     def __init__(self, db: Session, property_amenity_repository: PropertyAmenityRepository, property_image_repository: PropertyImageRepository):
@@ -39,16 +42,16 @@ class PropertyRepository:
     def get_all(self, limit: int, offset: int) -> List[PropertyResponseDTO]:
         """Get all properties with pagination."""
         properties = self.db.query(Property).options(
-            selectinload(Property.host)
+            joinedload(Property.host)
         ).order_by(Property.id).limit(limit).offset(offset).all()
-        return [self._to_property_response_dto(prop) for prop in properties]
+        return self._to_property_response_dtos(properties)
 
     def get_by_host_id(self, host_id: int, limit: int, offset: int) -> List[PropertyResponseDTO]:
         """Get properties by host ID with pagination."""
         properties = self.db.query(Property).options(
-            selectinload(Property.host)
+            joinedload(Property.host)
         ).filter(Property.host_id == host_id).limit(limit).offset(offset).all()
-        return [self._to_property_response_dto(prop) for prop in properties]
+        return self._to_property_response_dtos(properties)
 
     def update(self, property_id: int, data: Dict) -> Optional[Property]:
         """Update a property."""
@@ -64,6 +67,7 @@ class PropertyRepository:
                     setattr(property, key, value)
             self.db.commit()
             self.db.refresh(property)
+            details_cache.invalidate(property_id)
             return property
         return None
 
@@ -73,13 +77,35 @@ class PropertyRepository:
         if property:
             self.db.delete(property)
             self.db.commit()
+            details_cache.invalidate(property_id)
             return True
         return False
 
-    def _to_property_response_dto(self, property: Property) -> PropertyResponseDTO:
+    def _to_property_response_dtos(self, properties: List[Property]) -> List[PropertyResponseDTO]:
+        """Convert a page of properties, loading amenities and images with one IN query each.
+
+        With the host joined into the page query, a page costs three statements
+        whatever its size (tests/test_property_repository_queries.py).
+        """
+        property_ids = [property.id for property in properties]
+        amenities = self.property_amenity_repository.get_by_property_ids(property_ids)
+        images = self.property_image_repository.get_by_property_ids(property_ids)
+        return [
+            self._to_property_response_dto(property, amenities.get(property.id, []), images.get(property.id, []))
+            for property in properties
+        ]
+
+    def _to_property_response_dto(
+        self,
+        property: Property,
+        amenities: Optional[List[AmenityDTO]] = None,
+        images: Optional[List[PropertyImageDTO]] = None
+    ) -> PropertyResponseDTO:
         """Helper method to convert Property to PropertyResponseDTO with related data."""
-        amenities = self.property_amenity_repository.get_by_property_id(property.id) or []
-        images = self.property_image_repository.get_by_property_id(property.id) or []
+        if amenities is None:
+            amenities = self.property_amenity_repository.get_by_property_id(property.id) or []
+        if images is None:
+            images = self.property_image_repository.get_by_property_id(property.id) or []
         host_dto = None
         if property.host:
             host_dto = HostDTO(
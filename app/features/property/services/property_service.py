@@ -11,6 +11,7 @@ from app.db.models.user import User
 from app.db.models.property_type import PropertyType
 from app.db.models.property_category import PropertyCategory
 from app.db.models.property import Property
+from app.features.properties.services.location_index import location_index
 
 class PropertyService:
     def __init__(self, property_repository: PropertyRepository, property_amenity_repository: PropertyAmenityRepository, property_image_repository: PropertyImageRepository):
@@ -28,6 +29,7 @@ class PropertyService:
             raise ValueError(f"Invalid category: {data.category}")
 
         property = self.property_repository.create(data)
+        location_index.property_changed(None, self._location_state(property))
         if data.amenities:
             self.property_amenity_repository.delete_by_property_id(property.id)
             for amenity_id in data.amenities:
@@ -95,9 +97,23 @@ class PropertyService:
         # Cập nhật các trường khác
         update_data = data.model_dump(exclude_unset=True, exclude={"amenities", "images", "deletedImageIds"})
         if update_data:
-            self.property_repository.update(property_id, update_data)
+            updated = self.property_repository.update(property_id, update_data)
+            location_index.property_changed(self._location_state(existing_property), self._location_state(updated))
         return self.property_repository.get_by_id(property_id)
 
     def delete_property(self, property_id: int) -> bool:
         """Delete a property."""
-        return self.property_repository.delete(property_id)
\ No newline at end of file
+        before = self.db.query(
+            Property.city, Property.state, Property.country, Property.status
+        ).filter(Property.id == property_id).first()
+        deleted = self.property_repository.delete(property_id)
+        if deleted and before:
+            location_index.property_changed(self._location_state(before), None)
+        return deleted
+
+    @staticmethod
+    def _location_state(property) -> Optional[tuple]:
+        """(location, status) of a property for the autocomplete index."""
+        if property is None:
+            return None
+        return (property.city, property.state, property.country), property.status
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.db.models.user import User
+from app.features.messages.services.sender_profile_cache import sender_profiles
 
 class UserService:
 	class EmailConflictError(Exception):
@@ -50,6 +51,7 @@ class UserService:
 
 		self.db.commit()
 		self.db.refresh(user)
+		sender_profiles.invalidate(user.id)
 		return user
 
 	async def update_profile(
@@ -76,6 +78,7 @@ class UserService:
 
 		self.db.commit()
 		self.db.refresh(user)
+		sender_profiles.invalidate(user.id)
 		return user 
 
 	async def get_all_users(self, offset: int = 0, limit: int = 100) -> list[User]:
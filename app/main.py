@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.config import settings
@@ -6,12 +7,18 @@ from app.api.bidding import bidding
 from app.features.messages.api.conversation_routes import router as conversation_router
 from app.features.messages.api.message_routes import router as message_router
 from app.features.messages.api.pusher_config_routes import router as pusher_config_router
+from app.features.messages.services.pusher_service import shutdown_dispatchers
 from app.features.wishlist.api.wishlist_routes import router as wishlist_router
 from app.features.property.api.property_routes import router as property_router
 from app.features.property.api.property_amenity_routes import router as property_amenity_router
 from app.features.property.api.property_type_routes import router as property_type_router
 from app.features.property.api.property_category_routes import router as property_category_router
 from app.features.notification.api.notification_routes import router as notification_router
+from app.features.notification.services.push_dispatcher import push_dispatcher
+from app.features.properties.services.location_index import keep_location_index_fresh
+from app.features.properties.services.availability import keep_availability_fresh
+from app.services.details_cache import details_cache, listen_for_invalidations
+from app.features.properties.services.catalogs import keep_catalogs_fresh
 from app.api.auction import router as auction_router
 from app.api.booking import router as booking_router
 from app.core.container import Container
@@ -27,7 +34,29 @@ from app.api.winner import router as winner_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Application startup")
+    rabbitmq_service = app.container.rabbitMQStream_service()
+    try:
+        await rabbitmq_service.start_producer()
+    except Exception as e:
+        # Retried lazily on the first published bid
+        print(f"RabbitMQ producer not started: {e}")
+    async_redis_repository = app.container.async_redis_repository()
+    details_cache.attach(async_redis_repository, asyncio.get_running_loop())
+    background_tasks = [
+        asyncio.create_task(keep_location_index_fresh(settings.search.location_index_refresh_seconds)),
+        asyncio.create_task(keep_availability_fresh(settings.search.availability_refresh_seconds)),
+        asyncio.create_task(listen_for_invalidations(async_redis_repository)),
+        asyncio.create_task(keep_catalogs_fresh(settings.search.catalog_refresh_seconds))
+    ]
     yield
+    for task in background_tasks:
+        task.cancel()
+    details_cache.detach()
+    await rabbitmq_service.stop_producer()
+    app.container.ws_notifier().close()
+    await asyncio.to_thread(shutdown_dispatchers)
+    await asyncio.to_thread(push_dispatcher.shutdown)
+    await async_redis_repository.close()
     print("Application shutdown")
 
 def create_app() -> FastAPI:
@@ -72,8 +101,7 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    # Setup dependency injection
-    container = Container()
+    # Setup dependency injection (single container so singletons are shared)
     container.wire(modules=[
         "app.api.bidding",
         "app.features.properties.api.property_api"
@@ -0,0 +1,604 @@
+"""In-memory bid book for live auctions.
+
+Every open auction gets an ``AuctionBidBook`` that keeps, for each night, the
+active bids sorted by price, plus the current bid of each user. Bids are
+accepted or rejected against the book without touching Postgres; accepted
+bids and the nights whose winner changed are handed to ``BidBookWriter``,
+which persists them to ``bids`` / ``calendar_availability`` in batches.
+
+The book is only authoritative while a single process consumes the bid
+stream, and it is rebuilt from the database when that process starts. The
+auction row behind each book (status, dates, night limits) is re-read every
+``refresh_seconds``; a book whose auction is no longer open is dropped.
+"""
+
+import bisect
+import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.repositories.auction_repository import AuctionRepository
+from app.db.repositories.bid_repository import BidRepository
+from app.db.repositories.calender_repository import CalendarRepository
+from app.db.models.user import User
+from app.schemas.BidDTO import BidsDTO
+
+logger = logging.getLogger(__name__)
+
+# Auctions in these states still accept bids and are loaded into the book
+OPEN_AUCTION_STATUSES = ["PENDING", "ACTIVE"]
+
+# Same step get_calendar_optimized_direct adds on top of the highest bid
+MINIMUM_BID_STEP = 10
+
+# Errors a retry cannot fix: the offending row is isolated at once
+NON_RETRYABLE_ERRORS = (IntegrityError, DataError)
+
+
+class BookedBid(NamedTuple):
+    """A user's active bid as held by the book"""
+    bid_id: str
+    user_id: int
+    check_in: date
+    check_out: date
+    total_amount: int
+    price_per_night: float
+    bid_time: datetime
+    allow_partial: bool
+    partial_awarded: bool
+
+
+class NightChange(NamedTuple):
+    """New winner of one night; price 0 and no bid when the night is empty"""
+    date: date
+    price_amount: float
+    bid_id: Optional[str]
+
+
+_write_seq_lock = threading.Lock()
+_last_write_seq = 0
+
+
+def _next_write_seq() -> int:
+    """Sequence stamped on calendar writes (calendar_availability.bid_seq).
+
+    Strictly increasing within the process and based on the wall clock in
+    microseconds, so it keeps increasing across restarts of the consumer.
+    """
+    global _last_write_seq
+    with _write_seq_lock:
+        _last_write_seq = max(_last_write_seq + 1, time.time_ns() // 1000)
+        return _last_write_seq
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    """bids.bid_time is a naive timestamp; keep aware and naive values comparable"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _price_per_night(total_amount: int, check_in: date, check_out: date) -> float:
+    """Same rule as the generated bids.price_per_night column"""
+    return round(total_amount / max(1, (check_out - check_in).days), 2)
+
+
+def _nights_of(check_in: date, check_out: date) -> List[date]:
+    """Nights held by a stay, [check_in, check_out); a same-day bid holds none,
+    as in the winner sweep"""
+    return [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+
+
+class AuctionBidBook:
+    """Sorted per-night bid book of a single auction"""
+
+    def __init__(self,
+                 auction_id: str,
+                 property_id: int,
+                 start_date: date,
+                 end_date: date,
+                 min_nights: int = 1,
+                 max_nights: Optional[int] = None,
+                 base_price: float = 0):
+        self.auction_id = auction_id
+        self.property_id = property_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.min_nights = min_nights or 1
+        self.max_nights = max_nights
+        self.base_price = base_price
+        self.lock = threading.Lock()
+        # When the auction row was last read (BidBookService.get_book)
+        self.checked_at = time.monotonic()
+        # night -> ascending [(price_per_night, -bid_timestamp, user_id, bid_id)]
+        # so the winner (highest price, earliest bid) is always the last entry
+        self._nights: Dict[date, List[Tuple[float, float, int, str]]] = {}
+        self._user_bids: Dict[int, BookedBid] = {}
+
+    def __len__(self) -> int:
+        return len(self._user_bids)
+
+    def update_terms(self, auction) -> None:
+        """Take the auction's current dates and night limits. Caller holds ``lock``."""
+        self.start_date = auction.start_date
+        self.end_date = auction.end_date
+        self.min_nights = auction.min_nights or 1
+        self.max_nights = auction.max_nights
+
+    def get_user_bid(self, user_id: int) -> Optional[BookedBid]:
+        return self._user_bids.get(user_id)
+
+    def best(self, night: date) -> Tuple[float, Optional[str]]:
+        """Winning (price_per_night, bid_id) of a night"""
+        entries = self._nights.get(night)
+        if not entries:
+            return 0, None
+        return entries[-1][0], entries[-1][3]
+
+    def calendar_delta(self, changes: List[NightChange]) -> List[dict]:
+        """Calendar days as the FE shows them, for the nights that changed"""
+        delta = []
+        for change in changes:
+            highest_bid = change.price_amount if change.price_amount > 0 else self.base_price
+            delta.append({
+                "date": change.date.isoformat(),
+                "highest_bid": highest_bid,
+                "minimum_to_win": highest_bid + MINIMUM_BID_STEP
+            })
+        return delta
+
+    def validate(self, bid: BookedBid) -> None:
+        """Raise ValueError if the bid cannot enter the book"""
+        if bid.total_amount <= 0:
+            raise ValueError("Bid amount must be positive")
+        if bid.check_out <= bid.check_in:
+            raise ValueError("Check-out must be after check-in")
+        nights = _nights_of(bid.check_in, bid.check_out)
+        if nights[0] < self.start_date or nights[-1] > self.end_date:
+            raise ValueError("Bid dates are outside the auction period")
+        if len(nights) < self.min_nights:
+            raise ValueError(f"Bid must cover at least {self.min_nights} nights")
+        if self.max_nights and len(nights) > self.max_nights:
+            raise ValueError(f"Bid must cover at most {self.max_nights} nights")
+        current = self._user_bids.get(bid.user_id)
+        if current and current.bid_time and bid.bid_time and bid.bid_time < current.bid_time:
+            raise ValueError("Bid is older than the user's current bid")
+
+    def place(self, bid: BookedBid) -> Tuple[bool, List[NightChange]]:
+        """
+        Replace the user's bid with ``bid``.
+        Returns (was_created, nights whose winner changed). Caller holds ``lock``.
+        """
+        self.validate(bid)
+        previous = self._user_bids.get(bid.user_id)
+        touched = set(_nights_of(bid.check_in, bid.check_out))
+        if previous:
+            touched.update(_nights_of(previous.check_in, previous.check_out))
+        before = {night: self.best(night) for night in touched}
+
+        if previous:
+            self._remove(previous)
+        self._insert(bid)
+
+        changes = []
+        for night in sorted(touched):
+            after = self.best(night)
+            if after != before[night]:
+                changes.append(NightChange(night, after[0], after[1]))
+        return previous is None, changes
+
+    def load(self, bid: BookedBid) -> None:
+        """Add a persisted bid while rebuilding, keeping each user's latest bid"""
+        previous = self._user_bids.get(bid.user_id)
+        if previous:
+            if previous.bid_time and bid.bid_time and bid.bid_time < previous.bid_time:
+                return
+            self._remove(previous)
+        self._insert(bid)
+
+    def _key(self, bid: BookedBid) -> Tuple[float, float, int, str]:
+        timestamp = bid.bid_time.timestamp() if bid.bid_time else 0.0
+        return bid.price_per_night, -timestamp, bid.user_id, bid.bid_id
+
+    def _insert(self, bid: BookedBid) -> None:
+        key = self._key(bid)
+        for night in _nights_of(bid.check_in, bid.check_out):
+            bisect.insort(self._nights.setdefault(night, []), key)
+        self._user_bids[bid.user_id] = bid
+
+    def evict(self, user_id: int, bid_id: str, persisted: Optional[BookedBid] = None) -> List[NightChange]:
+        """
+        Drop the user's bid if it is still ``bid_id`` (e.g. it could not be
+        persisted), restoring ``persisted``, the version the database holds.
+        Returns the nights whose winner changed. Caller holds ``lock``.
+        """
+        bid = self._user_bids.get(user_id)
+        if bid is None or bid.bid_id != bid_id:
+            return []
+        nights = set(_nights_of(bid.check_in, bid.check_out))
+        if persisted:
+            nights.update(_nights_of(persisted.check_in, persisted.check_out))
+        before = {night: self.best(night) for night in nights}
+        self._remove(bid)
+        if persisted:
+            self._insert(persisted)
+        changes = []
+        for night in sorted(nights):
+            after = self.best(night)
+            if after != before[night]:
+                changes.append(NightChange(night, after[0], after[1]))
+        return changes
+
+    def _remove(self, bid: BookedBid) -> None:
+        key = self._key(bid)
+        for night in _nights_of(bid.check_in, bid.check_out):
+            entries = self._nights.get(night)
+            if not entries:
+                continue
+            index = bisect.bisect_left(entries, key)
+            if index < len(entries) and entries[index] == key:
+                del entries[index]
+        self._user_bids.pop(bid.user_id, None)
+
+
+class BidBookWriter:
+    """
+    Background writer that persists accepted bids in batches.
+    One transaction per ``batch_size`` bids or per ``flush_interval_ms``,
+    whichever comes first. A failed batch is retried up to ``max_retries``
+    times (constraint violations are not retried), then written row by row;
+    rows that still fail are dead-lettered to the log and handed to
+    ``on_rejected`` so the book can forget them.
+    """
+
+    def __init__(self,
+                 session_factory: Callable[[], Session],
+                 batch_size: int = 200,
+                 flush_interval_ms: int = 50,
+                 retry_delay: float = 1.0,
+                 max_retries: int = 3):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        # Called with each bid row that could not be persisted
+        self.on_rejected: Optional[Callable[[dict], None]] = None
+        # (bid row, calendar rows, barrier set once they are committed)
+        self._queue: "queue.Queue[Tuple[Optional[dict], List[dict], Optional[threading.Event]]]" = queue.Queue()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """Writes accepted by the book but not yet handed to a transaction"""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="bid-book-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything still queued, then stop the writer thread"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, bid_row: Optional[dict], calendar_rows: List[dict]) -> None:
+        """Queue a bid upsert (optional) and the calendar nights it changed"""
+        self._queue.put((bid_row, calendar_rows, None))
+
+    def barrier(self) -> threading.Event:
+        """
+        Close the current batch and return an event that is set once every
+        write submitted so far has been committed
+        """
+        committed = threading.Event()
+        self._queue.put((None, [], committed))
+        return committed
+
+    def _run(self) -> None:
+        batch = []
+        while not (self._stopping.is_set() and self._queue.empty() and not batch):
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                if item[2] is not None:
+                    break
+            if not batch:
+                continue
+            self._flush(batch)
+            batch = []
+
+    def _flush(self, batch: List[Tuple[Optional[dict], List[dict], Optional[threading.Event]]]) -> None:
+        # Later writes supersede earlier ones for the same bid / night
+        bids: Dict[str, dict] = {}
+        nights: Dict[Tuple[int, str, date], dict] = {}
+        for bid_row, calendar_rows, _ in batch:
+            if bid_row:
+                bids[str(bid_row["id"])] = bid_row
+            for row in calendar_rows:
+                nights[(row["property_id"], row["auction_id"], row["date"])] = row
+
+        if bids or nights:
+            bid_rows, calendar_rows = list(bids.values()), list(nights.values())
+            error = None
+            for attempt in range(1, self.max_retries + 1):
+                error = self._persist(bid_rows, calendar_rows)
+                if error is None or isinstance(error, NON_RETRYABLE_ERRORS):
+                    break
+                if attempt < self.max_retries and not self._stopping.is_set():
+                    time.sleep(self.retry_delay)
+            if error is not None:
+                self._persist_rows(bid_rows, calendar_rows)
+        # Every write is committed or dead-lettered: release the barriers
+        for _, _, committed in batch:
+            if committed is not None:
+                committed.set()
+
+    def _persist_rows(self, bid_rows: List[dict], calendar_rows: List[dict]) -> None:
+        """Write a failed batch one row per transaction, dead-lettering the rows that fail"""
+        rejected = set()
+        for row in bid_rows:
+            error = self._persist([row], [])
+            if error is not None:
+                rejected.add(str(row["id"]))
+                logger.error(f"Dead-lettered bid write {row!r}: {error}")
+                if self.on_rejected is not None:
+                    try:
+                        self.on_rejected(row)
+                    except Exception as e:
+                        logger.error(f"Error evicting rejected bid {row['id']}: {e}")
+        for row in calendar_rows:
+            # Nights won by a rejected bid are rewritten by the eviction
+            if row["bid_id"] is not None and str(row["bid_id"]) in rejected:
+                continue
+            error = self._persist([], [row])
+            if error is not None:
+                logger.error(f"Dead-lettered calendar write {row!r}: {error}")
+
+    def _persist(self, bid_rows: List[dict], calendar_rows: List[dict]) -> Optional[Exception]:
+        """Write rows in one transaction; returns the error, None once committed"""
+        db = self.session_factory()
+        try:
+            BidRepository(db).bulk_upsert_bids(bid_rows)
+            CalendarRepository(db).bulk_update_nightly_prices(calendar_rows)
+            db.commit()
+            logger.debug(f"Persisted {len(bid_rows)} bids and {len(calendar_rows)} calendar nights")
+            return None
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error persisting {len(bid_rows)} bids / {len(calendar_rows)} calendar nights: {e}")
+            return e
+        finally:
+            db.close()
+
+
+class BidBookService:
+    """Registry of the bid books of all open auctions"""
+
+    def __init__(self, session_factory: Callable[[], Session], writer: BidBookWriter, refresh_seconds: float = 5.0):
+        self.session_factory = session_factory
+        self.writer = writer
+        self.refresh_seconds = refresh_seconds
+        self.writer.on_rejected = self._evict_rejected
+        self._books: Dict[str, AuctionBidBook] = {}
+        self._lock = threading.Lock()
+        # Users seen in the users table; bids.user_id has a FK to it
+        self._known_users: set = set()
+
+    def rebuild(self) -> int:
+        """
+        Reload every open auction from bids / calendar_availability.
+        Returns the number of auctions loaded.
+        """
+        db = self.session_factory()
+        try:
+            auctions = AuctionRepository(db).get_auctions_by_status(OPEN_AUCTION_STATUSES)
+            books = {}
+            for auction in auctions:
+                book = self._load_book(db, auction)
+                books[book.auction_id] = book
+        finally:
+            db.close()
+        with self._lock:
+            self._books = books
+        logger.info(f"Bid book rebuilt for {len(books)} open auctions")
+        return len(books)
+
+    def _is_fresh(self, book: Optional[AuctionBidBook]) -> bool:
+        return book is not None and time.monotonic() - book.checked_at < self.refresh_seconds
+
+    def get_book(self, auction_id: str) -> Optional[AuctionBidBook]:
+        """
+        Get the book of an open auction, loading it on first use. The auction
+        row is re-read once ``refresh_seconds`` have passed: a closed or
+        deleted auction drops its book, edited dates and night limits apply.
+        """
+        book = self._books.get(auction_id)
+        if self._is_fresh(book):
+            return book
+        with self._lock:
+            book = self._books.get(auction_id)
+            if self._is_fresh(book):
+                return book
+            db = self.session_factory()
+            try:
+                auction = AuctionRepository(db).get_auction_by_id(auction_id)
+                if not auction or auction.status not in OPEN_AUCTION_STATUSES:
+                    if self._books.pop(auction_id, None) is not None:
+                        logger.info(f"Auction {auction_id} is no longer open, dropping its bid book")
+                    return None
+                if book is None:
+                    book = self._load_book(db, auction)
+                    self._books[auction_id] = book
+                else:
+                    with book.lock:
+                        book.update_terms(auction)
+            finally:
+                db.close()
+            book.checked_at = time.monotonic()
+            return book
+
+    def _check_user(self, user_id: int) -> None:
+        """Raise ValueError for a user the bids FK would reject"""
+        if user_id in self._known_users:
+            return
+        db = self.session_factory()
+        try:
+            exists = db.scalar(select(User.id).where(User.id == user_id))
+        finally:
+            db.close()
+        if not exists:
+            raise ValueError(f"User {user_id} does not exist")
+        self._known_users.add(user_id)
+
+    def _evict_rejected(self, bid_row: dict) -> None:
+        """Forget a bid the writer could not persist and rewrite the nights it held"""
+        book = self._books.get(str(bid_row["auction_id"]))
+        if book is None:
+            return
+        db = self.session_factory()
+        try:
+            record = BidRepository(db).get_active_bid_by_id(bid_row["id"])
+            persisted = self._booked_bid(record) if record else None
+        finally:
+            db.close()
+        with book.lock:
+            changes = book.evict(bid_row["user_id"], str(bid_row["id"]), persisted)
+            if changes:
+                self.writer.submit(None, self._calendar_rows(book, changes))
+        if changes:
+            logger.warning(f"Evicted unpersisted bid {bid_row['id']} from auction {book.auction_id}")
+
+    def close_auction(self, auction_id: str) -> None:
+        """Forget a book once its auction stops accepting bids"""
+        with self._lock:
+            self._books.pop(auction_id, None)
+
+    def place_bid(self, bids_dto: BidsDTO) -> Tuple[BookedBid, bool, List[NightChange]]:
+        """
+        Accept or reject a bid against the book and queue its persistence.
+        Returns (booked bid, was_created, changed nights); raises ValueError on rejection.
+        """
+        book = self.get_book(bids_dto.auction_id)
+        if book is None:
+            raise ValueError(f"Auction {bids_dto.auction_id} is not open for bidding")
+        self._check_user(bids_dto.user_id)
+
+        check_in = _as_date(datetime.fromisoformat(bids_dto.check_in))
+        check_out = _as_date(datetime.fromisoformat(bids_dto.check_out))
+        with book.lock:
+            current = book.get_user_bid(bids_dto.user_id)
+            bid = BookedBid(
+                bid_id=current.bid_id if current else str(uuid.uuid4()),
+                user_id=bids_dto.user_id,
+                check_in=check_in,
+                check_out=check_out,
+                total_amount=bids_dto.bid_amount,
+                price_per_night=_price_per_night(bids_dto.bid_amount, check_in, check_out),
+                bid_time=_naive(datetime.fromisoformat(bids_dto.bid_time)),
+                allow_partial=bids_dto.allow_partial,
+                partial_awarded=bids_dto.partial_awarded
+            )
+            was_created, changes = book.place(bid)
+            # Submitted under the book lock so writes reach the queue in book order
+            self.writer.submit(self._bid_row(book, bid), self._calendar_rows(book, changes))
+        return bid, was_created, changes
+
+    def _load_book(self, db: Session, auction) -> AuctionBidBook:
+        book = AuctionBidBook(
+            auction_id=str(auction.id),
+            property_id=auction.property_id,
+            start_date=auction.start_date,
+            end_date=auction.end_date,
+            min_nights=auction.min_nights,
+            max_nights=auction.max_nights,
+            base_price=float(auction.property.base_price) if auction.property else 0
+        )
+        for record in BidRepository(db).get_active_bids_by_auction(book.auction_id):
+            book.load(self._booked_bid(record))
+
+        # Queue a repair for nights the calendar disagrees on (e.g. a crash mid-write)
+        drift = []
+        for entry in CalendarRepository(db).get_calendar_by_auction(book.property_id, book.auction_id):
+            price, bid_id = book.best(entry.date)
+            stored_price = float(entry.price_amount or 0)
+            stored_bid = str(entry.bid_id) if entry.bid_id else None
+            if stored_price != price or stored_bid != bid_id:
+                drift.append(NightChange(entry.date, price, bid_id))
+        if drift:
+            logger.warning(f"Repairing {len(drift)} calendar nights of auction {book.auction_id}")
+            self.writer.submit(None, self._calendar_rows(book, drift))
+        return book
+
+    @staticmethod
+    def _booked_bid(record) -> BookedBid:
+        check_in = _as_date(record.check_in)
+        check_out = _as_date(record.check_out)
+        return BookedBid(
+            bid_id=str(record.id),
+            user_id=record.user_id,
+            check_in=check_in,
+            check_out=check_out,
+            total_amount=int(record.total_amount),
+            price_per_night=_price_per_night(int(record.total_amount), check_in, check_out),
+            bid_time=_naive(record.bid_time),
+            allow_partial=record.allow_partial,
+            partial_awarded=record.partial_awarded
+        )
+
+    @staticmethod
+    def _bid_row(book: AuctionBidBook, bid: BookedBid) -> dict:
+        return {
+            "id": uuid.UUID(bid.bid_id),
+            "auction_id": book.auction_id,
+            "user_id": bid.user_id,
+            "check_in": bid.check_in,
+            "check_out": bid.check_out,
+            "total_amount": bid.total_amount,
+            "allow_partial": bid.allow_partial,
+            "partial_awarded": bid.partial_awarded,
+            "bid_time": bid.bid_time,
+            "status": "ACTIVE",
+            "updated_at": datetime.now()
+        }
+
+    @staticmethod
+    def _calendar_rows(book: AuctionBidBook, changes: List[NightChange]) -> List[dict]:
+        # Called while the book is locked, so the sequence follows the order
+        # in which the book decided the winners
+        return [
+            {
+                "property_id": book.property_id,
+                "auction_id": book.auction_id,
+                "date": change.date,
+                "price_amount": change.price_amount,
+                "bid_id": change.bid_id,
+                "bid_seq": _next_write_seq()
+            }
+            for change in changes
+        ]
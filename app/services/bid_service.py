@@ -1,49 +1,52 @@
 from app.db.repositories.bid_repository import BidRepository
 from typing import Dict, Optional
 from app.schemas.BidDTO import BidsDTO
+from app.services.bid_book import BidBookService
 
 
 class BidService:
-    def __init__(self, bid_repository: BidRepository):
+    def __init__(self, bid_repository: BidRepository, bid_book: BidBookService):
         self.bid_repository = bid_repository
+        self.bid_book = bid_book
 
     def place_bid(self, bids_dto: BidsDTO) -> Dict:
         """
-        Place bid using correct DTO → Model mapping
-        - Check if user has existing bid for this auction
-        - UPDATE if exists, INSERT if not
+        Place bid against the in-memory bid book
+        - Accept or reject the bid without touching the DB
+        - UPDATE the user's existing bid if any, INSERT otherwise
+        - Persistence is batched by the bid book writer
         """
         try:
-            # UPSERT bid (update existing or insert new)
-            bid_record, was_created = self.bid_repository.upsert_user_bid(bids_dto)
-
-            if bid_record:
-                action = "created" if was_created else "updated"
-                return {
-                    "success": True,
-                    "bid_id": str(bid_record.id),
-                    "action": action,
-                    "user_id": bid_record.user_id,
-                    "auction_id": bid_record.auction_id,
-                    "total_amount": bid_record.total_amount,  # INT from DB
-                    "price_per_night": bid_record.price_per_night,  # INT computed by DB
-                    "nights": bid_record.nights,  # INT computed by DB
-                    "check_in": bid_record.check_in.isoformat(),
-                    "check_out": bid_record.check_out.isoformat(),
-                    "bid_time": bid_record.bid_time.isoformat(),
-                    "allow_partial": bid_record.allow_partial,
-                    "partial_awarded": bid_record.partial_awarded,
-                    "status": bid_record.status,
-                    "message": f"Bid {action} successfully"
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": "Failed to save bid"
-                }
+            bid, was_created, changes = self.bid_book.place_bid(bids_dto)
+            book = self.bid_book.get_book(bids_dto.auction_id)
+            action = "created" if was_created else "updated"
+            return {
+                "success": True,
+                "bid_id": bid.bid_id,
+                "action": action,
+                "user_id": bid.user_id,
+                "auction_id": bids_dto.auction_id,
+                "total_amount": bid.total_amount,
+                "price_per_night": bid.price_per_night,
+                "nights": max(1, (bid.check_out - bid.check_in).days),
+                "check_in": bid.check_in.isoformat(),
+                "check_out": bid.check_out.isoformat(),
+                "bid_time": bid.bid_time.isoformat(),
+                "allow_partial": bid.allow_partial,
+                "partial_awarded": bid.partial_awarded,
+                "status": "ACTIVE",
+                "property_id": book.property_id,
+                "updated_dates": [change.date.isoformat() for change in changes],
+                "calendar_delta": book.calendar_delta(changes),
+                "message": f"Bid {action} successfully"
+            }
 
+        except ValueError as e:
+            return {
+                "success": False,
+                "message": f"Bid rejected: {str(e)}"
+            }
         except Exception as e:
-            self.bid_repository.rollback()
             print(f"Error in place_bid: {e}")
             return {
                 "success": False,
@@ -1,7 +1,7 @@
 from app.db.repositories.bid_repository import BidRepository
 from app.db.repositories.calender_repository import CalendarRepository
 from app.schemas.BidDTO import BidRecord
-from app.schemas.calendarDTO import PropertyCalendarResponseData, DayData, MessageResponseDTO
+from app.schemas.calendarDTO import PropertyCalendarResponseData, DayData
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional
 import logging
@@ -86,79 +86,3 @@ class CalendarService:
         exists = self.calendar_repository.validate_property_exists(property_id)
         if not exists:
             raise ValueError(f"Property {property_id} not found")
-
-    def update_calendar_availability(self,
-                                     id:int,
-                                     check_in:date,
-                                     check_out:date,
-                                     property_id:int,
-                                     auction_id:str,
-                                     price_per_night) -> MessageResponseDTO:
-        """Update availability of a calendar day"""
-
-        # tính giá phòng trên ngày
-        nights = (check_out - check_in).days
-        if nights:
-            total_price = price_per_night * nights
-        else:
-            total_price = price_per_night * (nights + 1)
-        total_day = (check_out - check_in).days + 1
-        bid_amount = total_price / total_day
-        # 1. Lấy chuỗi ngày mà user đó bid
-            #1.1 có thể có ngày,có thể chưa có ngày đó - hoặc nên tạo ngày khi có auction -> trigger
-            #=> luôn có ngày để check
-        try:
-            calendar_entries = self.calendar_repository.get_calendar_data_range(
-                check_in,
-                check_out,
-                property_id,
-                auction_id
-            )
-        except Exception as e:
-            logger.error(f"Error getting calendar entries: {e}")
-            return MessageResponseDTO(
-                success=False,
-                message=f"Error getting calendar entries: {str(e)}",
-                Details={}
-            )
-        # 2. So sánh bid_amount có lớn hơn => danh sách những ngày sẽ update
-        update_calendar_list = []
-        for entry in calendar_entries:
-            if entry.price_amount is None or entry.price_amount < bid_amount:
-                entry.bid_id = id
-                entry.price_amount = bid_amount
-                entry.updated_at = datetime.now()
-                update_calendar_list.append(entry)
-
-        # 3. Update calendar entries
-        try:
-            for entry in update_calendar_list:
-                success = self.calendar_repository.update_calendar_entry(
-                    property_id=property_id,
-                    date=entry.date,
-                    bid_id=str(entry.bid_id) if entry.bid_id else None,
-                    price_amount=entry.price_amount
-                )
-                if not success:
-                    logger.warning(f"Failed to update calendar entry for date {entry.date}")
-
-            return MessageResponseDTO(
-                success=True,
-                message=f"Successfully updated {len(update_calendar_list)} calendar entries",
-                Details={
-                    "updated_entries": len(update_calendar_list),
-                    "date_range": {
-                        "check_in": check_in.isoformat(),
-                        "check_out": check_out.isoformat()
-                    },
-                    "bid_amount": bid_amount
-                }
-            )
-
-        except Exception as e:
-            logger.error(f"Error updating calendar entries: {e}")
-            return MessageResponseDTO(
-                success=False,
-                message=f"Error updating calendar entries: {str(e)}",
-                Details={"error": str(e)}
-            )
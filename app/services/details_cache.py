@@ -0,0 +1,204 @@
+"""Two-tier cache of serialized property detail responses."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Other API processes drop their in-process copy when a property id arrives here
+INVALIDATION_CHANNEL = "property_details_invalidate"
+
+
+def details_key(property_id: int) -> str:
+    """Redis key of one property's serialized PropertyDetailsResponse"""
+    return f"property_details:{property_id}"
+
+
+class PropertyDetailsCache:
+    """In-process LRU (with TTL) in front of Redis, keyed by property id.
+
+    Values are the JSON of ``PropertyDetailsResponse``. Reads try the local
+    LRU, then Redis (refilling the LRU), and count hits per tier and misses.
+    Writers call ``invalidate`` after committing: the local entry is dropped
+    at once, the Redis key is deleted and the id is published on
+    ``INVALIDATION_CHANNEL`` so other processes drop theirs. Writers are
+    mostly sync code on worker threads, so the Redis side is scheduled on the
+    event loop captured by ``attach``; until then only the local tier is used.
+
+    A reader may build a payload from rows a writer then changes. Readers take
+    ``generation(id)`` before loading and pass it to ``set``, which skips the
+    fill if an invalidation (local or published) bumped it meanwhile. A fill
+    from another process can still land right after the DEL, so the Redis key
+    is deleted a second time ``redelete_delay`` seconds later.
+    """
+
+    def __init__(self, max_entries: int = 1000, local_ttl: float = 30, redis_ttl: int = 600, redelete_delay: float = 2):
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.redelete_delay = redelete_delay
+        self._entries: "OrderedDict[int, Tuple[float, str]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0, "stale_fills": 0}
+
+    def attach(self, redis_repository, loop: asyncio.AbstractEventLoop) -> None:
+        """Enable the Redis tier (AsyncRedisRepository) on the app's event loop"""
+        self._redis = redis_repository
+        self._loop = loop
+
+    def detach(self) -> None:
+        self._redis = None
+        self._loop = None
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _get_local(self, property_id: int) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(property_id)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._entries[property_id]
+                return None
+            self._entries.move_to_end(property_id)
+            return payload
+
+    def _set_local(self, property_id: int, payload: str) -> None:
+        with self._lock:
+            self._entries[property_id] = (time.monotonic() + self.local_ttl, payload)
+            self._entries.move_to_end(property_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop_local(self, property_ids: Iterable[int]) -> None:
+        with self._lock:
+            for property_id in property_ids:
+                self._entries.pop(property_id, None)
+                self._generations[property_id] = self._generations.get(property_id, 0) + 1
+
+    def generation(self, property_id: int) -> int:
+        """Invalidation counter of a property; take it before loading a fill"""
+        with self._lock:
+            return self._generations.get(property_id, 0)
+
+    async def get(self, property_id: int) -> Optional[str]:
+        """Cached JSON of a property's details, or None on a miss"""
+        payload = self._get_local(property_id)
+        if payload is not None:
+            self._count("local_hits")
+            return payload
+        if self._redis is not None:
+            try:
+                cached = await self._redis.get(details_key(property_id))
+            except Exception as e:
+                logger.warning(f"Property details cache read failed: {e}")
+                cached = None
+            if cached is not None:
+                payload = cached.decode("utf-8") if isinstance(cached, bytes) else cached
+                self._set_local(property_id, payload)
+                self._count("redis_hits")
+                return payload
+        self._count("misses")
+        return None
+
+    async def set(self, property_id: int, payload: str, generation: Optional[int] = None) -> None:
+        """Store a payload built after ``generation(id)`` returned ``generation``;
+        dropped if the property was invalidated since"""
+        if generation is not None and self.generation(property_id) != generation:
+            self._count("stale_fills")
+            return
+        self._set_local(property_id, payload)
+        if self._redis is not None:
+            try:
+                await self._redis.set(details_key(property_id), payload, ex=self.redis_ttl, nx=False)
+            except Exception as e:
+                logger.warning(f"Property details cache write failed: {e}")
+
+    def invalidate(self, *property_ids: Optional[int]) -> None:
+        """Forget the details of the given properties in every tier and process"""
+        ids = {int(property_id) for property_id in property_ids if property_id is not None}
+        if not ids:
+            return
+        self.drop_local(ids)
+        with self._lock:
+            self._stats["invalidations"] += len(ids)
+        loop = self._loop
+        if self._redis is None or loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(self._invalidate_remote(ids))
+        else:
+            asyncio.run_coroutine_threadsafe(self._invalidate_remote(ids), loop)
+
+    async def _invalidate_remote(self, property_ids: Iterable[int]) -> None:
+        property_ids = list(property_ids)
+        try:
+            for property_id in property_ids:
+                await self._redis.delete(details_key(property_id))
+                await self._redis.publish(INVALIDATION_CHANNEL, str(property_id))
+            # Catch fills other processes loaded before the write committed
+            await asyncio.sleep(self.redelete_delay)
+            if self._redis is not None:
+                for property_id in property_ids:
+                    await self._redis.delete(details_key(property_id))
+        except Exception as e:
+            logger.warning(f"Property details cache invalidation failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters since startup"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["local_entries"] = len(self._entries)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["local_hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+        stats["redis_enabled"] = self._redis is not None
+        return stats
+
+
+# Shared by the detail endpoint and every writer of this process
+details_cache = PropertyDetailsCache(
+    max_entries=settings.search.details_cache_entries,
+    local_ttl=settings.search.details_cache_local_seconds,
+    redis_ttl=settings.search.details_cache_redis_seconds
+)
+
+
+async def listen_for_invalidations(redis_repository) -> None:
+    """Drop local entries other processes invalidated (runs until cancelled)"""
+    while True:
+        pubsub = redis_repository.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    details_cache.drop_local([int(message["data"])])
+                except (TypeError, ValueError):
+                    continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Property details invalidation listener failed: {e}")
+            await asyncio.sleep(5)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
@@ -9,46 +9,152 @@ from rstream import (
     OffsetType
 )
 from app.schemas.BidDTO import BidsDTO
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import json
 
 class RabbitMQService:
     def __init__(self, stream_property: dict):
         self.stream_property = stream_property
+        self.batch_size = stream_property.get("producer_batch_size", 100)
+        self.batch_interval = stream_property.get("producer_batch_interval_ms", 5) / 1000
+        self.confirm_timeout = stream_property.get("publish_confirm_timeout", 5.0)
+
+        # Persistent producer, opened once by start_producer (FastAPI lifespan)
+        self._producer: Optional[Producer] = None
+        self._producer_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_ready = asyncio.Event()
+        # Messages waiting for the next send_batch, with the future of their confirm
+        self._buffer: List[Tuple[AMQPMessage, asyncio.Future]] = []
+        # publishing id -> future of messages sent but not confirmed yet
+        self._unconfirmed: Dict[int, asyncio.Future] = {}
+        # Confirms that arrived before send_batch returned their publishing id
+        self._early_confirms: Dict[int, ConfirmationStatus] = {}
 
     async def on_publish_confirm(self,status: ConfirmationStatus):
         if status.is_confirmed:
             return print("publish confirm")
         return print("on confirm completed")
 
+    async def start_producer(self) -> None:
+        """Open the shared producer and declare the stream once"""
+        async with self._producer_lock:
+            if self._producer is not None:
+                return
+            producer = Producer(
+                self.stream_property["host"],
+                port=self.stream_property["port"],
+                username=self.stream_property["username"],
+                password=self.stream_property["password"]
+            )
+            await producer.start()
+            await producer.create_stream(
+                self.stream_property["stream_name"],
+                exists_ok=True,
+                arguments={"max-length-bytes": self.stream_property["stream_retention"]}
+            )
+            self._producer = producer
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop_producer(self) -> None:
+        """Send what is still buffered, then close the shared producer"""
+        async with self._producer_lock:
+            if self._producer is None:
+                return
+            if self._flush_task:
+                self._flush_task.cancel()
+                self._flush_task = None
+            try:
+                await self._send_buffered()
+            finally:
+                await self._producer.close()
+                self._producer = None
+            for future in self._unconfirmed.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Producer closed before confirm"))
+            self._unconfirmed.clear()
+
+    async def publish(self, bid_data: BidsDTO) -> asyncio.Future:
+        """
+        Queue a bid for the next batch.
+        Returns a future resolved with its ConfirmationStatus once the broker confirms it.
+        """
+        if self._producer is None:
+            await self.start_producer()
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((AMQPMessage(body=bid_data.model_dump_json().encode("utf-8")), future))
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+        return future
+
     async def use_producer(self, bid_data: BidsDTO, on_publish_confirm= None):
-        """Create a RabbitMQ producer."""
+        """Publish a bid through the shared producer and wait for its confirm."""
 
         if on_publish_confirm is None:
             on_publish_confirm = self.on_publish_confirm
         try:
-            async with Producer(
-                self.stream_property["host"],
-                username=self.stream_property["username"],
-                password=self.stream_property["password"]
-            ) as producer:
-                await producer.create_stream(
-                    self.stream_property["stream_name"],
-                    exists_ok=True,
-                    arguments={"max-length-bytes": self.stream_property["stream_retention"]}
-                )
-                amqp_message = AMQPMessage(
-                    body=bid_data.model_dump_json().encode("utf-8")
-                )
-                await producer.send(
-                    stream=self.stream_property["stream_name"],
-                    message=amqp_message,
-                    on_publish_confirm=lambda status: on_publish_confirm(status)
-                )
+            future = await self.publish(bid_data)
+            status = await asyncio.wait_for(future, timeout=self.confirm_timeout)
+            await on_publish_confirm(status)
+            return {
+                "published": status.is_confirmed,
+                "publishing_id": status.message_id
+            }
+        except asyncio.TimeoutError:
+            print("Timed out waiting for publish confirm")
+            return {"error": "Bid sent but not confirmed in time"}
         except Exception as e:
             # Handle exception (add your logic here)
             print(f"Error sending bid data: {e}")
             return {"error": "Failed to send bid data"}
 
+    async def _flush_periodically(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self._send_buffered()
+            except Exception as e:
+                print(f"Error sending bid batch: {e}")
+
+    async def _send_buffered(self):
+        while self._buffer:
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            try:
+                publishing_ids = await self._producer.send_batch(
+                    stream=self.stream_property["stream_name"],
+                    batch=[message for message, _ in batch],
+                    on_publish_confirm=self._on_batch_confirm
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+            for publishing_id, (_, future) in zip(publishing_ids, batch):
+                status = self._early_confirms.pop(publishing_id, None)
+                if status is not None:
+                    self._resolve(future, status)
+                else:
+                    self._unconfirmed[publishing_id] = future
+
+    async def _on_batch_confirm(self, status: ConfirmationStatus):
+        future = self._unconfirmed.pop(status.message_id, None)
+        if future is None:
+            self._early_confirms[status.message_id] = status
+            return
+        self._resolve(future, status)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, status: ConfirmationStatus):
+        if not future.done():
+            future.set_result(status)
+
     async def call_back(self,msg: AMQPMessage,message_context: MessageContext):
         try:
             data_str = msg.body.decode("utf-8")
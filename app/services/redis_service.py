@@ -1,85 +1,186 @@
+import asyncio
+import inspect
 import json
+from typing import Iterable, List, Optional, Tuple
 
-from app.db.repositories.redis_repository import RedisRepository
+from app.db.repositories.redis_repository import AsyncRedisRepository
 import uuid
-import time
+
+# Channel the ws-server subscribes to for live bid updates
+BID_UPDATES_CHANNEL = "bid_updates"
+
+# Compare-and-set of the per-auction and per-night highest bid, publishing the
+# delta in the same round-trip so readers never see a half-applied update.
+# KEYS[1] auction highest bid, KEYS[2] hash night -> highest price per night
+# ARGV[1] pub/sub channel, ARGV[2] ws channel, ARGV[3] auction id,
+# ARGV[4] bid amount, ARGV[5] price per night, ARGV[6..] nights (ISO dates)
+# cjson encodes an empty table as {}, so ``nights`` is only set when a night
+# changed; consumers read a missing ``nights`` as an empty list.
+HIGHEST_BID_SCRIPT = """
+local amount = tonumber(ARGV[4])
+local auction_changed = 0
+if amount > tonumber(redis.call('GET', KEYS[1]) or '0') then
+    redis.call('SET', KEYS[1], ARGV[4])
+    auction_changed = 1
+end
+local price = tonumber(ARGV[5])
+local changed = {}
+for i = 6, #ARGV do
+    if price > tonumber(redis.call('HGET', KEYS[2], ARGV[i]) or '0') then
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[5])
+        table.insert(changed, ARGV[i])
+    end
+end
+if auction_changed == 1 or #changed > 0 then
+    local delta = {type = 'highest_bid', channel = ARGV[2], auction_id = ARGV[3]}
+    if auction_changed == 1 then
+        delta['current_bid'] = amount
+    end
+    if #changed > 0 then
+        delta['nights'] = changed
+        delta['price_per_night'] = price
+    end
+    redis.call('PUBLISH', ARGV[1], cjson.encode(delta))
+end
+return {auction_changed, changed}
+"""
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def auction_channel(auction_id: str) -> str:
+    """WebSocket channel a client subscribes to for one auction"""
+    return f"auction:{auction_id}"
+
+
+def night_bids_key(auction_id: str) -> str:
+    """Hash of the highest price per night for one auction"""
+    return f"{auction_id}:nights"
+
 
 class RedisService:
-    def __init__(self, redis_repository: RedisRepository):
-        """Initialize the RedisService with a Redis repository."""
+    def __init__(self, redis_repository: AsyncRedisRepository):
+        """Initialize the RedisService with an async Redis repository."""
         self.redis_repository = redis_repository
         self.max_retry = redis_repository.max_retry
         self.expire = redis_repository.expire
+        self._highest_bid_script = redis_repository.register_script(HIGHEST_BID_SCRIPT)
+        self._release_lock_script = redis_repository.register_script(RELEASE_LOCK_SCRIPT)
 
-    def publish_message(self, channel: str, message: str) -> bool:
+    async def publish_message(self, channel: str, message: str) -> bool:
         """Publish a message to a Redis channel."""
         try:
-            self.redis_repository.publish(channel, message)
+            await self.redis_repository.publish(channel, message)
             print(f"Message published to {channel}: {message}")
             return True
         except Exception as e:
             print(f"Error publishing message: {e}")
             return False
-    def get_highest_bid(self, auction_id: str) -> float:
+    async def publish_calendar_delta(self, auction_id: str, property_id: int, days: list) -> bool:
+        """
+        Publish the calendar days an accepted bid changed (new highest bid and
+        minimum to win per date) so the ws-server pushes them to the auction channel.
+        """
+        message = json.dumps({
+            "type": "calendar_delta",
+            "channel": auction_channel(auction_id),
+            "auction_id": auction_id,
+            "property_id": property_id,
+            "days": days
+        })
+        return await self.publish_message(BID_UPDATES_CHANNEL, message)
+
+    async def get_highest_bid(self, auction_id: str) -> float:
         """Get the highest bid for an auction from Redis."""
         try:
-            highest_bid = self.redis_repository.get(auction_id)
+            highest_bid = await self.redis_repository.get(auction_id)
             if highest_bid is not None:
                 return float(highest_bid)
             return 0.0
         except Exception as e:
             print(f"Error getting highest bid: {e}")
             return 0.0
-    def set_highest_bid(self, auction_id: str, highest_bid: float) -> None:
+    async def set_highest_bid(self, auction_id: str, highest_bid: float) -> None:
         """Set the highest bid for an auction in Redis."""
         try:
-            self.redis_repository.set(auction_id, highest_bid)
+            await self.redis_repository.set(auction_id, highest_bid, nx=False)
             print(f"Highest bid for {auction_id} set to {highest_bid}")
         except Exception as e:
             print(f"Error setting highest bid: {e}")
-    def publication_lock(self, key: str, value=None, expire=None, doSomeThing=None) -> bool:
+    async def publication_lock(self, key: str, value=None, expire=None, doSomeThing=None) -> bool:
         """Acquire a lock in Redis for publication."""
 
-        if self.expire is None:
+        if expire is None:
             expire = self.expire
         if value is None:
             value = gen_lock_value()
         if doSomeThing is None:
             raise Exception("Missing doSomeThing callback")
         lock_key = f"lock:{key}"
-        retry_count = 0
-        while retry_count < self.max_retry:
-            got_lock = self.redis_repository.set(lock_key, value, ex=expire, nx=True)
+        for attempt in range(self.max_retry):
+            got_lock = await self.redis_repository.set(lock_key, value, ex=expire, nx=True)
             if got_lock:
                 try:
-                    if doSomeThing:
-                        doSomeThing()
+                    result = doSomeThing()
+                    if inspect.isawaitable(result):
+                        await result
                     return True
                 finally:
-                    if self.redis_repository.get(lock_key) == value.encode():
-                        self.redis_repository.delete(lock_key)
-                return True
-                break
-            else:
-                retry_count += 1
-                print(f"Lock busy, retrying {retry_count}/{self.max_retry}...")
-                time.sleep(0.2)  # Wait before retry
+                    await self._release_lock_script(keys=[lock_key], args=[value])
+            print(f"Lock busy, retrying {attempt + 1}/{self.max_retry}...")
+            # Yield to the event loop instead of blocking the worker thread
+            await asyncio.sleep(0.05 * 2 ** attempt)
         return False
-    def update_highest_bid(self, channel:str ,auction_id: str, current_bid: int) -> bool:
+    async def update_highest_bid(self,
+                                 channel: str,
+                                 auction_id: str,
+                                 current_bid: float,
+                                 nights: Optional[Iterable[str]] = None,
+                                 price_per_night: Optional[float] = None) -> bool:
+        """
+        Atomically raise the auction's highest bid and, when ``nights`` are given,
+        the highest price of each night, publishing what changed to ``channel``.
+        Returns True if anything was raised.
+        """
         try:
-            highest_bid = float(self.redis_repository.get(auction_id).decode("utf-8"))
-            if current_bid > highest_bid:
-                self.redis_repository.publish(channel,
-                                              json.dumps({"auction_id":auction_id,
-                                                        "current_bid":current_bid}))
-                self.redis_repository.set(auction_id, current_bid,nx = False)
-            else:
-                print(f"Bid {current_bid} is not higher than current highest {highest_bid}")
-                return False
+            auction_changed, changed_nights = await self._raise_highest_bid(
+                channel, auction_id, current_bid, nights or [], price_per_night
+            )
         except Exception as e:
             print(f"Error updating highest bid redis service: {e}")
             return False
+        if not auction_changed and not changed_nights:
+            print(f"Bid {current_bid} is not higher than the current highest for {auction_id}")
+            return False
         return True
+
+    async def _raise_highest_bid(self,
+                                 channel: str,
+                                 auction_id: str,
+                                 current_bid: float,
+                                 nights: Iterable[str],
+                                 price_per_night: Optional[float]) -> Tuple[bool, List[str]]:
+        nights = [str(night) for night in nights]
+        auction_changed, changed_nights = await self._highest_bid_script(
+            keys=[auction_id, night_bids_key(auction_id)],
+            args=[
+                channel,
+                auction_channel(auction_id),
+                auction_id,
+                current_bid,
+                price_per_night if price_per_night is not None else 0,
+                *nights
+            ]
+        )
+        return bool(auction_changed), [
+            night.decode("utf-8") if isinstance(night, bytes) else night for night in changed_nights or []
+        ]
 def gen_lock_value() -> str:
     """Generate a unique lock value."""
     return str(uuid.uuid4())
@@ -4,17 +4,21 @@ from typing import Dict, Optional, List
 from datetime import timedelta
 from app.db.repositories.bid_repository import BidRepository
 from app.db.repositories.auction_repository import AuctionRepository
+from app.db.repositories.calender_repository import CalendarRepository
 from app.db.models.Bid import Bids
-from app.db.models.calendar_availability import CalendarAvailability
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class WinLoseService:
-    def __init__(self, bid_repository: BidRepository, auction_repository: AuctionRepository):
+    def __init__(self,
+                 bid_repository: BidRepository,
+                 auction_repository: AuctionRepository,
+                 calendar_repository: CalendarRepository):
         self.bid_repository = bid_repository
         self.auction_repository = auction_repository
+        self.calendar_repository = calendar_repository
 
     def get_user_win_lose_status(self, user_id: int, auction_id: str) -> Dict:
         """
@@ -36,8 +40,15 @@ class WinLoseService:
             if not auction:
                 raise ValueError("Auction not found")
 
-            # 3. Tính toán win-lose analysis
-            analysis_result = self._calculate_win_lose_analysis(current_bid, auction.property_id)
+            # 3. Lấy market price của cả khoảng ngày bằng 1 query
+            market_prices = self._get_market_prices(
+                self.calendar_repository.get_calendar_data_range(
+                    current_bid.check_in, current_bid.check_out, auction.property_id, auction_id
+                )
+            )
+
+            # 4. Tính toán win-lose analysis
+            analysis_result = self._calculate_win_lose_analysis(current_bid, market_prices)
 
             return {
                 "success": True,
@@ -67,9 +78,56 @@ class WinLoseService:
             logger.error(f"Error getting user active bid: {e}")
             return None
 
-    def _calculate_win_lose_analysis(self, bid: Bids, property_id: int) -> Dict:
+    def get_auction_win_lose_statuses(self, auction_id: str) -> Dict:
+        """
+        Lấy win-lose status của mọi bidder trong auction:
+        1 query bids + 1 query calendar cho cả auction
+        """
+        try:
+            auction = self.auction_repository.get_auction_by_id(auction_id)
+            if not auction:
+                raise ValueError("Auction not found")
+
+            bids = self.bid_repository.get_active_bids_by_auction(auction_id)
+            market_prices = self._get_market_prices(
+                self.calendar_repository.get_calendar_by_auction(auction.property_id, auction_id)
+            ) if bids else {}
+
+            bidders = [
+                {
+                    "user_id": bid.user_id,
+                    **self._calculate_win_lose_analysis(bid, market_prices)
+                }
+                for bid in bids
+            ]
+
+            return {
+                "success": True,
+                "auction_id": auction_id,
+                "total_bidders": len(bidders),
+                "bidders": bidders
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting win-lose statuses for auction {auction_id}: {e}")
+            return {
+                "success": False,
+                "auction_id": auction_id,
+                "message": f"Error: {str(e)}"
+            }
+
+    def _get_market_prices(self, calendar_entries) -> Dict:
         """
-        Tính toán win-lose analysis cho một bid
+        Map ngày -> market price (giá 0 / NULL được coi là chưa có dữ liệu)
+        """
+        return {
+            entry.date: float(entry.price_amount) if entry.price_amount else None
+            for entry in calendar_entries
+        }
+
+    def _calculate_win_lose_analysis(self, bid: Bids, market_prices: Dict) -> Dict:
+        """
+        Tính toán win-lose analysis cho một bid từ market prices đã load sẵn
         """
         try:
             # Tính price per day
@@ -86,7 +144,7 @@ class WinLoseService:
             total_days = len(dates_in_range)
 
             for date in dates_in_range:
-                day_analysis = self._analyze_day(date, bid_price_per_day, property_id)
+                day_analysis = self._analyze_day(bid_price_per_day, market_prices.get(date))
                 daily_results[date.isoformat()] = day_analysis
 
                 if day_analysis["status"] == "WIN":
@@ -118,49 +176,29 @@ class WinLoseService:
             logger.error(f"Error calculating win-lose analysis: {e}")
             raise
 
-    def _analyze_day(self, date, bid_price_per_day: float, property_id: int) -> Dict:
+    def _analyze_day(self, bid_price_per_day: float, market_price: Optional[float]) -> Dict:
         """
-        Phân tích win-lose cho một ngày cụ thể
+        Phân tích win-lose cho một ngày cụ thể với market price đã có sẵn
         """
-        try:
-            # Lấy market price từ calendar
-            calendar_entry = self.bid_repository.db.query(CalendarAvailability).filter(
-                CalendarAvailability.property_id == property_id,
-                CalendarAvailability.date == date
-            ).first()
-
-            market_price = float(
-                calendar_entry.price_amount) if calendar_entry and calendar_entry.price_amount else None
-
-            if market_price is not None:
-                if bid_price_per_day >= market_price:
-                    status = "WIN"
-                else:
-                    status = "LOSE"
-                difference = bid_price_per_day - market_price
-                difference_percentage = (difference / market_price * 100) if market_price > 0 else 0
+        if market_price is not None:
+            if bid_price_per_day >= market_price:
+                status = "WIN"
             else:
-                status = "NO_DATA"
-                difference = None
-                difference_percentage = None
-
-            return {
-                "bid_price": bid_price_per_day,
-                "market_price": market_price,
-                "status": status,
-                "difference": round(difference, 2) if difference is not None else None,
-                "difference_percentage": round(difference_percentage, 2) if difference_percentage is not None else None
-            }
-
-        except Exception as e:
-            logger.error(f"Error analyzing day {date}: {e}")
-            return {
-                "bid_price": bid_price_per_day,
-                "market_price": None,
-                "status": "ERROR",
-                "difference": None,
-                "difference_percentage": None
-            }
+                status = "LOSE"
+            difference = bid_price_per_day - market_price
+            difference_percentage = (difference / market_price * 100) if market_price > 0 else 0
+        else:
+            status = "NO_DATA"
+            difference = None
+            difference_percentage = None
+
+        return {
+            "bid_price": bid_price_per_day,
+            "market_price": market_price,
+            "status": status,
+            "difference": round(difference, 2) if difference is not None else None,
+            "difference_percentage": round(difference_percentage, 2) if difference_percentage is not None else None
+        }
 
     def _get_dates_in_range(self, check_in, check_out) -> List:
         """
@@ -1,9 +1,11 @@
-from typing import List, Dict
-from datetime import datetime, timedelta
+import heapq
+from typing import List, Dict, NamedTuple, Optional, Tuple
+from datetime import date, datetime, timedelta
 from collections import defaultdict
 from pydantic import BaseModel
 from app.db.repositories.bid_repository import BidRepository
 from app.db.repositories.auction_repository import AuctionRepository
+from app.db.repositories.calender_repository import CalendarRepository
 
 
 class DailyWinner(BaseModel):
@@ -17,42 +19,94 @@ class DailyWinner(BaseModel):
         from_attributes = True
 
 
+ONE_DAY = timedelta(days=1)
+
+
+class _BidInterval(NamedTuple):
+    """Bid đã chuẩn hoá: đêm [check_in, check_out) với giá mỗi đêm"""
+    check_in: date
+    check_out: date
+    price_per_day: float
+    user_id: int
+    total_amount: float
+
+
+def _to_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def sweep_daily_winners(start_date: date, end_date: date, bids) -> List[Tuple[date, _BidInterval]]:
+    """
+    Winner của từng ngày trong [start_date, end_date] bằng sweep-line.
+
+    Bids được chuẩn hoá và sort theo check_in một lần; một max-heap theo
+    price_per_day giữ các bid đang phủ ngày hiện tại, bid hết hạn (check_out <= ngày)
+    bị loại lười khi nổi lên đỉnh. Tổng chi phí O((days + bids) log bids).
+    Hoà giá: bid đứng trước trong danh sách thắng, giống max() trước đây.
+    """
+    intervals = []
+    for index, bid in enumerate(bids):
+        check_in = _to_date(bid.check_in)
+        check_out = _to_date(bid.check_out)
+        nights = (check_out - check_in).days
+        if nights <= 0:
+            continue  # Skip invalid bids
+        total_amount = float(bid.total_amount)
+        intervals.append((check_in, index, _BidInterval(
+            check_in, check_out, total_amount / nights, bid.user_id, total_amount
+        )))
+    intervals.sort(key=lambda item: (item[0], item[1]))
+
+    winners = []
+    heap: List[Tuple[float, int, _BidInterval]] = []
+    next_bid = 0
+    current_date = start_date
+    while current_date <= end_date:
+        # Đưa vào heap mọi bid bắt đầu từ ngày này trở về trước
+        while next_bid < len(intervals) and intervals[next_bid][0] <= current_date:
+            _, index, interval = intervals[next_bid]
+            heapq.heappush(heap, (-interval.price_per_day, index, interval))
+            next_bid += 1
+        # Loại các bid đã check-out (checkout không tính)
+        while heap and heap[0][2].check_out <= current_date:
+            heapq.heappop(heap)
+
+        if heap:
+            winners.append((current_date, heap[0][2]))
+        elif next_bid < len(intervals):
+            # Không có bid nào phủ => nhảy thẳng tới check_in kế tiếp
+            current_date = max(current_date + ONE_DAY, intervals[next_bid][0])
+            continue
+        else:
+            break
+        current_date += ONE_DAY
+
+    return winners
+
+
 class WinnerService:
-    def __init__(self, bid_repository: BidRepository, auction_repository: AuctionRepository):
+    def __init__(self,
+                 bid_repository: BidRepository,
+                 auction_repository: AuctionRepository,
+                 calendar_repository: Optional[CalendarRepository] = None):
         self.bid_repository = bid_repository
         self.auction_repository = auction_repository
+        self.calendar_repository = calendar_repository
 
     def calculate_winners(self, auction_id: str) -> List[DailyWinner]:
         """
         Tính toán người chiến thắng cho từng ngày.
         Chỉ trả về winners, KHÔNG tạo booking.
         """
-        # 1. Lấy auction info
-        auction = self.auction_repository.get_auction_by_id(auction_id)
-        if not auction:
-            raise ValueError("Auction not found")
-
-        # 2. Lấy active bids
-        bids = self.bid_repository.get_active_bids_by_auction(auction_id)
-        if not bids:
-            return []
-
-        # 3. Duyệt từng ngày, tìm winner cho từng ngày
-        winners = []
-        current_date = auction.start_date
-
-        while current_date <= auction.end_date:
-            winner = self._find_winner_for_date(current_date, bids)
-            if winner:
-                winners.append(DailyWinner(
-                    date=current_date.strftime('%Y-%m-%d'),
-                    user_id=winner["user_id"],
-                    price_per_day=winner["price_per_day"],
-                    total_amount=winner["total_amount"]
-                ))
-            current_date += timedelta(days=1)
-
-        return winners
+        return [
+            DailyWinner(
+                date=night.strftime('%Y-%m-%d'),
+                user_id=winner.user_id,
+                price_per_day=winner.price_per_day,
+                total_amount=winner.total_amount
+            )
+            for night, winner in self._compute_daily_winners(auction_id)
+        ]
 
     def calculate_booking_periods(self, auction_id: str) -> List[Dict]:
         """
@@ -69,32 +123,22 @@ class WinnerService:
             }
         ]
         """
-        # 1. Lấy daily winners
-        daily_winners = self.calculate_winners(auction_id)
+        # 1. Lấy daily winners (đã theo thứ tự ngày)
+        daily_winners = self._compute_daily_winners(auction_id)
 
         if not daily_winners:
             return []
 
-        # 2. Group by user_id
+        # 2. Group by user_id, giữ date object => không cần strptime
         user_winning_dates = defaultdict(list)
+        for night, winner in daily_winners:
+            user_winning_dates[winner.user_id].append((night, winner.price_per_day))
 
-        for winner in daily_winners:
-            user_winning_dates[winner.user_id].append({
-                'date': winner.date,
-                'price_per_day': winner.price_per_day
-            })
-
-        # 3. Sort dates for each user
-        for user_id in user_winning_dates:
-            user_winning_dates[user_id].sort(key=lambda x: x['date'])
-
-        # 4. Create booking periods for each user
+        # 3. Create booking periods for each user
         booking_periods = []
 
         for user_id, winning_dates in user_winning_dates.items():
-            user_periods = self._create_consecutive_periods(user_id, winning_dates)
-
-            for period in user_periods:
+            for period in self._create_consecutive_periods(winning_dates):
                 booking_periods.append({
                     "auction_id": auction_id,
                     "check_in_win": period['check_in'],
@@ -105,94 +149,51 @@ class WinnerService:
 
         return booking_periods
 
-    def _create_consecutive_periods(self, user_id: int, winning_dates: List[Dict]) -> List[Dict]:
-        """Tạo các periods liên tục từ list winning dates"""
-        if not winning_dates:
-            return []
+    def _compute_daily_winners(self, auction_id: str) -> List[Tuple[date, "_BidInterval"]]:
+        """Lấy auction + active bids rồi tính winner từng ngày bằng sweep-line"""
+        # 1. Lấy auction info
+        auction = self.auction_repository.get_auction_by_id(auction_id)
+        if not auction:
+            raise ValueError("Auction not found")
 
-        periods = []
-        current_period = {
-            'dates': [winning_dates[0]],
-            'check_in': winning_dates[0]['date']
-        }
+        # 2. Lấy active bids
+        bids = self.bid_repository.get_active_bids_by_auction(auction_id)
+        if not bids:
+            return []
 
-        # Group consecutive dates
-        for i in range(1, len(winning_dates)):
-            current_date = winning_dates[i]['date']
-            prev_date = winning_dates[i - 1]['date']
+        return sweep_daily_winners(_to_date(auction.start_date), _to_date(auction.end_date), bids)
 
-            # Check if consecutive (1 day difference)
-            current_dt = datetime.strptime(current_date, '%Y-%m-%d')
-            prev_dt = datetime.strptime(prev_date, '%Y-%m-%d')
+    def _create_consecutive_periods(self, winning_dates: List[Tuple[date, float]]) -> List[Dict]:
+        """Tạo các periods liên tục từ list (date, price_per_day) đã sort theo ngày"""
+        periods = []
+        check_in, last_night, total_amount, nights = None, None, 0.0, 0
 
-            if (current_dt - prev_dt).days == 1:
+        for night, price_per_day in winning_dates:
+            if last_night is not None and night - last_night == ONE_DAY:
                 # Consecutive - add to current period
-                current_period['dates'].append(winning_dates[i])
-            else:
-                # Not consecutive - finalize current period and start new
-                periods.append(self._finalize_period(current_period))
-                current_period = {
-                    'dates': [winning_dates[i]],
-                    'check_in': current_date
-                }
+                last_night = night
+                total_amount += price_per_day
+                nights += 1
+                continue
+            if last_night is not None:
+                periods.append(self._finalize_period(check_in, last_night, total_amount, nights))
+            check_in, last_night, total_amount, nights = night, night, price_per_day, 1
 
         # Don't forget the last period
-        periods.append(self._finalize_period(current_period))
+        if last_night is not None:
+            periods.append(self._finalize_period(check_in, last_night, total_amount, nights))
 
         return periods
 
-    def _finalize_period(self, period: Dict) -> Dict:
-        """Hoàn thiện thông tin cho booking period"""
-        dates = period['dates']
-        check_in = period['check_in']
-
-        # Check-out = last date + 1 day
-        last_date = dates[-1]['date']
-        check_out_dt = datetime.strptime(last_date, '%Y-%m-%d') + timedelta(days=1)
-        check_out = check_out_dt.strftime('%Y-%m-%d')
-
-        # Total amount = sum of price_per_day for each winning day
-        total_amount = sum(d['price_per_day'] for d in dates)
-
+    def _finalize_period(self, check_in: date, last_night: date, total_amount: float, nights: int) -> Dict:
+        """Hoàn thiện thông tin cho booking period (check-out = last date + 1 day)"""
         return {
-            'check_in': check_in,
-            'check_out': check_out,
+            'check_in': check_in.strftime('%Y-%m-%d'),
+            'check_out': (last_night + ONE_DAY).strftime('%Y-%m-%d'),
             'total_amount': total_amount,
-            'nights': len(dates)
+            'nights': nights
         }
-    def _find_winner_for_date(self, date: datetime, bids) -> Dict:
-        """Tìm winner cho 1 ngày cụ thể - người bid giá cao nhất cho ngày đó."""
-        valid_bids = []
-
-        for bid in bids:
-            # Convert to date if datetime
-            check_in = bid.check_in.date() if hasattr(bid.check_in, 'date') else bid.check_in
-            check_out = bid.check_out.date() if hasattr(bid.check_out, 'date') else bid.check_out
-            target_date = date.date() if hasattr(date, 'date') else date
-
-            # Check if bid covers this date
-            if check_in <= target_date < check_out:  # Note: < check_out vì checkout không tính
-
-                # Tính price per day
-                nights = (check_out - check_in).days
-                total_days = nights  # Số ngày = số đêm
-
-                if total_days > 0:
-                    price_per_day = float(bid.total_amount) / total_days
-                else:
-                    continue  # Skip invalid bids
-
-                valid_bids.append({
-                    "user_id": bid.user_id,
-                    "price_per_day": price_per_day,
-                    "total_amount": float(bid.total_amount)
-                })
-
-        if not valid_bids:
-            return None
 
-        # Tìm winner theo price_per_day cao nhất
-        return max(valid_bids, key=lambda x: x["price_per_day"])
     #
     # def get_winners_summary(self, auction_id: str) -> Dict:
     #     """
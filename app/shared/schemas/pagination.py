@@ -24,4 +24,6 @@ class PaginationInfo(BaseModel):
     page: int
     limit: int
     total: int
-    has_more: bool
\ No newline at end of file
+    has_more: bool
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
\ No newline at end of file
@@ -0,0 +1 @@
+"""Standalone worker processes (run with ``python -m app.workers.<name>``)."""
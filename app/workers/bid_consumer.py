@@ -0,0 +1,296 @@
+"""Long-running consumer of the bidding stream.
+
+Run with ``python -m app.workers.bid_consumer``. The worker owns the in-memory
+bid book: it subscribes to the stream once, places bids in micro-batches
+(``consumer_batch_size`` bids or ``consumer_batch_interval_ms``), waits for the
+bid book writer to commit each batch in one transaction and only then stores
+the stream offset, so a restart resumes right after the last committed bid.
+"""
+
+import asyncio
+import json
+import logging
+import signal
+import time
+from datetime import datetime as dt
+from typing import Dict, List, Optional, Tuple
+
+from rstream import (
+    AMQPMessage,
+    Consumer,
+    MessageContext,
+    amqp_decoder,
+    ConsumerOffsetSpecification,
+    OffsetType
+)
+
+from app.core.config import settings
+from app.core.container import Container
+from app.db.repositories.redis_repository import AsyncRedisRepository
+from app.schemas.BidDTO import BidsDTO
+from app.services.bid_book import BidBookWriter
+from app.services.bid_service import BidService
+from app.services.redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+# Redis key the consumer publishes its lag report under
+CONSUMER_STATS_KEY = "bid_consumer:stats"
+
+
+def parse_bid_message(body: bytes) -> BidsDTO:
+    """Build a BidsDTO from a raw stream message, raising on malformed input"""
+    bid_data = json.loads(body.decode("utf-8"))
+    current_time = dt.now().isoformat()
+    return BidsDTO(
+        user_id=bid_data.get("user_id"),
+        property_id=int(bid_data.get("property_id", 0)),
+        auction_id=bid_data.get("auction_id"),
+        bid_amount=int(bid_data.get("bid_amount")),
+        bid_time=bid_data.get("bid_time", current_time),
+        check_in=bid_data.get("check_in"),
+        check_out=bid_data.get("check_out"),
+        allow_partial=bool(bid_data.get("allow_partial", True)),
+        partial_awarded=bool(bid_data.get("partial_awarded", False)),
+        created_at=bid_data.get("created_at", current_time)
+    )
+
+
+class BidStreamConsumer:
+    """Batched, offset-tracking consumer feeding the bid book"""
+
+    def __init__(self,
+                 stream_property: dict,
+                 bid_service: BidService,
+                 writer: BidBookWriter,
+                 redis_repository: Optional[AsyncRedisRepository] = None,
+                 redis_service: Optional[RedisService] = None,
+                 subscriber_name: str = "bid-consumer",
+                 batch_size: int = 200,
+                 batch_interval_ms: int = 100,
+                 report_interval: int = 10,
+                 commit_timeout: float = 30.0):
+        self.stream_property = stream_property
+        self.stream = stream_property["stream_name"]
+        self.bid_service = bid_service
+        self.writer = writer
+        self.redis_repository = redis_repository
+        self.redis_service = redis_service
+        self.subscriber_name = subscriber_name
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000
+        self.report_interval = report_interval
+        self.commit_timeout = commit_timeout
+
+        self.consumer: Optional[Consumer] = None
+        self._pending: List[Tuple[int, bytes]] = []
+        self._batch_lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+
+        self.received_offset: Optional[int] = None
+        self.committed_offset: Optional[int] = None
+        self.last_message_timestamp: Optional[int] = None  # ms since epoch, from the stream chunk
+        self.accepted = 0
+        self.rejected = 0
+
+    async def run(self) -> None:
+        """Subscribe once and process until ``stop`` is called"""
+        self.consumer = Consumer(
+            self.stream_property["host"],
+            port=self.stream_property["port"],
+            username=self.stream_property["username"],
+            password=self.stream_property["password"]
+        )
+        await self.consumer.start()
+        await self.consumer.create_stream(
+            self.stream,
+            exists_ok=True,
+            arguments={"max-length-bytes": self.stream_property["stream_retention"]}
+        )
+        offset_specification = await self._resume_offset()
+        await self.consumer.subscribe(
+            stream=self.stream,
+            callback=self._on_message,
+            decoder=amqp_decoder,
+            offset_specification=offset_specification,
+            subscriber_name=self.subscriber_name
+        )
+        logger.info(f"Bid consumer '{self.subscriber_name}' subscribed to {self.stream}")
+
+        tasks = [
+            asyncio.create_task(self._flush_periodically()),
+            asyncio.create_task(self._report_periodically())
+        ]
+        try:
+            await self._stopped.wait()
+            await self._process_pending()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.consumer.close()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def stats(self) -> dict:
+        lag_ms = None
+        if self.last_message_timestamp is not None:
+            lag_ms = max(0, int(time.time() * 1000) - self.last_message_timestamp)
+        uncommitted = 0
+        if self.received_offset is not None:
+            uncommitted = self.received_offset - (self.committed_offset if self.committed_offset is not None else -1)
+        return {
+            "subscriber_name": self.subscriber_name,
+            "stream": self.stream,
+            "received_offset": self.received_offset,
+            "committed_offset": self.committed_offset,
+            "uncommitted_messages": uncommitted,
+            "pending_writes": self.writer.pending,
+            "lag_ms": lag_ms,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "reported_at": dt.now().isoformat()
+        }
+
+    async def _resume_offset(self) -> ConsumerOffsetSpecification:
+        """Resume after the last stored offset, or replay the retained stream"""
+        try:
+            stored = await self.consumer.query_offset(stream=self.stream, subscriber_name=self.subscriber_name)
+        except Exception as e:
+            # Replaying is safe: bids older than the user's current bid are rejected
+            logger.info(f"No stored offset for '{self.subscriber_name}', starting from the first message: {e}")
+            return ConsumerOffsetSpecification(OffsetType.FIRST, None)
+        self.committed_offset = stored
+        logger.info(f"Resuming '{self.subscriber_name}' after offset {stored}")
+        return ConsumerOffsetSpecification(OffsetType.OFFSET, stored + 1)
+
+    async def _on_message(self, msg: AMQPMessage, message_context: MessageContext) -> None:
+        self.received_offset = message_context.offset
+        self.last_message_timestamp = message_context.timestamp
+        self._pending.append((message_context.offset, msg.body))
+        if len(self._pending) >= self.batch_size:
+            # Awaiting here applies backpressure to the stream reader
+            await self._process_pending()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            try:
+                await self._process_pending()
+            except Exception as e:
+                logger.error(f"Error processing bid batch: {e}")
+
+    async def _process_pending(self) -> None:
+        async with self._batch_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            # auction_id -> (property_id, {date: latest calendar day})
+            deltas: Dict[str, Tuple[int, Dict[str, dict]]] = {}
+
+            for offset, body in batch:
+                try:
+                    bids_dto = parse_bid_message(body)
+                except Exception as e:
+                    self.rejected += 1
+                    logger.warning(f"Skipping malformed bid at offset {offset}: {e}")
+                    continue
+                result = self.bid_service.place_bid(bids_dto)
+                if result.get("success"):
+                    self.accepted += 1
+                    if result.get("calendar_delta"):
+                        _, days = deltas.setdefault(result["auction_id"], (result["property_id"], {}))
+                        for day in result["calendar_delta"]:
+                            days[day["date"]] = day
+                else:
+                    self.rejected += 1
+                    logger.info(f"Bid at offset {offset} rejected: {result.get('message')}")
+
+            # Only move the stored offset once the whole batch is committed
+            committed = self.writer.barrier()
+            if not await asyncio.to_thread(committed.wait, self.commit_timeout):
+                logger.error(f"Bid batch ending at offset {batch[-1][0]} not committed in time; offset not stored")
+                return
+            last_offset = batch[-1][0]
+            await self.consumer.store_offset(
+                stream=self.stream,
+                subscriber_name=self.subscriber_name,
+                offset=last_offset
+            )
+            self.committed_offset = last_offset
+            await self._publish_deltas(deltas)
+
+    async def _publish_deltas(self, deltas: Dict[str, Tuple[int, Dict[str, dict]]]) -> None:
+        """Push one compact calendar delta per auction once the batch is committed"""
+        if self.redis_service is None:
+            return
+        for auction_id, (property_id, days) in deltas.items():
+            await self.redis_service.publish_calendar_delta(
+                auction_id, property_id, [days[d] for d in sorted(days)]
+            )
+
+    async def _report_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            stats = self.stats()
+            logger.info(f"Bid consumer lag: {stats}")
+            if self.redis_repository is None:
+                continue
+            try:
+                await self.redis_repository.set(
+                    CONSUMER_STATS_KEY,
+                    json.dumps(stats),
+                    ex=self.report_interval * 3,
+                    nx=False
+                )
+            except Exception as e:
+                logger.warning(f"Error publishing bid consumer stats: {e}")
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    container = Container()
+
+    writer = container.bid_book_writer()
+    writer.start()
+    container.bid_book().rebuild()
+
+    try:
+        redis_repository = container.async_redis_repository()
+        redis_service = container.redis_service()
+    except Exception as e:
+        logger.warning(f"Redis unavailable, lag is only logged and no calendar deltas are pushed: {e}")
+        redis_repository = None
+        redis_service = None
+
+    consumer = BidStreamConsumer(
+        stream_property=container.rabbitmq_stream(),
+        bid_service=container.bid_service(),
+        writer=writer,
+        redis_repository=redis_repository,
+        redis_service=redis_service,
+        subscriber_name=settings.rabbit_mq.consumer_name,
+        batch_size=settings.rabbit_mq.consumer_batch_size,
+        batch_interval_ms=settings.rabbit_mq.consumer_batch_interval_ms,
+        report_interval=settings.rabbit_mq.consumer_report_interval
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, consumer.stop)
+        except NotImplementedError:
+            # Windows: KeyboardInterrupt still stops the worker
+            pass
+
+    try:
+        await consumer.run()
+    finally:
+        writer.stop()
+        if redis_repository is not None:
+            await redis_repository.close()
+        container.shutdown_resources()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
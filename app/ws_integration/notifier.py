@@ -3,106 +3,204 @@
 import json
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
 import requests
-from typing import Any, Dict, Optional
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+# Message fields that identify "the same notification" for coalescing
+_IDENTITY_FIELDS = ("id", "paymentId", "bookingId", "auction_id", "conversation_id")
+
 
 class WebSocketNotifier:
-    """WebSocket notification service that integrates with the ws-server."""
-    
-    def __init__(self):
+    """WebSocket notification service that integrates with the ws-server.
+
+    ``send_to_user`` and ``broadcast`` never touch the network: they enqueue the
+    message and return at once, so calling them from request handlers does not
+    stall the event loop. A background sender thread drains the queue into
+    ``/push-batch`` POSTs over one keep-alive connection pool. While the
+    ws-server is slow the queue coalesces (a newer message for the same target,
+    type and entity replaces the queued one) and, once ``max_pending`` is
+    reached, drops the oldest messages.
+    """
+
+    def __init__(self,
+                 batch_size: int = 100,
+                 flush_interval_ms: int = 50,
+                 max_pending: int = 5000,
+                 timeout: float = 2.0,
+                 retry_delay: float = 0.5):
         """Initialize the WebSocket notifier with configuration."""
         self.ws_server_url = os.environ.get("WS_SERVER_URL", "http://localhost:8080")
         self.enabled = bool(self.ws_server_url)
         if not self.enabled:
             logger.warning("WebSocket notifications disabled: WS_SERVER_URL not set")
-    
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._session.headers.update({"Content-Type": "application/json"})
+
+        # coalesce key -> outbound entry ({"userId"|"channel": ..., "message": ...})
+        self._pending: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
     def send_to_user(self, user_id: int, message: Dict[str, Any]) -> bool:
-        """Send a message to a specific user via WebSocket server.
-        
+        """Queue a message for a specific user.
+
+        The ws-server delivers it only to sockets that connected with
+        ``?userId=<user_id>`` (its ``user:<user_id>`` channel).
+
         Args:
             user_id: The user ID to send the message to
             message: The message payload (must include 'type' field)
-            
+
         Returns:
-            bool: True if message was sent successfully, False otherwise
+            bool: True if the message was queued, False otherwise
         """
-        if not self.enabled:
-            logger.debug(f"WebSocket disabled, would send to user {user_id}: {message}")
-            return False
-            
-        if not isinstance(message, dict) or 'type' not in message:
-            logger.error(f"Invalid WebSocket message format: {message}")
-            return False
-            
-        try:
-            # The ws-server exposes a REST API for sending messages
-            endpoint = f"{self.ws_server_url}/push"
-            payload = {
-                "userId": str(user_id),
-                "message": message
-            }
-            
-            response = requests.post(
-                endpoint, 
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=2  # Short timeout to avoid blocking
-            )
-            
-            if response.status_code == 200:
-                logger.debug(f"WebSocket message sent to user {user_id}: {message['type']}")
-                return True
-            else:
-                logger.warning(f"Failed to send WebSocket message: {response.status_code} {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.exception(f"Error sending WebSocket message: {e}")
-            return False
-    
+        return self._enqueue("userId", str(user_id), message)
+
     def broadcast(self, channel: str, message: Dict[str, Any]) -> bool:
-        """Broadcast a message to a channel.
-        
+        """Queue a message for a channel.
+
+        Only sockets subscribed to the channel (e.g. ``auction:<id>``,
+        ``conversation:<id>``) receive it.
+
         Args:
             channel: The channel name (e.g., 'auction_results')
             message: The message payload (must include 'type' field)
-            
+
         Returns:
-            bool: True if message was broadcast successfully, False otherwise
+            bool: True if the message was queued, False otherwise
         """
+        return self._enqueue("channel", channel, message)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush what is queued (bounded by ``timeout``) and stop the sender"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._session.close()
+
+    def _enqueue(self, target_kind: str, target: str, message: Dict[str, Any]) -> bool:
         if not self.enabled:
-            logger.debug(f"WebSocket disabled, would broadcast to channel {channel}: {message}")
+            logger.debug(f"WebSocket disabled, would send to {target_kind} {target}: {message}")
             return False
-            
+
         if not isinstance(message, dict) or 'type' not in message:
             logger.error(f"Invalid WebSocket message format: {message}")
             return False
-            
+
+        key = self._coalesce_key(target_kind, target, message)
+        with self._cond:
+            if self._stopping:
+                return False
+            if key in self._pending:
+                # Keep the queue position, deliver only the newest state
+                self._pending[key] = {target_kind: target, "message": message}
+                self.merged += 1
+                return True
+            while len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = {target_kind: target, "message": message}
+            self._ensure_started()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    @staticmethod
+    def _coalesce_key(target_kind: str, target: str, message: Dict[str, Any]) -> Hashable:
+        for field in _IDENTITY_FIELDS:
+            if message.get(field) is not None:
+                return target_kind, target, message["type"], field, str(message[field])
+        # No entity id: only exact duplicates are merged
+        return target_kind, target, json.dumps(message, sort_keys=True, default=str)
+
+    def _ensure_started(self) -> None:
+        """Start the sender thread on first use (caller holds ``_cond``)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="ws-notifier", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            batch.append(self._pending.popitem(last=False))
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending and not self._stopping:
+                    self._cond.wait()
+                if len(self._pending) < self.batch_size and not self._stopping:
+                    # Give a burst a moment to coalesce into one POST
+                    self._cond.wait(self.flush_interval)
+                if self._stopping and not self._pending:
+                    return
+                batch = self._take_batch()
+
+            if batch and not self._post_batch([entry for _, entry in batch]):
+                self._requeue(batch)
+                if self._stopping:
+                    return
+                time.sleep(self.retry_delay)
+
+    def _requeue(self, batch: List[Tuple[Hashable, Dict[str, Any]]]) -> None:
+        """Put a failed batch back in front unless newer messages superseded it"""
+        with self._cond:
+            for key, entry in reversed(batch):
+                if key in self._pending:
+                    continue
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                self._pending[key] = entry
+                self._pending.move_to_end(key, last=False)
+
+    def _post_batch(self, entries: List[Dict[str, Any]]) -> bool:
         try:
-            # The ws-server exposes a REST API for broadcasting
-            endpoint = f"{self.ws_server_url}/broadcast"
-            payload = {
-                "channel": channel,
-                "message": message
-            }
-            
-            response = requests.post(
-                endpoint, 
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=2  # Short timeout to avoid blocking
+            # The ws-server routes each entry to its user or channel
+            response = self._session.post(
+                f"{self.ws_server_url}/push-batch",
+                data=json.dumps({"messages": entries}, default=str),
+                timeout=self.timeout
             )
-            
+
             if response.status_code == 200:
-                logger.debug(f"WebSocket message broadcast to channel {channel}: {message['type']}")
+                self.sent += len(entries)
+                delivered = response.json().get("delivered")
+                logger.debug(f"WebSocket batch of {len(entries)} messages sent ({delivered} socket deliveries)")
                 return True
             else:
-                logger.warning(f"Failed to broadcast WebSocket message: {response.status_code} {response.text}")
+                logger.warning(f"Failed to send WebSocket batch: {response.status_code} {response.text}")
                 return False
-                
+
         except Exception as e:
-            logger.exception(f"Error broadcasting WebSocket message: {e}")
-            return False 
\ No newline at end of file
+            logger.warning(f"Error sending WebSocket batch: {e}")
+            return False
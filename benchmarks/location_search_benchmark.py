@@ -0,0 +1,141 @@
+"""Benchmark: trigram location autocomplete vs the previous leading-wildcard ILIKE.
+
+Run from the repo root against a scratch Postgres database (pg_trgm available):
+``python -m benchmarks.location_search_benchmark --url postgresql://...``.
+Builds ``bench_location.properties`` with synthetic rows (1M by default), the
+same generated columns and GIN indexes as V.0_0_7.sql, then times the
+autocomplete query the repository issues. Drop the schema afterwards with
+``--drop``.
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+SCHEMA = "bench_location"
+
+SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}",
+    f"DROP TABLE IF EXISTS {SCHEMA}.properties",
+    f"""
+    CREATE TABLE {SCHEMA}.properties (
+        id bigint PRIMARY KEY,
+        address_line1 varchar(255),
+        city varchar(100),
+        state varchar(100),
+        country varchar(100),
+        status varchar(50),
+        location_search text GENERATED ALWAYS AS (
+            lower(coalesce(city, '') || ' ' || coalesce(state, '') || ' ' ||
+                  coalesce(country, '') || ' ' || coalesce(address_line1, ''))
+        ) STORED,
+        place_search text GENERATED ALWAYS AS (
+            lower(coalesce(city, '') || ' ' || coalesce(state, '') || ' ' || coalesce(country, ''))
+        ) STORED
+    )
+    """,
+    # ~20k distinct cities spread over 200 states and 50 countries
+    f"""
+    INSERT INTO {SCHEMA}.properties (id, address_line1, city, state, country, status)
+    SELECT g,
+           (g % 997) || ' ' || md5((g % 50000)::text) || ' Street',
+           'City' || substr(md5((g % 20000)::text), 1, 8),
+           'State' || substr(md5((g % 200)::text), 1, 6),
+           'Country' || substr(md5((g % 50)::text), 1, 5),
+           CASE WHEN g % 10 = 0 THEN 'DRAFT' ELSE 'ACTIVE' END
+    FROM generate_series(1, :rows) AS g
+    """,
+    f"""
+    CREATE INDEX idx_bench_place_search_trgm ON {SCHEMA}.properties
+        USING gin (place_search gin_trgm_ops) WHERE status = 'ACTIVE'
+    """,
+    f"""
+    CREATE INDEX idx_bench_location_search_trgm ON {SCHEMA}.properties
+        USING gin (location_search gin_trgm_ops) WHERE status = 'ACTIVE'
+    """,
+    f"CREATE INDEX idx_bench_location ON {SCHEMA}.properties (city, state, country)",
+    f"ANALYZE {SCHEMA}.properties",
+]
+
+# Same shape as PropertyRepository.get_location_suggestions
+TRIGRAM_SUGGESTIONS = text(f"""
+    SELECT city, state, country, count(id) AS property_count
+    FROM {SCHEMA}.properties
+    WHERE status = 'ACTIVE' AND place_search LIKE :pattern
+    GROUP BY city, state, country
+    ORDER BY max(word_similarity(:q, place_search)) DESC, property_count DESC
+    LIMIT :limit
+""")
+
+LEGACY_SUGGESTIONS = text(f"""
+    SELECT city, state, country, count(id) AS property_count
+    FROM {SCHEMA}.properties
+    WHERE status = 'ACTIVE'
+      AND (city ILIKE :pattern OR state ILIKE :pattern OR country ILIKE :pattern)
+    GROUP BY city, state, country
+    LIMIT :limit
+""")
+
+
+def time_queries(conn, statement, terms, limit, repeat):
+    samples = []
+    for term in terms:
+        params = {"q": term, "pattern": f"%{term}%", "limit": limit}
+        conn.execute(statement, params).all()  # warm the cache
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(statement, params).all()
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+        "max": samples[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=settings.postgres_db.url)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-setup", action="store_true", help="reuse the table from a previous run")
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--drop", action="store_true", help="drop the benchmark schema and exit")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if args.drop:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        return
+
+    if not args.skip_setup:
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            for statement in SETUP:
+                conn.execute(text(statement), {"rows": args.rows})
+        print(f"Loaded {args.rows} rows and built indexes in {time.perf_counter() - started:.1f}s")
+
+    # Typed prefixes of growing length, as autocomplete sends them
+    terms = ["cit", "city1", "city1a", "state", "state3", "country", "countrya", "ab", "xyz9"]
+    print(f"{'query':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'max (ms)':>10}")
+    with engine.connect() as conn:
+        trigram = time_queries(conn, TRIGRAM_SUGGESTIONS, terms, args.limit, args.repeat)
+        print(f"{'trigram':>10} {trigram['p50']:>10.2f} {trigram['p95']:>10.2f} {trigram['max']:>10.2f}")
+        if not args.skip_legacy:
+            legacy = time_queries(conn, LEGACY_SUGGESTIONS, terms, args.limit, max(1, args.repeat // 5))
+            print(f"{'legacy':>10} {legacy['p50']:>10.2f} {legacy['p95']:>10.2f} {legacy['max']:>10.2f}")
+
+    if trigram["p95"] >= 10:
+        print("WARNING: autocomplete p95 is above the 10 ms target")
+
+
+if __name__ == "__main__":
+    main()
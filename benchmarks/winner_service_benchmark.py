@@ -0,0 +1,88 @@
+"""Benchmark: sweep-line winner engine vs the previous per-day scan.
+
+Run from the repo root: ``python -m benchmarks.winner_service_benchmark``.
+Bids are synthetic (no DB needed); both engines must agree on every night.
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from app.services.winner_service import sweep_daily_winners
+
+
+def legacy_daily_winners(start_date, end_date, bids):
+    """Previous WinnerService algorithm: scan every bid for every date, O(days x bids)"""
+    winners = []
+    current_date = start_date
+    while current_date <= end_date:
+        valid_bids = []
+        for bid in bids:
+            check_in = bid.check_in.date() if hasattr(bid.check_in, 'date') else bid.check_in
+            check_out = bid.check_out.date() if hasattr(bid.check_out, 'date') else bid.check_out
+            target_date = current_date.date() if hasattr(current_date, 'date') else current_date
+            if check_in <= target_date < check_out:
+                nights = (check_out - check_in).days
+                if nights > 0:
+                    valid_bids.append({
+                        "user_id": bid.user_id,
+                        "price_per_day": float(bid.total_amount) / nights,
+                        "total_amount": float(bid.total_amount)
+                    })
+        if valid_bids:
+            winners.append((current_date, max(valid_bids, key=lambda x: x["price_per_day"])))
+        current_date += timedelta(days=1)
+    return winners
+
+
+def make_bids(count, start_date, days, seed):
+    rng = random.Random(seed)
+    bids = []
+    for user_id in range(count):
+        check_in = start_date + timedelta(days=rng.randrange(days))
+        nights = rng.randint(1, 14)
+        bids.append(SimpleNamespace(
+            user_id=user_id,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=nights),
+            total_amount=rng.randint(50, 500) * nights
+        ))
+    return bids
+
+
+def timed(fn, *args, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--bids", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start_date = date(2025, 1, 1)
+    end_date = start_date + timedelta(days=args.days - 1)
+    print(f"{'bids':>8} {'legacy (ms)':>12} {'sweep (ms)':>12} {'speedup':>8}")
+    for count in args.bids:
+        bids = make_bids(count, start_date, args.days, args.seed)
+        legacy_time, legacy = timed(legacy_daily_winners, start_date, end_date, bids)
+        sweep_time, sweep = timed(sweep_daily_winners, start_date, end_date, bids)
+
+        assert [(d, w["user_id"], w["price_per_day"]) for d, w in legacy] == \
+               [(d, w.user_id, w.price_per_day) for d, w in sweep], "engines disagree"
+        print(f"{count:>8} {legacy_time * 1000:>12.2f} {sweep_time * 1000:>12.2f} "
+              f"{legacy_time / sweep_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+poetry run python -m app.workers.bid_consumer
\ No newline at end of file
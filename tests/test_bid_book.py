@@ -0,0 +1,87 @@
+"""Bid book behaviour that needs no database: repositories are replaced by fakes."""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import bid_book
+from app.services.bid_book import BidBookService, BidBookWriter
+
+
+class FakeSession:
+    """Session stand-in; every user exists"""
+
+    def scalar(self, statement):
+        return 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def auction(monkeypatch):
+    auction = SimpleNamespace(
+        id="auction-1",
+        property_id=1,
+        status="ACTIVE",
+        start_date=date(2030, 1, 1),
+        end_date=date(2030, 1, 31),
+        min_nights=1,
+        max_nights=None,
+        property=SimpleNamespace(base_price=100)
+    )
+    monkeypatch.setattr(bid_book, "AuctionRepository", lambda db: SimpleNamespace(
+        get_auction_by_id=lambda auction_id: auction if auction_id == auction.id else None
+    ))
+    monkeypatch.setattr(bid_book, "BidRepository", lambda db: SimpleNamespace(
+        get_active_bids_by_auction=lambda auction_id: []
+    ))
+    monkeypatch.setattr(bid_book, "CalendarRepository", lambda db: SimpleNamespace(
+        get_calendar_by_auction=lambda property_id, auction_id: []
+    ))
+    return auction
+
+
+@pytest.fixture
+def service():
+    # refresh_seconds=0: the auction row is re-read on every bid
+    return BidBookService(FakeSession, BidBookWriter(FakeSession), refresh_seconds=0)
+
+
+def make_bid(user_id: int, check_in: str = "2030-01-10", check_out: str = "2030-01-12", amount: int = 300):
+    return SimpleNamespace(
+        auction_id="auction-1",
+        user_id=user_id,
+        bid_amount=amount,
+        bid_time="2029-12-01T10:00:00",
+        check_in=check_in,
+        check_out=check_out,
+        allow_partial=False,
+        partial_awarded=False
+    )
+
+
+def test_bid_after_auction_closes_is_rejected(auction, service):
+    service.place_bid(make_bid(user_id=1))
+
+    auction.status = "CLOSED"
+
+    with pytest.raises(ValueError, match="not open"):
+        service.place_bid(make_bid(user_id=2))
+    assert service.get_book(auction.id) is None
+
+
+def test_edited_auction_dates_apply_to_the_cached_book(auction, service):
+    service.place_bid(make_bid(user_id=1))
+
+    auction.end_date = date(2030, 1, 11)
+
+    with pytest.raises(ValueError, match="outside the auction period"):
+        service.place_bid(make_bid(user_id=2, check_in="2030-01-10", check_out="2030-01-13"))
+
+
+def test_same_day_bid_is_rejected(auction, service):
+    with pytest.raises(ValueError, match="Check-out must be after check-in"):
+        service.place_bid(make_bid(user_id=1, check_in="2030-01-10", check_out="2030-01-10"))
+    assert len(service.get_book(auction.id)) == 0
@@ -0,0 +1,113 @@
+"""Statement counts of the property listing pages.
+
+Runs against the configured Postgres inside a transaction that is rolled
+back; skipped when the database is not reachable.
+"""
+
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db.models import Amenity, Property, PropertyAmenity, PropertyImage, User
+from app.db.sessions.session import engine
+from app.features.property.repositories.property_amenity_repository import PropertyAmenityRepository
+from app.features.property.repositories.property_image_repository import PropertyImageRepository
+from app.features.property.repositories.property_repository import PropertyRepository
+
+# Page query (host joined), amenities IN query, images IN query
+PAGE_STATEMENTS = 3
+
+
+@pytest.fixture
+def db():
+    try:
+        connection = engine.connect()
+    except OperationalError:
+        pytest.skip("Postgres is not reachable")
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def repository(db):
+    return PropertyRepository(db, PropertyAmenityRepository(db), PropertyImageRepository(db))
+
+
+def seed_host(db: Session, count: int) -> User:
+    """A host with ``count`` properties, each with one amenity and two images"""
+    suffix = uuid.uuid4().hex[:12]
+    host = User(email=f"host-{suffix}@example.com", username=f"host-{suffix}", full_name="Query Count Host")
+    amenity = Amenity(name=f"Wifi {suffix}", category="Basics")
+    db.add_all([host, amenity])
+    db.flush()
+    properties = [
+        Property(
+            host_id=host.id,
+            title=f"Property {index}",
+            property_type="house",
+            category="beach",
+            max_guests=2,
+            base_price=100,
+            cancellation_policy="FLEXIBLE"
+        )
+        for index in range(count)
+    ]
+    db.add_all(properties)
+    db.flush()
+    for property in properties:
+        db.add(PropertyAmenity(property_id=property.id, amenity_id=amenity.id))
+        db.add_all([
+            PropertyImage(property_id=property.id, image_url=f"https://example.com/{property.id}/{order}.jpg", display_order=order)
+            for order in range(2)
+        ])
+    db.flush()
+    # Nothing may be served from the identity map while counting
+    db.expire_all()
+    return host
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("count", [1, 5, 25])
+def test_get_by_host_id_statement_count_is_flat(db, repository, count):
+    host = seed_host(db, count)
+
+    with count_statements() as statements:
+        page = repository.get_by_host_id(host.id, limit=count, offset=0)
+
+    assert len(page) == count
+    assert all(len(item.amenities) == 1 and len(item.images) == 2 for item in page)
+    assert len(statements) == PAGE_STATEMENTS
+
+
+@pytest.mark.parametrize("count", [1, 5, 25])
+def test_get_all_statement_count_is_flat(db, repository, count):
+    seed_host(db, count)
+
+    with count_statements() as statements:
+        page = repository.get_all(limit=count, offset=0)
+
+    assert len(page) == count
+    assert len(statements) == PAGE_STATEMENTS
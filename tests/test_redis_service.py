@@ -0,0 +1,69 @@
+"""Highest bid script of RedisService and the delta it publishes.
+
+Runs against the configured Redis on throwaway keys; skipped when Redis is
+not reachable.
+"""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.db.repositories.redis_repository import AsyncRedisRepository
+from app.db.sessions.session import get_async_redis
+from app.services.redis_service import RedisService, night_bids_key
+
+
+async def raise_and_listen(bids):
+    """Apply ``bids`` (kwargs of update_highest_bid) and return each call's result and published delta"""
+    repository = AsyncRedisRepository(get_async_redis())
+    service = RedisService(repository)
+    auction_id = f"test-auction-{uuid.uuid4().hex}"
+    channel = f"test-bid-updates-{uuid.uuid4().hex}"
+    pubsub = repository.pubsub()
+    try:
+        await pubsub.subscribe(channel)
+        await pubsub.get_message(timeout=1)  # subscribe confirmation
+        results = []
+        for bid in bids:
+            raised = await service.update_highest_bid(channel, auction_id, **bid)
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1) if raised else None
+            results.append((raised, json.loads(message["data"]) if message else None))
+        return results
+    finally:
+        await repository.delete(auction_id)
+        await repository.delete(night_bids_key(auction_id))
+        await pubsub.aclose()
+        await repository.close()
+
+
+def run(bids):
+    try:
+        return asyncio.run(raise_and_listen(bids))
+    except ConnectionError:
+        pytest.skip("Redis is not reachable")
+
+
+def test_nights_are_published_as_a_list():
+    [(raised, delta)] = run([
+        dict(current_bid=300, nights=["2030-01-10", "2030-01-11"], price_per_night=150)
+    ])
+
+    assert raised
+    assert delta["nights"] == ["2030-01-10", "2030-01-11"]
+    assert delta["price_per_night"] == 150
+
+
+def test_auction_total_only_delta_has_no_nights():
+    # Higher total on already held nights at a lower nightly price: only the auction total rises
+    _, (raised, delta) = run([
+        dict(current_bid=300, nights=["2030-01-10", "2030-01-11"], price_per_night=150),
+        dict(current_bid=400, nights=["2030-01-10", "2030-01-11"], price_per_night=100)
+    ])
+
+    assert raised
+    assert delta["current_bid"] == 400
+    assert delta.get("nights", []) == []
+    assert "price_per_night" not in delta
@@ -1,6 +1,58 @@
 const WebSocket = require('ws');
 const { createClient } = require('redis');
 const http = require('http');
+const { URL } = require('url');
+
+// Channel index: channel name -> sockets subscribed to it. Users join
+// 'user:<id>'; clients subscribe to 'auction:<id>', 'conversation:<id>', ...
+const channels = new Map();
+
+const userChannel = (userId) => `user:${userId}`;
+
+function subscribe(ws, channel) {
+	let sockets = channels.get(channel);
+	if (!sockets) {
+		sockets = new Set();
+		channels.set(channel, sockets);
+	}
+	sockets.add(ws);
+	ws.channels.add(channel);
+}
+
+function unsubscribe(ws, channel) {
+	const sockets = channels.get(channel);
+	if (sockets) {
+		sockets.delete(ws);
+		if (sockets.size === 0) channels.delete(channel);
+	}
+	ws.channels.delete(channel);
+}
+
+// Send an already serialised payload to one channel's subscribers only
+function publish(channel, outbound) {
+	const sockets = channels.get(channel);
+	if (!sockets) return 0;
+	let delivered = 0;
+	sockets.forEach((client) => {
+		if (client.readyState === WebSocket.OPEN) {
+			client.send(outbound);
+			delivered += 1;
+		}
+	});
+	return delivered;
+}
+
+// Legacy fan-out for payloads that name no channel
+function publishAll(outbound) {
+	let delivered = 0;
+	wss.clients.forEach((client) => {
+		if (client.readyState === WebSocket.OPEN) {
+			client.send(outbound);
+			delivered += 1;
+		}
+	});
+	return delivered;
+}
 
 // Create a single HTTP server that will also host the WebSocket server
 const server = http.createServer((req, res) => {
@@ -12,14 +64,42 @@ const server = http.createServer((req, res) => {
 			try {
 				const data = JSON.parse(body || '{}');
 				// Expecting { userId: string, message: object }
+				if (data.userId === undefined || data.userId === null) {
+					res.writeHead(400, { 'Content-Type': 'application/json' });
+					res.end(JSON.stringify({ ok: false, error: 'userId is required' }));
+					return;
+				}
 				const outbound = JSON.stringify(data.message ?? data);
-				wss.clients.forEach((client) => {
-					if (client.readyState === WebSocket.OPEN) {
-						client.send(outbound);
+				const delivered = publish(userChannel(data.userId), outbound);
+				res.writeHead(200, { 'Content-Type': 'application/json' });
+				res.end(JSON.stringify({ ok: true, delivered }));
+			} catch (e) {
+				res.writeHead(400, { 'Content-Type': 'application/json' });
+				res.end(JSON.stringify({ ok: false, error: 'Invalid JSON' }));
+			}
+		});
+		return;
+	}
+
+	if (req.method === 'POST' && req.url === '/push-batch') {
+		let body = '';
+		req.on('data', chunk => { body += chunk; });
+		req.on('end', () => {
+			try {
+				// Expecting { messages: [{ userId | channel, message }] }
+				const data = JSON.parse(body || '{}');
+				const messages = Array.isArray(data.messages) ? data.messages : [];
+				let delivered = 0;
+				messages.forEach((entry) => {
+					const outbound = JSON.stringify(entry.message ?? entry);
+					if (entry.userId !== undefined && entry.userId !== null) {
+						delivered += publish(userChannel(entry.userId), outbound);
+					} else if (entry.channel) {
+						delivered += publish(entry.channel, outbound);
 					}
 				});
 				res.writeHead(200, { 'Content-Type': 'application/json' });
-				res.end(JSON.stringify({ ok: true }));
+				res.end(JSON.stringify({ ok: true, received: messages.length, delivered }));
 			} catch (e) {
 				res.writeHead(400, { 'Content-Type': 'application/json' });
 				res.end(JSON.stringify({ ok: false, error: 'Invalid JSON' }));
@@ -33,15 +113,12 @@ const server = http.createServer((req, res) => {
 		req.on('data', chunk => { body += chunk; });
 		req.on('end', () => {
 			try {
+				// Expecting { channel: string, message: object }; no channel reaches everyone
 				const data = JSON.parse(body || '{}');
 				const outbound = JSON.stringify(data.message ?? data);
-				wss.clients.forEach((client) => {
-					if (client.readyState === WebSocket.OPEN) {
-						client.send(outbound);
-					}
-				});
+				const delivered = data.channel ? publish(data.channel, outbound) : publishAll(outbound);
 				res.writeHead(200, { 'Content-Type': 'application/json' });
-				res.end(JSON.stringify({ ok: true }));
+				res.end(JSON.stringify({ ok: true, delivered }));
 			} catch (e) {
 				res.writeHead(400, { 'Content-Type': 'application/json' });
 				res.end(JSON.stringify({ ok: false, error: 'Invalid JSON' }));
@@ -72,20 +149,56 @@ if (redisUrl) {
 		await redis.connect();
 		console.log('connecting redis');
 		await redis.subscribe('bid_updates', (message) => {
-			console.log('message from redis: ', message);
-			wss.clients.forEach((client) => {
-				if (client.readyState === WebSocket.OPEN) {
-					console.log('client connected');
-					client.send(message);
+			// Calendar deltas carry a per-auction channel; only its subscribers get them
+			let channel = null;
+			try {
+				const data = JSON.parse(message);
+				channel = data.channel ?? null;
+				// highest_bid deltas omit nights when only the auction total rose
+				if (data.type === 'highest_bid' && !Array.isArray(data.nights)) {
+					data.nights = [];
+					message = JSON.stringify(data);
 				}
-			});
+			} catch (e) {
+				// Not JSON: legacy payload, broadcast as before
+			}
+			if (channel) {
+				publish(channel, message);
+			} else {
+				publishAll(message);
+			}
 		});
 	})();
 } else {
 	console.log('Redis not configured. Running WS server without Redis.');
 }
 
-wss.on('connection', (ws) => {
+wss.on('connection', (ws, req) => {
+	// Channels this socket subscribed to, kept so close can clean the index
+	ws.channels = new Set();
+	// Clients identify with ws://host:8080/?userId=<id> to receive /push messages
+	const userId = new URL(req.url, 'http://localhost').searchParams.get('userId');
+	if (userId) subscribe(ws, userChannel(userId));
+
+	ws.on('close', () => {
+		Array.from(ws.channels).forEach((channel) => unsubscribe(ws, channel));
+	});
+	ws.on('message', (raw) => {
+		let data;
+		try {
+			data = JSON.parse(raw.toString());
+		} catch (e) {
+			return;
+		}
+		if (typeof data.channel !== 'string') return;
+		if (data.type === 'subscribe') {
+			subscribe(ws, data.channel);
+			ws.send(JSON.stringify({ type: 'subscribed', channel: data.channel }));
+		} else if (data.type === 'unsubscribe') {
+			unsubscribe(ws, data.channel);
+			ws.send(JSON.stringify({ type: 'unsubscribed', channel: data.channel }));
+		}
+	});
 	ws.send(JSON.stringify({ message: 'Connected to bid updates' }));
 });
 